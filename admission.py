@@ -0,0 +1,145 @@
+"""
+Admission control for Chromium-backed work
+A concurrency cap in front of the browser with bounded per-lane queues.
+Interactive searches are always admitted ahead of background work, and
+requests that can't be queued fail fast with a Retry-After estimate
+instead of piling onto a thrashing single-process Chromium.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Sequence
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+class AdmissionRejected(Exception):
+    """No slot could be granted: the lane's queue is full or the wait timed out"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class LaneStats:
+    def __init__(self, queue_limit: int):
+        self.queue_limit = queue_limit
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "depth": len(self.waiters),
+            "queue_limit": self.queue_limit,
+            "max_depth": self.max_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+class ScrapeScheduler:
+    """Concurrency cap with strict-priority lanes (first lane = highest priority)"""
+
+    def __init__(self, max_concurrent: int = 1, queue_limits: Dict[str, int] = None,
+                 lanes: Sequence[str] = (INTERACTIVE, BACKGROUND), wait_timeout: float = 30.0):
+        queue_limits = queue_limits or {}
+        self.max_concurrent = max_concurrent
+        self.wait_timeout = wait_timeout
+        self.lanes: Dict[str, LaneStats] = {lane: LaneStats(queue_limits.get(lane, 8)) for lane in lanes}
+        self.running = 0
+        # Running average of how long a slot is held, for Retry-After estimates
+        self._hold_avg = 5.0
+
+    def _queued_ahead(self, lane: str) -> int:
+        ahead = 0
+        for name, stats in self.lanes.items():
+            ahead += len(stats.waiters)
+            if name == lane:
+                break
+        return ahead
+
+    def retry_after(self, lane: str) -> int:
+        """Seconds until a new request in this lane would likely get a slot"""
+        rounds = (self._queued_ahead(lane) + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(rounds * self._hold_avg))
+
+    def _grant_next(self):
+        """Hand free slots to the oldest waiter of the highest-priority lane"""
+        while self.running < self.max_concurrent:
+            for stats in self.lanes.values():
+                if stats.waiters:
+                    waiter = stats.waiters.popleft()
+                    if not waiter.done():
+                        self.running += 1
+                        waiter.set_result(None)
+                    break
+            else:
+                return
+
+    async def _acquire(self, lane: str):
+        stats = self.lanes[lane]
+        if self.running < self.max_concurrent and self._queued_ahead(lane) == 0:
+            self.running += 1
+            return
+
+        if len(stats.waiters) >= stats.queue_limit:
+            stats.rejected += 1
+            raise AdmissionRejected(f"{lane} scrape queue full ({stats.queue_limit})", self.retry_after(lane))
+
+        waiter = asyncio.get_running_loop().create_future()
+        stats.waiters.append(waiter)
+        stats.queued += 1
+        stats.max_depth = max(stats.max_depth, len(stats.waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.wait_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we gave up: pass the slot on
+                self.running -= 1
+                self._grant_next()
+            else:
+                waiter.cancel()
+                if waiter in stats.waiters:
+                    stats.waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                stats.timed_out += 1
+                raise AdmissionRejected(f"no scrape slot after {self.wait_timeout}s", self.retry_after(lane))
+            raise
+
+    @asynccontextmanager
+    async def slot(self, lane: str = INTERACTIVE):
+        """Hold one of max_concurrent slots for the duration of the block"""
+        stats = self.lanes[lane]
+        wait_start = time.monotonic()
+        await self._acquire(lane)
+
+        waited = time.monotonic() - wait_start
+        stats.admitted += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+
+        hold_start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold_avg = 0.8 * self._hold_avg + 0.2 * (time.monotonic() - hold_start)
+            self.running -= 1
+            self._grant_next()
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self.running,
+            "avg_hold_ms": round(self._hold_avg * 1000, 1),
+            "lanes": {name: stats.stats() for name, stats in self.lanes.items()},
+        }
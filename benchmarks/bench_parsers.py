@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Parser backend benchmark for MovieScraper
+Times the per-page CPU cost of the legacy full html.parser parse against
+the configured backend with partial (strained) parsing, and checks that
+both produce identical output on the fixture pages.
+
+Usage: python benchmarks/bench_parsers.py [--rounds 50] [--parser lxml]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from movie_scraper import MovieScraper, BROWSE_SELECTORS, POSTER_SELECTORS  # noqa: E402
+
+FIXTURES = [os.path.join(ROOT, "templates", "sample.html")]
+QUERIES = ["avengers", "telugu", "movie"]
+
+# Pre-change implementations (full html.parser tree), kept as the baseline
+
+def legacy_parse_search_results(scraper: MovieScraper, html: str, query: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    for container in soup.find_all(['div', 'article', 'li'], class_=re.compile(r'(movie|film|post|result)', re.I)):
+        title_element = container.find(['h1', 'h2', 'h3', 'h4', 'a'], class_=re.compile(r'(title|name)', re.I))
+        if not title_element:
+            title_element = container.find('a')
+        if title_element:
+            title = title_element.get_text(strip=True)
+            if query.lower() in title.lower():
+                poster_img = container.find('img')
+                results.append({
+                    'title': title,
+                    'url': urljoin(scraper.base_url, title_element.get('href', '')),
+                    'source': '5movierulz',
+                    'year': scraper._extract_year(title),
+                    'poster': urljoin(scraper.base_url, poster_img.get('src', '')) if poster_img else '',
+                    'genre': 'Unknown',
+                    'rating': 'N/A'
+                })
+    return results
+
+def legacy_find_browse_links(scraper: MovieScraper, html: str, query: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    movie_elements = []
+    for selector in BROWSE_SELECTORS:
+        elements = soup.select(selector)
+        if elements:
+            movie_elements.extend(elements)
+            break
+    links = []
+    for element in movie_elements:
+        title = element.get_text(strip=True)
+        if query.lower() in title.lower():
+            links.append((title, urljoin(scraper.base_url, element.get('href', ''))))
+            if len(links) >= 10:
+                break
+    return links
+
+def legacy_parse_poster(scraper: MovieScraper, html: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    for selector in POSTER_SELECTORS:
+        img = soup.select_one(selector)
+        if img:
+            return urljoin(scraper.base_url, img.get('src', ''))
+    first_img = soup.find('img')
+    if first_img:
+        return urljoin(scraper.base_url, first_img.get('src', ''))
+    return ''
+
+def run_page(scraper: MovieScraper, html: str, legacy: bool):
+    """One full page's worth of parsing across all three entry points"""
+    output = []
+    for query in QUERIES:
+        if legacy:
+            output.append(legacy_parse_search_results(scraper, html, query))
+            output.append(legacy_find_browse_links(scraper, html, query))
+        else:
+            output.append(scraper._parse_search_results(html, query))
+            output.append(scraper._find_browse_links(html, query))
+    output.append(legacy_parse_poster(scraper, html) if legacy else scraper._parse_poster(html))
+    return output
+
+def cpu_ms_per_page(scraper: MovieScraper, html: str, legacy: bool, rounds: int) -> float:
+    start = time.process_time()
+    for _ in range(rounds):
+        run_page(scraper, html, legacy)
+    return (time.process_time() - start) / rounds * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--parser", default=None, help="BeautifulSoup backend (default: auto)")
+    args = parser.parse_args()
+
+    scraper = MovieScraper(parser=args.parser)
+    print(f"Backend: {scraper.parser}, rounds: {args.rounds}")
+
+    ok = True
+    for path in FIXTURES:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        matches = run_page(scraper, html, legacy=True) == run_page(scraper, html, legacy=False)
+        ok = ok and matches
+
+        before = cpu_ms_per_page(scraper, html, legacy=True, rounds=args.rounds)
+        after = cpu_ms_per_page(scraper, html, legacy=False, rounds=args.rounds)
+        print(f"{os.path.relpath(path, ROOT)}: before {before:.2f}ms/page, after {after:.2f}ms/page "
+              f"({before / after:.1f}x), output {'identical' if matches else 'DIFFERS'}")
+
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
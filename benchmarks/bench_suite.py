@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite
+Times the scraping entry points against the local fixture server and
+prints one JSON document (ops/sec and p50/p99 per case) that can be
+diffed across commits:
+
+  movie_scraper.parse_search_results     MovieScraper parse of a listing page
+  movie_scraper.search_movies            MovieScraper search over HTTP
+  playwright.parse_movie_results         PlaywrightMovieScraper on a loaded page
+  main.render_optimized_search           full local search, uncached
+
+Cases that need something missing here (e.g. a Chromium build) are
+reported as skipped with the reason, so the document keeps its shape.
+
+Usage: python benchmarks/bench_suite.py [--iterations 30] [--latency-ms 0] [--output bench.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the app quiet and self-contained: no disk cache, no background jobs, HTTP tier only
+for name, value in {
+    "DISK_CACHE": "0",
+    "BROWSER_POOL_WARM": "0",
+    "CATALOG_CRAWL_INTERVAL": "0",
+    "MEMORY_SAMPLE_INTERVAL": "0",
+    "TRACE_LOG": "off",
+    "SCRAPE_TIERS": "http",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fixture_server import FixtureServer  # noqa: E402
+
+SCHEMA_VERSION = 1
+QUERY = "2025"
+WARMUP = 2
+
+def summarize(samples: List[float]) -> Dict:
+    """ops/sec and latency percentiles (ms) of per-iteration wall times (s)"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "iterations": len(ordered),
+        "ops_per_sec": round(len(ordered) / total, 2) if total else None,
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(50), 3),
+        "p99_ms": round(percentile(99), 3),
+    }
+
+def time_sync(fn: Callable[[], object], iterations: int) -> Dict:
+    for _ in range(WARMUP):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+async def time_async(fn: Callable[[], Awaitable[object]], iterations: int) -> Dict:
+    for _ in range(WARMUP):
+        await fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def bench_movie_scraper(server: FixtureServer, iterations: int) -> Dict[str, Dict]:
+    from mirrors import MirrorRegistry
+    from movie_scraper import MovieScraper
+
+    scraper = MovieScraper(mirrors=MirrorRegistry([server.base_url]))
+    listing = server.site.search_page(QUERY).decode("utf-8")
+    return {
+        "movie_scraper.parse_search_results": time_sync(
+            lambda: scraper._parse_search_results(listing, QUERY), iterations),
+        "movie_scraper.search_movies": time_sync(
+            lambda: scraper.search_movies(QUERY, max_results=10), iterations),
+    }
+
+async def bench_playwright_parse(server: FixtureServer, iterations: int) -> Dict:
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError as e:
+        return {"skipped": f"playwright not installed ({e})"}
+    from movie_scraper_playwright import PlaywrightMovieScraper
+
+    playwright = await async_playwright().start()
+    try:
+        try:
+            browser = await playwright.chromium.launch(headless=True, args=['--no-sandbox'])
+        except Exception as e:
+            return {"skipped": f"chromium unavailable ({str(e).splitlines()[0]})"}
+        try:
+            page = await browser.new_page()
+            await page.goto(f"{server.base_url}/search_movies?s={QUERY}")
+            scraper = PlaywrightMovieScraper()
+            scraper.base_url = server.base_url
+            return await time_async(lambda: scraper._parse_movie_results(page, QUERY), iterations)
+        finally:
+            await browser.close()
+    finally:
+        await playwright.stop()
+
+async def bench_render_search(server: FixtureServer, iterations: int) -> Dict:
+    import main
+    from mirrors import mirror_registry
+    from stream_cache import stream_url_cache
+
+    mirror_registry.set_urls([server.base_url])
+
+    async def search():
+        # Uncached end to end: drop the resolved stream links as well as the result cache
+        stream_url_cache.clear()
+        results = await main.render_optimized_search(QUERY, use_cache=False)
+        if not results:
+            raise RuntimeError("render_optimized_search returned no results from the fixture server")
+
+    try:
+        return await time_async(search, iterations)
+    finally:
+        await main.cleanup()
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+async def run(iterations: int, latency_ms: float, only: List[str]) -> Dict:
+    cases: Dict[str, Dict] = {}
+    with FixtureServer(latency_ms=latency_ms) as server:
+        if not only or "movie_scraper" in only:
+            cases.update(await asyncio.to_thread(bench_movie_scraper, server, iterations))
+        if not only or "playwright" in only:
+            cases["playwright.parse_movie_results"] = await bench_playwright_parse(server, iterations)
+        if not only or "main" in only:
+            cases["main.render_optimized_search"] = await bench_render_search(server, iterations)
+        fixture_requests = server.requests
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency_ms": latency_ms,
+        "iterations": iterations,
+        "query": QUERY,
+        "fixture_requests": fixture_requests,
+        "cases": cases,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixture server delay per request")
+    parser.add_argument("--only", action="append", choices=["movie_scraper", "playwright", "main"],
+                        help="run only these case groups (repeatable)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.iterations, args.latency_ms, args.only or []))
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
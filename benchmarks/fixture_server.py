@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Offline fixture HTTP server for benchmarks
+Serves recorded 5movierulz pages from templates/sample.html on localhost
+with configurable per-request latency, so scrapers can be timed without
+touching live hosts:
+
+  /search_movies?s=q, /?s=q, /search/q, /search?q=q   search results page
+  /                                                   homepage listing
+  /<slug>/movie-watch-online-free-<id>.html           movie detail page
+
+The search and homepage listings are built from the "recent movies" list
+in the recorded detail page, as film cards in the site's markup. Links
+are rewritten to absolute URLs on this server, as the live site emits them.
+
+Usage: python benchmarks/fixture_server.py [--port 8765] [--latency-ms 50]
+"""
+import argparse
+import html
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PAGE = os.path.join(ROOT, "templates", "sample.html")
+RECORDED_ORIGIN = "https://www.5movierulz.villas"
+
+_RECENT_LINK_RE = re.compile(r'<a title="([^"]+)" href="(https://www\.5movierulz\.villas/[^"]+movie-watch-online-free-\d+\.html)">')
+_STREAM_LOCATIONS_RE = re.compile(r'var locations = \["([^"]+)"\]')
+
+def recorded_movies(sample_html: str) -> List[Tuple[str, str]]:
+    """(title, path) pairs from the recorded page's recent-movies list"""
+    movies = []
+    for title, url in _RECENT_LINK_RE.findall(sample_html):
+        title = " ".join(html.unescape(title).replace("Movie Watch Online Free", "").split())
+        movies.append((title, url[len(RECORDED_ORIGIN):]))
+    return movies
+
+def film_card(title: str, path: str, index: int, origin: str = "") -> str:
+    return (
+        f'<div class="boxed film"><div class="cont_display">'
+        f'<a href="{origin}{path}" title="{html.escape(title)}"><img src="{origin}/posters/{index}.jpg" alt="{html.escape(title)}"></a>'
+        f'</div><p><b>{html.escape(title)}</b></p>'
+        f'<a href="{origin}{path}">{html.escape(title)} Movie Watch Online Free</a></div>'
+    )
+
+def listing_page(movies: List[Tuple[str, str]], heading: str, repeat: int = 1, origin: str = "") -> str:
+    cards = "\n".join(film_card(title, path, i, origin)
+                      for r in range(repeat) for i, (title, path) in enumerate(movies))
+    categories = "".join(f'<li><a href="{origin}/category/{lang}-movie/">{lang.title()}</a></li>'
+                         for lang in ("telugu", "hindi", "tamil"))
+    return (f'<html><head><title>{html.escape(heading)}</title></head><body>'
+            f'<ul class="menu">{categories}</ul><h1>{html.escape(heading)}</h1>'
+            f'<div class="films">{cards}</div></body></html>')
+
+class FixtureSite:
+    """Builds every response body once so serving adds no parse cost"""
+
+    def __init__(self, sample_path: str = SAMPLE_PAGE, listing_repeat: int = 2, origin: str = ""):
+        with open(sample_path, encoding="utf-8") as f:
+            self._sample = f.read()
+        self.movies = recorded_movies(self._sample)
+        self.listing_repeat = listing_repeat
+        self.set_origin(origin)
+
+    def set_origin(self, origin: str):
+        """Rebuild the pages with links under origin (the serving base URL)"""
+        self.origin = origin.rstrip("/")
+        # Live detail pages expose the player as an anchor; the recording keeps it in a JS array
+        stream = _STREAM_LOCATIONS_RE.search(self._sample)
+        stream_anchor = f'<a class="mv_button_css" href="{stream.group(1).replace(chr(92), "")}">Watch</a>' if stream else ""
+        detail = self._sample.replace(RECORDED_ORIGIN, self.origin)
+        self.detail_page = detail.replace("</body>", f"{stream_anchor}</body>", 1).encode("utf-8")
+        self.homepage = listing_page(self.movies, "Home", self.listing_repeat, self.origin).encode("utf-8")
+
+    def search_page(self, query: str) -> bytes:
+        query = query.lower()
+        matches = [movie for movie in self.movies if query in movie[0].lower()] or self.movies
+        return listing_page(matches, f"Search results for {query}", self.listing_repeat, self.origin).encode("utf-8")
+
+    def route(self, raw_path: str) -> Tuple[int, bytes]:
+        parts = urlsplit(raw_path)
+        params = parse_qs(parts.query)
+        query = (params.get("s") or params.get("q") or [None])[0]
+        if query is None and parts.path.startswith("/search/"):
+            query = unquote(parts.path[len("/search/"):])
+        if query is not None:
+            return 200, self.search_page(query)
+        if "movie-watch-online-free" in parts.path:
+            return 200, self.detail_page
+        if parts.path in ("/", "") or parts.path.startswith("/category/"):
+            return 200, self.homepage
+        return 404, b"<html><body>Not found</body></html>"
+
+class FixtureServer:
+    """Threaded localhost server for FixtureSite with an artificial per-request delay"""
+
+    def __init__(self, latency_ms: float = 0.0, port: int = 0, site: Optional[FixtureSite] = None):
+        self.latency = latency_ms / 1000
+        self.site = site or FixtureSite()
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, body = server.site.route(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up, e.g. the losing side of a hedged request
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.site.set_origin(self.base_url)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FixtureServer(latency_ms=args.latency_ms, port=args.port)
+    print(f"Serving {len(server.site.movies)} recorded movies at {server.base_url} "
+          f"(latency {args.latency_ms:.0f}ms), Ctrl+C to stop")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+if __name__ == "__main__":
+    main()
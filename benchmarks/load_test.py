@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the FastAPI app
+Starts the app (uvicorn, in a child process) against local stand-ins for
+the movie site (fixture_server) and n8n (n8n_simulator), drives a weighted mix
+of endpoints and queries at fixed concurrency, and reports throughput,
+latency percentiles, error rates and the app's process-tree RSS over time.
+
+With --baseline the run is compared to a stored report and regressions
+(throughput, p99, error rate, peak RSS, or RSS close to the memory budget)
+are listed and make the exit status 1. --save-baseline stores the report;
+the committed benchmarks/load_baseline.json is a run with default settings.
+
+Usage:
+  python benchmarks/load_test.py [--duration 30] [--concurrency 8]
+      [--mix search:6,search-local:1,n8n-results:2,append:1]
+      [--queries 2025:4,coolie:2,kannappa:1] [--baseline [benchmarks/load_baseline.json]]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from fixture_server import FixtureServer, FixtureSite  # noqa: E402
+from n8n_simulator import WorkflowSimulator  # noqa: E402
+
+SCHEMA_VERSION = 1
+DEFAULT_BASELINE = os.path.join(HERE, "load_baseline.json")
+ENDPOINTS = ("search", "search-local", "n8n-results", "append")
+
+# Child app settings; anything already in the environment wins
+APP_ENV = {
+    "DISK_CACHE": "0",
+    "BROWSER_POOL_WARM": "0",
+    "CATALOG_CRAWL_INTERVAL": "0",
+    "TRACE_LOG": "off",
+    "SCRAPE_TIERS": "http",
+}
+
+def append_payload(site: FixtureSite, site_url: str, query: str) -> Dict:
+    """An /api/append-results body in the shape the n8n workflow posts"""
+    movies = [
+        {"title": title, "url": f"{site_url}{path}", "year": "2025", "rating": "8.0",
+         "source": "5movierulz.villas", "searchQuery": query}
+        for title, path in site.movies if query.lower() in title.lower()
+    ][:10]
+    return {"searchQuery": query, "totalResults": len(movies), "source": "5movierulz.villas",
+            "status": "success", "movies": movies}
+
+# --- app under test --------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app(port: int, site_url: str, webhook_url: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    for name, value in APP_ENV.items():
+        env.setdefault(name, value)
+    env["MIRROR_URLS"] = site_url
+    env["N8N_WEBHOOK_URL"] = webhook_url
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+
+async def wait_until_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"app exited during startup (status {process.returncode})")
+        try:
+            if (await client.get("/api/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"app not ready after {timeout:.0f}s")
+
+# --- load generation -------------------------------------------------------
+
+def parse_weights(spec: str, allowed: Optional[Tuple[str, ...]] = None) -> Dict[str, float]:
+    """'a:3,b:1' -> {'a': 3.0, 'b': 1.0}; a bare name weighs 1"""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition(":")
+        if allowed and name not in allowed:
+            raise SystemExit(f"unknown endpoint '{name}' (choose from {', '.join(allowed)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.status_codes: Dict[str, int] = {}
+
+    def record(self, latency: float, status: str, ok: bool):
+        self.latencies.append(latency)
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> Dict:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+
+        def percentile(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(count - 1, int(round(p / 100 * (count - 1))))] * 1000, 2)
+
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "mean_ms": round(sum(ordered) / count * 1000, 2) if count else None,
+            "p50_ms": percentile(50),
+            "p90_ms": percentile(90),
+            "p99_ms": percentile(99),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else None,
+            "status_codes": dict(sorted(self.status_codes.items())),
+        }
+
+async def send(client: httpx.AsyncClient, endpoint: str, query: str, site_server: FixtureServer) -> httpx.Response:
+    if endpoint == "search":
+        return await client.get("/api/search", params={"query": query, "use_n8n": "true"})
+    if endpoint == "search-local":
+        return await client.get("/api/search", params={"query": query, "use_n8n": "false"})
+    if endpoint == "n8n-results":
+        return await client.get(f"/api/n8n-results/{query}")
+    return await client.post("/api/append-results", json=append_payload(site_server.site, site_server.base_url, query))
+
+def response_ok(response: httpx.Response) -> bool:
+    if response.status_code >= 400:
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    # These endpoints report failures in the body with a 200
+    return not (isinstance(body, dict) and body.get("status") == "error")
+
+async def worker(client: httpx.AsyncClient, site_server: FixtureServer, stop_at: float,
+                 endpoints: Dict[str, float], queries: Dict[str, float], cold_rate: float,
+                 stats: Dict[str, EndpointStats]):
+    endpoint_names, endpoint_weights = list(endpoints), list(endpoints.values())
+    query_names, query_weights = list(queries), list(queries.values())
+    while time.monotonic() < stop_at:
+        endpoint = random.choices(endpoint_names, endpoint_weights)[0]
+        query = random.choices(query_names, query_weights)[0]
+        if random.random() < cold_rate:
+            # Never seen before, so every cache layer misses
+            query = f"{query} {random.getrandbits(32):x}"
+        start = time.perf_counter()
+        try:
+            response = await send(client, endpoint, query, site_server)
+            status, ok = str(response.status_code), response_ok(response)
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+        stats[endpoint].record(time.perf_counter() - start, status, ok)
+
+async def sample_rss(pid: int, interval: float, timeline: List[Tuple[float, float]], stop: asyncio.Event):
+    from memory_governor import process_tree_rss_mb
+
+    start = time.monotonic()
+    while not stop.is_set():
+        try:
+            timeline.append((round(time.monotonic() - start, 2), round(process_tree_rss_mb(pid), 1)))
+        except Exception:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+async def run(args) -> Dict:
+    endpoints = parse_weights(args.mix, ENDPOINTS)
+    queries = parse_weights(args.queries)
+    random.seed(args.seed)
+
+    site_server = FixtureServer(latency_ms=args.site_latency_ms).start()
+    port = free_port()
+    app_url = f"http://127.0.0.1:{port}"
+    n8n = WorkflowSimulator(
+        app_url, site_server.base_url, delay_ms=args.n8n_delay_ms, failure_rate=args.n8n_failure_rate,
+        scrape_wait_ms=args.n8n_scrape_wait_ms,
+    ).start()
+    process = start_app(port, site_server.base_url, n8n.webhook_url)
+
+    stats = {endpoint: EndpointStats() for endpoint in endpoints}
+    timeline: List[Tuple[float, float]] = []
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=app_url, timeout=args.timeout, limits=limits) as client:
+            await wait_until_ready(client, process)
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(sample_rss(process.pid, args.sample_interval, timeline, stop))
+            started = time.monotonic()
+            await asyncio.gather(*(
+                worker(client, site_server, started + args.duration, endpoints, queries, args.cold_rate, stats)
+                for _ in range(args.concurrency)
+            ))
+            elapsed = time.monotonic() - started
+            stop.set()
+            await sampler
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        n8n.stop()
+        site_server.stop()
+
+    total = EndpointStats()
+    for endpoint_stats in stats.values():
+        total.latencies.extend(endpoint_stats.latencies)
+        total.errors += endpoint_stats.errors
+    overall = total.summary()
+    overall.pop("status_codes")
+    overall["throughput_rps"] = round(overall["requests"] / elapsed, 2) if elapsed else 0.0
+
+    rss_values = [rss for _, rss in timeline]
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "mix": endpoints,
+            "queries": queries,
+            "cold_rate": args.cold_rate,
+            "site_latency_ms": args.site_latency_ms,
+            "n8n_delay_ms": args.n8n_delay_ms,
+            "n8n_failure_rate": args.n8n_failure_rate,
+            "n8n_scrape_wait_ms": args.n8n_scrape_wait_ms,
+            "scrape_tiers": os.environ.get("SCRAPE_TIERS", APP_ENV["SCRAPE_TIERS"]),
+        },
+        "overall": overall,
+        "endpoints": {endpoint: endpoint_stats.summary() for endpoint, endpoint_stats in stats.items()},
+        "rss_mb": {
+            "start": rss_values[0] if rss_values else None,
+            "peak": max(rss_values) if rss_values else None,
+            "end": rss_values[-1] if rss_values else None,
+            "budget": args.rss_budget_mb,
+            "timeline": timeline,
+        },
+        "n8n": {name: n8n.counts[name] for name in ("triggers", "rejected", "succeeded", "failed")},
+        "fixture_requests": site_server.requests,
+    }
+
+# --- baseline comparison -----------------------------------------------------
+
+def find_regressions(report: Dict, baseline: Optional[Dict], args) -> List[str]:
+    """Human-readable list of everything that got worse than allowed"""
+    problems = []
+    peak = report["rss_mb"]["peak"]
+    if peak is not None and peak >= args.rss_budget_mb * args.rss_warn_fraction:
+        problems.append(f"peak RSS {peak:.0f}MB is within {(1 - args.rss_warn_fraction):.0%} "
+                        f"of the {args.rss_budget_mb:.0f}MB budget")
+    if not baseline:
+        return problems
+
+    now, then = report["overall"], baseline["overall"]
+    if then.get("throughput_rps") and now["throughput_rps"] < then["throughput_rps"] * (1 - args.max_throughput_drop):
+        problems.append(f"throughput {now['throughput_rps']} rps vs baseline {then['throughput_rps']} rps")
+    if then.get("p99_ms") and now["p99_ms"] is not None and now["p99_ms"] > then["p99_ms"] * (1 + args.max_p99_increase):
+        problems.append(f"p99 {now['p99_ms']}ms vs baseline {then['p99_ms']}ms")
+    if now["error_rate"] > then.get("error_rate", 0.0) + args.max_error_rate_increase:
+        problems.append(f"error rate {now['error_rate']:.2%} vs baseline {then.get('error_rate', 0.0):.2%}")
+    base_peak = baseline.get("rss_mb", {}).get("peak")
+    if base_peak and peak is not None and peak > base_peak * (1 + args.max_rss_increase):
+        problems.append(f"peak RSS {peak:.0f}MB vs baseline {base_peak:.0f}MB")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default="search:6,search-local:1,n8n-results:2,append:1")
+    parser.add_argument("--queries", default="2025:4,coolie:2,kannappa:1,ghaati:1")
+    parser.add_argument("--cold-rate", type=float, default=0.05, help="fraction of queries made unique (cache misses)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--site-latency-ms", type=float, default=50.0)
+    parser.add_argument("--n8n-delay-ms", type=float, default=0.0, help="extra simulated n8n callback delay")
+    parser.add_argument("--n8n-scrape-wait-ms", type=float, help="override the workflow scrape waitTime")
+    parser.add_argument("--n8n-failure-rate", type=float, default=0.0, help="fraction of n8n executions that fail")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="RSS sampling period")
+    parser.add_argument("--rss-budget-mb", type=float, default=float(os.environ.get("MEMORY_BUDGET_MB", "512")))
+    parser.add_argument("--rss-warn-fraction", type=float, default=0.9)
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"compare against this report (default {os.path.relpath(DEFAULT_BASELINE, ROOT)})")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="store this run as the baseline")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.2)
+    parser.add_argument("--max-p99-increase", type=float, default=0.25)
+    parser.add_argument("--max-error-rate-increase", type=float, default=0.01)
+    parser.add_argument("--max-rss-increase", type=float, default=0.15)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report["regressions"] = find_regressions(report, baseline, args)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    for problem in report["regressions"]:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    return 1 if report["regressions"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Local n8n workflow simulator
+Runs n8n_5movierulz_villas_workflow_fixed.json offline: registers its
+webhook (same method and path, so unsupported variants get n8n's 404),
+answers immediately like a webhook in "on received" mode, then walks the
+node chain from the workflow's connections:
+
+  Webhook Trigger -> Prepare Search Data -> Playwright Scrape ->
+  Parse Movie Results -> Filter Valid Movies -> Format Final Results ->
+  Send to Your App -> Webhook Response
+
+Code nodes are Python ports of the workflow's JavaScript, the scrape is
+a plain HTTP fetch of the target page (no browser), and the hardcoded
+site and app URLs are replaced with local ones. Callback delay, failure
+rate and payload size are configurable, so trigger -> /api/append-results
+latency and the app's timeout handling can be benchmarked offline.
+
+Usage: python benchmarks/n8n_simulator.py [--port 5678] [--app-url http://127.0.0.1:8000]
+           [--site-url URL | fixture server] [--delay-ms 0] [--failure-rate 0] [--payload-movies N]
+Then run the app with N8N_WEBHOOK_URL=http://127.0.0.1:5678/webhook/movie-scraper-villas
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKFLOW_PATH = os.path.join(ROOT, "n8n_5movierulz_villas_workflow_fixed.json")
+WORKFLOW_SITE = "https://www.5movierulz.villas"
+
+Items = List[Dict]
+
+class SimulatedFailure(Exception):
+    """Injected execution failure: the workflow stops and never calls back"""
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+# --- Parse Movie Results (port of the node's JavaScript) -------------------
+
+MOVIE_PATTERNS = [
+    re.compile(r'<div[^>]*class="[^"]*(?:ml-item|movie-item|item)[^"]*"[^>]*>([\s\S]*?)</div>', re.I),
+    re.compile(r'<article[^>]*class="[^"]*item[^"]*"[^>]*>([\s\S]*?)</article>', re.I),
+    re.compile(r'<div[^>]*class="[^"]*(?:post|entry|movie)[^"]*"[^>]*>([\s\S]*?)</div>', re.I),
+]
+TITLE_LINK_PATTERNS = [
+    re.compile(r'<h[1-6][^>]*>\s*<a[^>]*href="([^"]+)"[^>]*>([^<]+)</a>\s*</h[1-6]>', re.I),
+    re.compile(r'<a[^>]*href="([^"]+)"[^>]*class="[^"]*title[^"]*"[^>]*>([^<]+)</a>', re.I),
+    re.compile(r'<a[^>]*href="([^"]+)"[^>]*>([^<]+)</a>', re.I),
+]
+LINK_PATTERN = re.compile(r'<a[^>]*href="([^"]+)"[^>]*>([^<]+)</a>', re.I)
+IMAGE_PATTERN = re.compile(r'<img[^>]*src="([^"]+)"', re.I)
+YEAR_PATTERN = re.compile(r'\b(20\d{2})\b')
+QUALITY_PATTERN = re.compile(r'\b(HDRip|BRRip|DVDRip|HD|4K|1080p|720p|CAM|TS|WebRip)\b', re.I)
+LANGUAGE_PATTERN = re.compile(r'\b(Hindi|Telugu|Tamil|Malayalam|Kannada|English|Bengali)\b', re.I)
+
+def _is_navigation(title: str) -> bool:
+    lowered = title.lower()
+    return "home" in lowered or "contact" in lowered or "about" in lowered or title == "MovieRulz"
+
+def parse_movie_results(html: str, search_query: str, site: str) -> Items:
+    movies: Items = []
+    query = search_query.lower()
+    if len(html) < 1000:
+        # HTML too short, might be blocked or page not loaded
+        return []
+
+    for pattern in MOVIE_PATTERNS:
+        for match in pattern.finditer(html):
+            if len(movies) >= 10:
+                break
+            item_html = match.group(1)
+            title_link = next(filter(None, (p.search(item_html) for p in TITLE_LINK_PATTERNS)), None)
+            if not title_link:
+                continue
+            url, title = title_link.group(1).strip(), title_link.group(2).strip()
+            if _is_navigation(title) or any(part in url for part in ("/genre/", "/year/", "/category/")):
+                continue
+            if query not in title.lower() and query not in url.lower():
+                continue
+            clean_title = " ".join(title.split())
+            if len(clean_title) < 3 or len(clean_title) > 150:
+                continue
+
+            full_url = site + url if url.startswith("/") else url
+            image_match = IMAGE_PATTERN.search(item_html)
+            image = image_match.group(1) if image_match else ""
+            if image.startswith("/"):
+                image = site + image
+            if not image:
+                image = f"https://via.placeholder.com/300x450/667eea/ffffff?text={quote(clean_title[:20])}"
+            year_match = YEAR_PATTERN.search(clean_title) or YEAR_PATTERN.search(item_html)
+            quality_match = QUALITY_PATTERN.search(clean_title)
+            language_match = LANGUAGE_PATTERN.search(clean_title)
+            movies.append({
+                "title": clean_title,
+                "url": full_url,
+                "image": image,
+                "year": year_match.group(1) if year_match else "2022",
+                "rating": "8.0",
+                "genre": "Action, Drama",
+                "quality": quality_match.group(1) if quality_match else "HD",
+                "language": language_match.group(1) if language_match else "Multi",
+                "source": "5movierulz.villas",
+                "searchQuery": search_query,
+                "scrapedAt": _now(),
+            })
+        if movies:
+            break
+
+    if not movies:
+        # No structured results, simple link extraction
+        for match in LINK_PATTERN.finditer(html):
+            if len(movies) >= 6:
+                break
+            url, text = match.group(1).strip(), match.group(2).strip()
+            if not ((query in url.lower() or query in text.lower()) and
+                    ("movie" in url or "watch" in url or "movie" in text or "watch" in text or query in url)):
+                continue
+            if _is_navigation(text):
+                continue
+            movies.append({
+                "title": text,
+                "url": site + url if url.startswith("/") else url,
+                "image": f"https://via.placeholder.com/300x450/667eea/ffffff?text={quote(text[:15])}",
+                "year": "2022",
+                "rating": "8.0",
+                "genre": "Action, Drama",
+                "quality": "HD",
+                "source": "5movierulz.villas",
+                "searchQuery": search_query,
+                "scrapedAt": _now(),
+            })
+    return movies
+
+# --- Filter node -------------------------------------------------------------
+
+_FIELD_RE = re.compile(r'\$json\.(\w+)')
+
+def _condition(condition: Dict, case_sensitive: bool) -> Callable[[Dict], bool]:
+    field = _FIELD_RE.search(condition["leftValue"]).group(1)
+    operation = condition["operator"]["operation"]
+    right = str(condition.get("rightValue", ""))
+
+    def value(item: Dict) -> str:
+        text = str(item.get(field) or "")
+        return text if case_sensitive else text.lower()
+
+    if not case_sensitive:
+        right = right.lower()
+    if operation == "notEmpty":
+        return lambda item: value(item) != ""
+    if operation == "empty":
+        return lambda item: value(item) == ""
+    if operation == "equals":
+        return lambda item: value(item) == right
+    if operation == "contains":
+        return lambda item: right in value(item)
+    raise ValueError(f"filter operation '{operation}' is not simulated")
+
+def build_filter(parameters: Dict) -> Callable[[Items], Items]:
+    conditions = parameters["conditions"]
+    case_sensitive = conditions.get("options", {}).get("caseSensitive", True)
+    checks = [_condition(condition, case_sensitive) for condition in conditions["conditions"]]
+    return lambda items: [item for item in items if all(check(item) for check in checks)]
+
+# --- workflow ----------------------------------------------------------------
+
+class Execution:
+    """One workflow run: per-node timings and outcome"""
+
+    def __init__(self, query_source: Dict):
+        self.input = query_source
+        self.started = time.monotonic()
+        self.node_ms: Dict[str, float] = {}
+        self.search_query: Optional[str] = None
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.callback_status: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "searchQuery": self.search_query,
+            "status": self.status,
+            "error": self.error,
+            "callback_status": self.callback_status,
+            "total_ms": round(sum(self.node_ms.values()), 1),
+            "nodes": {name: round(ms, 1) for name, ms in self.node_ms.items()},
+        }
+
+class WorkflowSimulator:
+    """Serves the workflow's webhook and executes its node chain per trigger"""
+
+    def __init__(self, app_url: str, site_url: str, workflow_path: str = WORKFLOW_PATH,
+                 delay_ms: float = 0.0, failure_rate: float = 0.0, payload_movies: Optional[int] = None,
+                 scrape_wait_ms: Optional[float] = None, port: int = 0, keep_executions: int = 200):
+        with open(workflow_path, encoding="utf-8") as f:
+            self.workflow = json.load(f)
+        self.nodes = {node["name"]: node for node in self.workflow["nodes"]}
+        self.chain = self._chain()
+        webhook = self.nodes[self.chain[0]]["parameters"]
+        self.webhook_method = webhook.get("httpMethod", "GET").upper()
+        self.webhook_path = "/webhook/" + webhook["path"].strip("/")
+
+        self.app_url = app_url.rstrip("/")
+        self.site_url = site_url.rstrip("/")
+        self.delay = delay_ms / 1000
+        self.failure_rate = failure_rate
+        self.payload_movies = payload_movies
+        self.scrape_wait_ms = scrape_wait_ms
+        self.keep_executions = keep_executions
+        self.executions: List[Execution] = []
+        self.counts = {"triggers": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+
+    def _chain(self) -> List[str]:
+        """Node names in execution order, from the webhook along the main connections"""
+        starts = [name for name, node in self.nodes.items() if node["type"] == "n8n-nodes-base.webhook"]
+        if len(starts) != 1:
+            raise ValueError("workflow must have exactly one webhook trigger")
+        chain = [starts[0]]
+        connections = self.workflow.get("connections", {})
+        while True:
+            outputs = connections.get(chain[-1], {}).get("main", [[]])
+            targets = [link["node"] for branch in outputs for link in branch]
+            if not targets:
+                return chain
+            if len(targets) > 1:
+                raise ValueError(f"branching after '{chain[-1]}' is not simulated")
+            chain.append(targets[0])
+
+    @property
+    def webhook_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{self.webhook_path}"
+
+    # --- webhook ---------------------------------------------------------
+
+    def _handler(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, payload: Dict):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _receive(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                if parts.path == "/stats" and self.command == "GET":
+                    self._reply(200, simulator.stats())
+                    return
+                if parts.path.rstrip("/") != simulator.webhook_path:
+                    self._reply(404, {"code": 404, "message": f"The requested webhook \"{parts.path}\" is not registered."})
+                    return
+                if self.command != simulator.webhook_method:
+                    simulator.counts["rejected"] += 1
+                    self._reply(404, {
+                        "code": 404,
+                        "message": f"This webhook is not registered for {self.command} requests. "
+                                   f"Did you mean to make a {simulator.webhook_method} request?",
+                    })
+                    return
+                # Same shape as the webhook node's output item
+                webhook_item = {
+                    "headers": {name.lower(): value for name, value in self.headers.items()},
+                    "params": {},
+                    "query": {name: values[-1] for name, values in parse_qs(parts.query).items()},
+                    "body": simulator._parse_body(raw, self.headers.get("Content-Type", "")),
+                }
+                simulator.trigger(webhook_item)
+                self._reply(200, {"message": "Workflow was started"})
+
+            do_GET = _receive
+            do_POST = _receive
+            do_PUT = _receive
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @staticmethod
+    def _parse_body(raw: bytes, content_type: str):
+        if not raw:
+            return {}
+        text = raw.decode("utf-8", "replace")
+        if "json" in content_type:
+            try:
+                return json.loads(text)
+            except ValueError:
+                return {}
+        # n8n leaves non-JSON bodies out of the parsed body
+        return {}
+
+    def trigger(self, webhook_item: Dict):
+        execution = Execution(webhook_item)
+        with self._lock:
+            self.counts["triggers"] += 1
+            self.executions.append(execution)
+            del self.executions[:-self.keep_executions]
+        threading.Thread(target=self._execute, args=(execution,), daemon=True).start()
+
+    # --- nodes -----------------------------------------------------------
+
+    def _prepare_search_data(self, items: Items, execution: Execution) -> Items:
+        data = items[0]
+        query = "rrr"  # default fallback
+        if isinstance(data.get("query"), dict) and data["query"].get("query"):
+            query = data["query"]["query"]
+        elif isinstance(data.get("body"), dict) and data["body"].get("query"):
+            query = data["body"]["query"]
+        elif isinstance(data.get("query"), str) and data["query"]:
+            query = data["query"]
+        elif data.get("searchQuery"):
+            query = data["searchQuery"]
+        query = str(query).strip()
+        if not query or query in ("undefined", "null"):
+            query = "rrr"
+        execution.search_query = query
+        return [{
+            "searchQuery": query,
+            "targetUrl": f"{self.site_url}/search_movies?s={quote(query)}",
+            "timestamp": _now(),
+        }]
+
+    def _playwright_scrape(self, items: Items, execution: Execution) -> Items:
+        parameters = self.nodes["Playwright Scrape"]["parameters"]
+        if random.random() < self.failure_rate:
+            raise SimulatedFailure("simulated scrape failure")
+        response = httpx.get(items[0]["targetUrl"], timeout=30, follow_redirects=True)
+        wait_ms = self.scrape_wait_ms if self.scrape_wait_ms is not None else parameters.get("waitTime", 0)
+        time.sleep(wait_ms / 1000)
+        return [{"html": response.text, "url": items[0]["targetUrl"]}]
+
+    def _parse_movie_results(self, items: Items, execution: Execution) -> Items:
+        html = items[0].get("html") or items[0].get("content") or ""
+        return parse_movie_results(html, execution.search_query, self.site_url)
+
+    def _format_final_results(self, items: Items, execution: Execution) -> Items:
+        search_query = items[0].get("searchQuery", "rrr") if items else "rrr"
+        unique, seen = [], set()
+        for movie in items:
+            title = movie["title"].lower().strip()
+            if title not in seen:
+                seen.add(title)
+                unique.append(movie)
+        unique.sort(key=lambda movie: search_query.lower() not in movie["title"].lower())
+        if self.payload_movies is not None:
+            unique = self._sized(unique, self.payload_movies)
+        return [{
+            "searchQuery": search_query,
+            "totalResults": len(unique),
+            "source": "5movierulz.villas",
+            "scrapedAt": _now(),
+            "scrapeMethod": "http-request-advanced",
+            "status": "success",
+            "movies": unique,
+        }]
+
+    @staticmethod
+    def _sized(movies: Items, count: int) -> Items:
+        """Trim or pad (with numbered copies) to exactly count movies"""
+        if not movies or len(movies) >= count:
+            return movies[:count]
+        padded = list(movies)
+        while len(padded) < count:
+            template = movies[len(padded) % len(movies)]
+            padded.append({**template, "title": f"{template['title']} #{len(padded) + 1}"})
+        return padded
+
+    def _send_to_app(self, items: Items, execution: Execution) -> Items:
+        options = self.nodes["Send to Your App"]["parameters"].get("options", {})
+        if self.delay:
+            time.sleep(self.delay)
+        response = httpx.post(
+            f"{self.app_url}/api/append-results",
+            json=items[0],
+            headers=options.get("headers", {}),
+            timeout=options.get("timeout", 30000) / 1000,
+        )
+        execution.callback_status = response.status_code
+        response.raise_for_status()
+        return [response.json()]
+
+    def _webhook_response(self, items: Items, execution: Execution) -> Items:
+        data = items[0] if items else {}
+        return [{
+            "success": True,
+            "message": "Movie scraping completed successfully",
+            "searchQuery": data.get("searchQuery", "unknown"),
+            "totalResults": data.get("totalResults", 0),
+            "timestamp": _now(),
+        }]
+
+    def _node_runner(self, name: str) -> Callable[[Items, Execution], Items]:
+        node = self.nodes[name]
+        if node["type"] == "n8n-nodes-base.filter":
+            keep = build_filter(node["parameters"])
+            return lambda items, execution: keep(items)
+        runners = {
+            "Prepare Search Data": self._prepare_search_data,
+            "Playwright Scrape": self._playwright_scrape,
+            "Parse Movie Results": self._parse_movie_results,
+            "Format Final Results": self._format_final_results,
+            "Send to Your App": self._send_to_app,
+            "Webhook Response": self._webhook_response,
+        }
+        if name not in runners:
+            raise ValueError(f"node '{name}' ({node['type']}) is not simulated")
+        return runners[name]
+
+    def _execute(self, execution: Execution):
+        items: Items = [execution.input]
+        try:
+            for name in self.chain[1:]:
+                start = time.perf_counter()
+                try:
+                    items = self._node_runner(name)(items, execution)
+                finally:
+                    execution.node_ms[name] = (time.perf_counter() - start) * 1000
+                if not items:
+                    # n8n stops a branch that produced no items
+                    break
+            execution.status = "success"
+            self.counts["succeeded"] += 1
+        except Exception as e:
+            execution.status = "failed"
+            execution.error = f"{type(e).__name__}: {e}"
+            self.counts["failed"] += 1
+
+    # --- lifecycle -------------------------------------------------------
+
+    def stats(self) -> Dict:
+        with self._lock:
+            recent = [execution.to_dict() for execution in self.executions[-20:]]
+        return {"webhook_url": self.webhook_url, "chain": self.chain, **self.counts, "recent": recent}
+
+    def start(self) -> "WorkflowSimulator":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "WorkflowSimulator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=5678)
+    parser.add_argument("--app-url", default="http://127.0.0.1:8000", help="where Send to Your App posts")
+    parser.add_argument("--site-url", help="site to scrape (default: a local fixture server)")
+    parser.add_argument("--workflow", default=WORKFLOW_PATH)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="extra delay before the callback")
+    parser.add_argument("--scrape-wait-ms", type=float, help="override the scrape node's waitTime")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of executions that fail")
+    parser.add_argument("--payload-movies", type=int, help="trim/pad callbacks to this many movies")
+    parser.add_argument("--site-latency-ms", type=float, default=0.0, help="fixture server delay per request")
+    args = parser.parse_args()
+
+    fixture = None
+    site_url = args.site_url
+    if not site_url:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from fixture_server import FixtureServer
+        fixture = FixtureServer(latency_ms=args.site_latency_ms).start()
+        site_url = fixture.base_url
+
+    simulator = WorkflowSimulator(
+        args.app_url, site_url, args.workflow, delay_ms=args.delay_ms, failure_rate=args.failure_rate,
+        payload_movies=args.payload_movies, scrape_wait_ms=args.scrape_wait_ms, port=args.port,
+    )
+    print(f"Webhook: {simulator.webhook_method} {simulator.webhook_url} -> {args.app_url}/api/append-results")
+    print(f"Site: {site_url}, chain: {' -> '.join(simulator.chain)}")
+    print(f"Stats: http://127.0.0.1:{args.port}/stats, Ctrl+C to stop")
+    try:
+        simulator._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator._httpd.server_close()
+        if fixture:
+            fixture.stop()
+
+if __name__ == "__main__":
+    main()
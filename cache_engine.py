@@ -0,0 +1,139 @@
+"""
+In-memory cache engine
+O(1) LRU map with per-entry TTLs, bounded by entry count and approximate
+payload bytes, with hit/miss/eviction counters. Never forces a GC pass.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from tracing import log
+
+class LRUTTLCache:
+    """LRU cache bounded by entry count and approximate payload bytes"""
+
+    def __init__(self, max_size: int = 50, max_bytes: int = 2 * 1024 * 1024, default_ttl: int = 3600):
+        # key -> (value, expires_at, size_bytes); order is least -> most recently used
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _estimate_size(value) -> int:
+        """Approximate payload size from its JSON encoding"""
+        try:
+            return len(json.dumps(value, default=str))
+        except Exception:
+            return len(repr(value))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def get(self, key: str) -> Optional[Any]:
+        found = self.get_with_ttl(key)
+        return found[0] if found is not None else None
+
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """Return (value, remaining_ttl_seconds) or None; remaining is None without expiry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        remaining = None
+        if expires_at is not None:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value, remaining
+
+    def peek(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """get_with_ttl() without touching hit/miss counters or LRU order"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        remaining = expires_at - time.monotonic() if expires_at is not None else None
+        if remaining is not None and remaining <= 0:
+            return None
+        return value, remaining
+
+    def set(self, key: str, value: Any, ttl: int = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        size = self._estimate_size(value)
+
+        self._remove(key)
+        if size > self.max_bytes:
+            # A single oversized payload would flush the whole cache
+            log(f"⚠️ Not caching '{key}': {size} bytes exceeds cache budget")
+            return
+
+        expires_at = time.monotonic() + ttl if ttl and ttl > 0 else None
+        self._entries[key] = (value, expires_at, size)
+        self.current_bytes += size
+
+        # Evict least recently used entries until both budgets are met
+        while len(self._entries) > self.max_size or self.current_bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._remove(key)
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry (O(n), for background maintenance only)"""
+        now = time.monotonic()
+        expired = [key for key, (_, expires_at, _) in self._entries.items()
+                   if expires_at is not None and expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def trim(self, max_entries: int) -> int:
+        """Evict least recently used entries down to max_entries"""
+        removed = 0
+        while len(self._entries) > max_entries:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+            removed += 1
+        return removed
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_size,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,184 @@
+"""
+Single-roundtrip DOM extraction for search result cards
+Runs inside the page and returns every card as plain JSON, so scrapers
+don't pay one Playwright IPC call per element, link and attribute.
+parse_cards_html produces the same card shape from raw HTML, for paths
+that fetch pages without a browser.
+"""
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from tracing import log
+
+# Selectors whose first match is treated as a card's heading, in priority order
+TITLE_SELECTORS = ['h1', 'h2', 'h3', 'h4', '.title', '.movie-title', '.post-title', '.entry-title']
+
+CARD_EXTRACTION_JS = """
+({selectors, limit, dedupe, titleSelectors}) => {
+    // FNV-1a over innerHTML: identical markup -> identical key
+    const hashKey = (str) => {
+        let h = 0x811c9dc5;
+        for (let i = 0; i < str.length; i++) {
+            h ^= str.charCodeAt(i);
+            h = Math.imul(h, 0x01000193) >>> 0;
+        }
+        return h.toString(16) + ':' + str.length;
+    };
+
+    const cards = [];
+    const seen = new Set();
+
+    for (const selector of selectors) {
+        let elements;
+        try {
+            elements = document.querySelectorAll(selector);
+        } catch (e) {
+            continue;
+        }
+
+        for (const el of elements) {
+            if (cards.length >= limit) {
+                return cards;
+            }
+
+            const key = hashKey(el.innerHTML);
+            if (dedupe) {
+                if (seen.has(key)) {
+                    continue;
+                }
+                seen.add(key);
+            }
+
+            let heading = null;
+            for (const titleSelector of titleSelectors) {
+                const titleEl = el.querySelector(titleSelector);
+                if (titleEl) {
+                    heading = titleEl.innerText;
+                    break;
+                }
+            }
+
+            const text = el.innerText || '';
+            const genreEl = el.querySelector('.genre, .category, .meta');
+
+            cards.push({
+                key: key,
+                selector: selector,
+                text: text,
+                lines: text.split('\\n').map(line => line.trim()).filter(line => line),
+                href: el.getAttribute('href'),
+                title_attr: el.getAttribute('title'),
+                heading: heading,
+                genre: genreEl ? genreEl.innerText : null,
+                links: Array.from(el.querySelectorAll('a')).map(a => ({
+                    href: a.getAttribute('href'),
+                    text: a.innerText || '',
+                })),
+                images: Array.from(el.querySelectorAll('img')).map(img => ({
+                    src: img.getAttribute('src'),
+                    alt: img.getAttribute('alt'),
+                })),
+            });
+        }
+    }
+
+    return cards;
+}
+"""
+
+async def extract_cards(page, selectors: Sequence[str], limit: int = 100, dedupe: bool = True) -> List[Dict]:
+    """Collect card data for every element matching selectors in one evaluate call.
+
+    Elements are visited selector by selector in document order. With dedupe,
+    elements whose innerHTML was already seen are skipped (same rule the
+    scrapers used to apply with per-element inner_html calls).
+    """
+    return await page.evaluate(
+        CARD_EXTRACTION_JS,
+        {
+            "selectors": list(selectors),
+            "limit": limit,
+            "dedupe": dedupe,
+            "titleSelectors": TITLE_SELECTORS,
+        },
+    )
+
+@lru_cache(maxsize=1)
+def _html_parser() -> str:
+    """lxml if installed; resolved once, warning once on the slower fallback"""
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        log("⚠️ lxml not installed: card extraction falls back to the slower html.parser")
+        return "html.parser"
+
+def _element_text(element) -> str:
+    """Approximate innerText: one line per text node, blank lines dropped"""
+    return "\n".join(element.stripped_strings)
+
+def parse_cards_html(html: str, selectors: Sequence[str], limit: int = 100, dedupe: bool = True) -> List[Dict]:
+    """Build extract_cards-shaped card dicts from an HTML string (no browser)"""
+    soup = BeautifulSoup(html, _html_parser())
+    cards = []
+    seen = set()
+    
+    for selector in selectors:
+        try:
+            elements = soup.select(selector)
+        except Exception:
+            continue
+        
+        for element in elements:
+            if len(cards) >= limit:
+                return cards
+            
+            inner_html = element.decode_contents()
+            key = f"{hashlib.md5(inner_html.encode('utf-8')).hexdigest()[:8]}:{len(inner_html)}"
+            if dedupe:
+                if key in seen:
+                    continue
+                seen.add(key)
+            
+            heading = None
+            for title_selector in TITLE_SELECTORS:
+                title_element = element.select_one(title_selector)
+                if title_element is not None:
+                    heading = _element_text(title_element)
+                    break
+            
+            text = _element_text(element)
+            genre_element = element.select_one('.genre, .category, .meta')
+            
+            cards.append({
+                "key": key,
+                "selector": selector,
+                "text": text,
+                "lines": [line.strip() for line in text.split("\n") if line.strip()],
+                "href": element.get("href"),
+                "title_attr": element.get("title"),
+                "heading": heading,
+                "genre": _element_text(genre_element) if genre_element is not None else None,
+                "links": [
+                    {"href": a.get("href"), "text": _element_text(a)}
+                    for a in element.select("a")
+                ],
+                "images": [
+                    {"src": img.get("src"), "alt": img.get("alt")}
+                    for img in element.select("img")
+                ],
+            })
+    
+    return cards
+
+def first_link_href_html(html: str, selectors: Sequence[str]) -> Optional[str]:
+    """href of the first element matching the first selector that matches anything"""
+    soup = BeautifulSoup(html, _html_parser(), parse_only=SoupStrainer(['a', 'iframe']))
+    for selector in selectors:
+        element = soup.select_one(selector)
+        if element is not None and element.get("href"):
+            return element.get("href")
+    return None
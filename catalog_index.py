@@ -0,0 +1,284 @@
+"""
+Background catalog crawler and local inverted index
+Walks the homepage and category listings ahead of time instead of at
+query time. Pages whose content hash is unchanged since the last crawl
+are skipped, and every listed movie lands in a token -> movie_page index
+so searches can be answered without touching the site.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import urljoin
+
+from card_extractor import parse_cards_html
+from suggest_index import normalize_title
+from tracing import log, log_error
+
+LANGUAGES = ('telugu', 'tamil', 'hindi', 'malayalam', 'kannada', 'bengali', 'english', 'marathi', 'punjabi')
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+# Category/genre links on the homepage, e.g. /category/telugu-movie/
+CATEGORY_LINK_RE = re.compile(r'/(category|genre)/', re.I)
+MOVIE_LINK_MARKER = 'movie-watch-online-free'
+
+def tokenize(text: str) -> List[str]:
+    return normalize_title(text).split()
+
+def extract_year(title: str) -> Optional[str]:
+    match = _YEAR_RE.search(title)
+    return match.group(0) if match else None
+
+def extract_language(*texts: str) -> Optional[str]:
+    for text in texts:
+        lowered = (text or '').lower()
+        for language in LANGUAGES:
+            if language in lowered:
+                return language.capitalize()
+    return None
+
+def listing_entries(html: str, page_url: str, selectors: Iterable[str]) -> List[Dict]:
+    """Movie entries (title, movie_page, poster, year, language) from a listing page"""
+    entries = []
+    seen = set()
+    for card in parse_cards_html(html, list(selectors), limit=500, dedupe=True):
+        link = next((link for link in card['links'] if link['href'] and MOVIE_LINK_MARKER in link['href']), None)
+        if link is None:
+            continue
+        movie_page = urljoin(page_url, link['href'])
+        if movie_page in seen:
+            continue
+
+        title = (card['heading'] or card['title_attr'] or link['text'] or
+                 (card['lines'][0] if card['lines'] else '')).strip()
+        if not title:
+            continue
+        seen.add(movie_page)
+
+        image = next((img for img in card['images'] if img['src']), None)
+        entries.append({
+            'title': title,
+            'movie_page': movie_page,
+            'poster': urljoin(page_url, image['src']) if image else None,
+            'year': extract_year(title),
+            'language': extract_language(title, movie_page),
+        })
+    return entries
+
+def category_links(html: str, page_url: str, limit: int) -> List[str]:
+    """Distinct category/genre listing URLs linked from a page"""
+    links = []
+    for card in parse_cards_html(html, ['a[href]'], limit=1000, dedupe=False):
+        href = card['href']
+        if href and CATEGORY_LINK_RE.search(href):
+            url = urljoin(page_url, href)
+            if url not in links:
+                links.append(url)
+                if len(links) >= limit:
+                    break
+    return links
+
+class CatalogIndex:
+    """Inverted token index over crawled movie entries, bounded by entry count"""
+
+    def __init__(self, max_entries: int = 3000):
+        self.max_entries = max_entries
+        # movie_page -> entry; order is least -> most recently seen
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        # token -> movie_pages whose title/year/language contains it
+        self._postings: Dict[str, Set[str]] = {}
+        # movie_page -> insertion sequence, for recency ordering of matches
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        self.evictions = 0
+        self.lookups = 0
+        self.hits = 0
+
+    @staticmethod
+    def _tokens(entry: Dict) -> Set[str]:
+        tokens = set(tokenize(entry['title']))
+        for field in ('year', 'language'):
+            if entry.get(field):
+                tokens.update(tokenize(entry[field]))
+        return tokens
+
+    def _unindex(self, movie_page: str, entry: Dict):
+        for token in self._tokens(entry):
+            pages = self._postings.get(token)
+            if pages is not None:
+                pages.discard(movie_page)
+                if not pages:
+                    del self._postings[token]
+
+    def upsert(self, entry: Dict):
+        movie_page = entry['movie_page']
+        previous = self._entries.pop(movie_page, None)
+        if previous is not None:
+            self._unindex(movie_page, previous)
+
+        self._entries[movie_page] = entry
+        self._next_seq += 1
+        self._seq[movie_page] = self._next_seq
+        for token in self._tokens(entry):
+            self._postings.setdefault(token, set()).add(movie_page)
+
+        while len(self._entries) > self.max_entries:
+            evicted_page, evicted = self._entries.popitem(last=False)
+            self._unindex(evicted_page, evicted)
+            del self._seq[evicted_page]
+            self.evictions += 1
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Entries containing every query token; title-prefix matches first"""
+        self.lookups += 1
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        # Intersect from the rarest token so the working set stays small
+        postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+        matches = set(postings[0])
+        for pages in postings[1:]:
+            matches &= pages
+            if not matches:
+                break
+        if not matches:
+            return []
+
+        normalized = " ".join(tokens)
+        # Title-prefix matches first, most recently seen first within each group
+        ordered = sorted(matches, key=lambda page: (
+            not normalize_title(self._entries[page]['title']).startswith(normalized), -self._seq[page]
+        ))
+        self.hits += 1
+        return [self._entries[page] for page in ordered[:limit]]
+
+    def clear(self):
+        self._entries.clear()
+        self._postings.clear()
+        self._seq.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "tokens": len(self._postings),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "evictions": self.evictions,
+        }
+
+class CatalogCrawler:
+    """Periodically crawl the homepage and its category listings into a CatalogIndex"""
+
+    def __init__(self, index: CatalogIndex, home_url: str, fetch: Callable[[str], Awaitable[Optional[str]]],
+                 selectors: Iterable[str], interval: float = 1800, max_categories: int = 10,
+                 on_entries: Optional[Callable[[List[Dict]], None]] = None):
+        self.index = index
+        self.home_url = home_url
+        # fetch(url) -> HTML, or None when the page is unusable (error, challenge)
+        self.fetch = fetch
+        self.selectors = list(selectors)
+        self.interval = interval
+        self.max_categories = max_categories
+        self.on_entries = on_entries
+        # page_url -> sha1 of the last body / last extracted entries
+        self._body_hashes: Dict[str, str] = {}
+        self._entry_hashes: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.crawls = 0
+        self.pages_fetched = 0
+        self.pages_unchanged = 0
+        self.pages_indexed = 0
+        self.errors = 0
+        self.last_crawl_at: Optional[float] = None
+        self.last_crawl_seconds: Optional[float] = None
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    async def crawl_page(self, url: str) -> Optional[str]:
+        """Fetch one listing and index it unless unchanged; returns the HTML"""
+        try:
+            html = await self.fetch(url)
+        except Exception as e:
+            self.errors += 1
+            log_error(f"❌ Catalog crawl failed for {url}: {e}")
+            return None
+        if html is None:
+            return None
+        self.pages_fetched += 1
+
+        body_hash = self._digest(html)
+        if self._body_hashes.get(url) == body_hash:
+            self.pages_unchanged += 1
+            return html
+        self._body_hashes[url] = body_hash
+
+        entries = await asyncio.to_thread(listing_entries, html, url, self.selectors)
+        # Rotating ads/nonces change the body but not the listing itself
+        entry_hash = self._digest(repr(entries))
+        if self._entry_hashes.get(url) == entry_hash:
+            self.pages_unchanged += 1
+            return html
+        self._entry_hashes[url] = entry_hash
+
+        for entry in entries:
+            self.index.upsert(entry)
+        if self.on_entries is not None and entries:
+            self.on_entries(entries)
+        self.pages_indexed += 1
+        log(f"🗂️ Indexed {len(entries)} movies from {url}")
+        return html
+
+    async def crawl(self):
+        """One pass: homepage first, then the category pages it links to"""
+        start = time.monotonic()
+        home_html = await self.crawl_page(self.home_url)
+        if home_html is not None:
+            for url in category_links(home_html, self.home_url, self.max_categories):
+                await self.crawl_page(url)
+        self.crawls += 1
+        self.last_crawl_at = time.time()
+        self.last_crawl_seconds = round(time.monotonic() - start, 2)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.crawl()
+            except Exception as e:
+                self.errors += 1
+                log_error(f"❌ Catalog crawl pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "crawls": self.crawls,
+            "pages_fetched": self.pages_fetched,
+            "pages_unchanged": self.pages_unchanged,
+            "pages_indexed": self.pages_indexed,
+            "errors": self.errors,
+            "last_crawl_at": self.last_crawl_at,
+            "last_crawl_seconds": self.last_crawl_seconds,
+            "index": self.index.stats(),
+        }
@@ -0,0 +1,80 @@
+"""
+Per-request deadline budget
+A request sets one Deadline; every stage below it reads the deadline from
+a ContextVar (tasks inherit it), caps its own timeouts at what is left,
+and is skipped when the remainder is too small to be useful. Skipped and
+cut-short stages are recorded so the response can say it is partial.
+Outside a request (background refreshes, the crawler) nothing is capped.
+"""
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from tracing import log
+
+class DeadlineExceeded(Exception):
+    """Not enough of the request's budget left to start a stage"""
+
+class Deadline:
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        # Stages never started / stopped early for lack of time
+        self.skipped: List[str] = []
+        self.cut: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def fork(self) -> "Deadline":
+        """Same expiry, own skipped/cut records (e.g. for work shared with other callers)"""
+        forked = Deadline(self.budget)
+        forked.expires_at = self.expires_at
+        return forked
+
+    def extend(self, other: Optional["Deadline"]):
+        """Push the expiry out to other's; None means no deadline at all"""
+        self.expires_at = float("inf") if other is None else max(self.expires_at, other.expires_at)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.skipped or self.cut)
+
+    def _note(self, stages: List[str], stage: str):
+        if stage not in stages:
+            stages.append(stage)
+
+    def stats(self) -> Dict:
+        return {
+            "budget": self.budget,
+            "remaining": round(self.remaining(), 2),
+            "skipped": list(self.skipped),
+            "cut": list(self.cut),
+        }
+
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+def remaining_timeout(default: float) -> float:
+    """default, capped at the current request's remaining budget"""
+    deadline = current_deadline.get()
+    return default if deadline is None else min(default, deadline.remaining())
+
+def stage_allowed(stage: str, needed: float) -> bool:
+    """True if at least `needed` seconds are left; otherwise the stage is recorded as skipped"""
+    deadline = current_deadline.get()
+    if deadline is None or deadline.remaining() >= needed:
+        return True
+    deadline._note(deadline.skipped, stage)
+    log(f"⏳ Skipping {stage}: {deadline.remaining():.1f}s left of the {deadline.budget:.0f}s budget")
+    return False
+
+def require_budget(stage: str, needed: float):
+    """stage_allowed() that raises DeadlineExceeded instead of returning False"""
+    if not stage_allowed(stage, needed):
+        raise DeadlineExceeded(f"{stage} needs {needed:.1f}s")
+
+def note_cut(stage: str):
+    """Record that a stage was stopped early by the deadline"""
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline._note(deadline.cut, stage)
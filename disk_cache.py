@@ -0,0 +1,262 @@
+"""
+Persistent SQLite cache tier
+Sits behind the in-memory LRU so popular queries survive restarts and
+sleep cycles. Reads happen lazily on a memory miss, writes are queued and
+flushed in batches on a worker thread, and the file is kept under a byte
+budget by evicting least recently used rows.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from tracing import log, log_error
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+class SQLiteCacheTier:
+    """Second-level cache: JSON values with TTLs in a single SQLite file"""
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024,
+                 flush_interval: float = 2.0, batch_size: int = 50):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        # key -> (json_value, expires_at) waiting to be written
+        self._pending: Dict[str, Tuple[str, Optional[float]]] = {}
+        # Keys deleted while a batch was being written; that batch must not
+        # resurrect them. Guarded by _state_lock, cleared once no batch is in flight.
+        self._state_lock = threading.Lock()
+        self._batches_in_flight = 0
+        self._deleted: Set[str] = set()
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    # --- blocking helpers, always run on a worker thread -------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _read(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        with self._db_lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if row[1] is not None and row[1] <= now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row
+
+    def _write_batch(self, batch: Dict[str, Tuple[str, Optional[float]]]) -> int:
+        """Upsert a batch, drop expired rows, then evict LRU rows over budget"""
+        try:
+            with self._db_lock:
+                with self._state_lock:
+                    deleted = self._deleted & batch.keys()
+                conn = self._connect()
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, expires_at, size, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    [(key, value, expires_at, len(value), now)
+                     for key, (value, expires_at) in batch.items() if key not in deleted],
+                )
+                conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+                evicted = 0
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total > self.max_bytes:
+                    for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                        total -= size
+                        evicted += 1
+                conn.commit()
+                return evicted
+        finally:
+            # Runs when the thread is really done, even if the awaiting flush was cancelled
+            with self._state_lock:
+                self._batches_in_flight -= 1
+                if not self._batches_in_flight:
+                    self._deleted.clear()
+
+    def _summary(self) -> Tuple[int, int]:
+        with self._db_lock:
+            conn = self._connect()
+            return conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+    def _delete(self, key: str):
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            conn.commit()
+
+    def _clear(self):
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+    def _close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- async API ---------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """Return (value, remaining_ttl_seconds) or None"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            value, expires_at = pending
+        else:
+            try:
+                row = await asyncio.to_thread(self._read, key)
+            except Exception as e:
+                self.errors += 1
+                log_error(f"❌ Disk cache read failed: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires_at = row
+
+        remaining = expires_at - time.time() if expires_at is not None else None
+        if remaining is not None and remaining <= 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value), remaining
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Queue a write; returns immediately, the flusher persists it later"""
+        try:
+            encoded = json.dumps(value, default=str)
+        except Exception as e:
+            self.errors += 1
+            log(f"⚠️ Not persisting '{key}': {e}")
+            return
+        if len(encoded) > self.max_bytes:
+            return
+
+        with self._state_lock:
+            # A newer value supersedes the delete; it is written after any in-flight batch
+            self._deleted.discard(key)
+        self._pending[key] = (encoded, time.time() + ttl if ttl and ttl > 0 else None)
+        self._ensure_flusher()
+        # Wake the flusher for the first queued write and again when a batch fills
+        if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+            self._flush_event.set()
+
+    def _ensure_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._flush_event = asyncio.Event()
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        """Sleep until writes are queued, let the batch fill briefly, then flush"""
+        while True:
+            await self._flush_event.wait()
+            self._flush_event.clear()
+            if len(self._pending) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write every queued entry in one transaction on a worker thread"""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        with self._state_lock:
+            self._batches_in_flight += 1
+        try:
+            evicted = await asyncio.to_thread(self._write_batch, batch)
+            self.writes += len(batch)
+            self.evictions += evicted
+        except asyncio.CancelledError:
+            # Keep the batch for the final flush; newer queued values win, deleted keys stay gone
+            with self._state_lock:
+                kept = {key: entry for key, entry in batch.items() if key not in self._deleted}
+            self._pending = {**kept, **self._pending}
+            raise
+        except Exception as e:
+            self.errors += 1
+            log_error(f"❌ Disk cache flush failed: {e}")
+
+    async def delete(self, key: str):
+        """Drop a key, including from a batch a flush is writing right now"""
+        self._pending.pop(key, None)
+        with self._state_lock:
+            if self._batches_in_flight:
+                self._deleted.add(key)
+        await asyncio.to_thread(self._delete, key)
+
+    async def clear(self):
+        self._pending.clear()
+        await asyncio.to_thread(self._clear)
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+        await asyncio.to_thread(self._close)
+
+    async def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        try:
+            entries, size = await asyncio.to_thread(self._summary)
+        except Exception:
+            entries, size = None, None
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "pending_writes": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
@@ -3,90 +3,407 @@ Render.com Optimized Backend - 512MB RAM / 1 vCPU
 Ultra-lightweight with aggressive memory management
 """
 from fastapi import FastAPI, Request, BackgroundTasks
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 import uvicorn
 import httpx
 import asyncio
 import gc
-import psutil
 import os
-from typing import List, Dict, Optional
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Tuple
 import time
 import json
 import hashlib
+from urllib.parse import quote, urljoin
+
+from admission import BACKGROUND, INTERACTIVE, AdmissionRejected, ScrapeScheduler
+from cache_engine import LRUTTLCache
+from catalog_index import CatalogCrawler, CatalogIndex
+from deadline import (Deadline, DeadlineExceeded, current_deadline, note_cut, remaining_timeout,
+                      require_budget, stage_allowed)
+from card_extractor import extract_cards, first_link_href_html, parse_cards_html
+from disk_cache import SQLiteCacheTier
+from memory_governor import MemoryGovernor, SheddingTier, process_tree_rss_mb
+from metrics import MetricsRegistry
+from mirrors import mirror_registry
+from resource_blocking import resource_blocker
+from scrape_engine import ChallengeDetected, ScrapeTier, TieredScrapeEngine, is_challenge_title, looks_like_challenge
+from stream_cache import STREAM_HOSTS, stream_url_cache
+from suggest_index import PrefixIndex
+from tracing import TracingMiddleware, log, log_error, record_span, span
+
+# Shared HTTP client (created in lifespan, reused for every outbound call)
+http_client: Optional[httpx.AsyncClient] = None
+
+def create_http_client() -> httpx.AsyncClient:
+    """Keep-alive client; HTTP/2 when the optional h2 package is installed"""
+    try:
+        import h2  # noqa: F401
+        http2 = os.environ.get("HTTP2_ENABLED", "1") != "0"
+    except ImportError:
+        http2 = False
+    
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(20.0, connect=5.0),
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60.0),
+        headers={"User-Agent": "FastAPI-Movie-Search/1.0"},
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the app-lifetime client, creating it lazily outside lifespan"""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = create_http_client()
+    return http_client
 
 async def cleanup():
     """Cleanup on shutdown"""
-    global browser_instance
-    if browser_instance:
-        await browser_instance.close()
-        print("🔒 Browser cleaned up")
+    global browser_instance, http_client
+    if http_client:
+        await http_client.aclose()
+        http_client = None
+    await memory_governor.stop()
+    await catalog_crawler.stop()
+    if DISK_CACHE_ENABLED:
+        await disk_cache.close()
+    await browser_pool.close()
+    await close_browser()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("🚀 FastAPI app starting up...")
+    log("🚀 FastAPI app starting up...")
+    get_http_client()
+    if os.environ.get("BROWSER_POOL_WARM", "1") != "0":
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            # Searches will retry the warm-up lazily on first use
+            log_error(f"⚠️ Browser pool warm-up failed: {e}")
+    if CATALOG_CRAWL_INTERVAL > 0:
+        catalog_crawler.start()
+    if MEMORY_SAMPLE_INTERVAL > 0:
+        memory_governor.start()
     yield
     # Shutdown
     await cleanup()
 
 app = FastAPI(title="Render Optimized Movie Search", lifespan=lifespan)
+# Per-request span tree; /api/search responses carry it as a Server-Timing header
+app.add_middleware(TracingMiddleware, timing_paths=("/api/search",))
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-# Ultra-lightweight cache (in-memory only)
-class UltraLightCache:
-    def __init__(self, max_size: int = 50):  # Limit cache size
-        self.cache = {}
-        self.access_times = {}
-        self.max_size = max_size
-    
-    def _cleanup_if_needed(self):
-        """Remove oldest entries if cache is full"""
-        if len(self.cache) >= self.max_size:
-            # Remove 20% of oldest entries
-            sorted_items = sorted(self.access_times.items(), key=lambda x: x[1])
-            to_remove = sorted_items[:self.max_size // 5]
-            
-            for key, _ in to_remove:
-                self.cache.pop(key, None)
-                self.access_times.pop(key, None)
-            
-            gc.collect()  # Force garbage collection
+# Global lightweight cache
+cache = LRUTTLCache(max_size=30, max_bytes=2 * 1024 * 1024)  # Very small cache for Render
+
+# Persistent second tier behind the in-memory cache (DISK_CACHE=0 disables it)
+DISK_CACHE_ENABLED = os.environ.get("DISK_CACHE", "1") != "0"
+disk_cache = SQLiteCacheTier(
+    os.environ.get("CACHE_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "search_cache.db")),
+    max_bytes=int(os.environ.get("CACHE_DISK_MAX_BYTES", str(50 * 1024 * 1024))),
+)
+# Render sets RENDER; its service filesystem doesn't survive deploys without a mounted disk
+if DISK_CACHE_ENABLED and os.environ.get("RENDER") and "CACHE_DB_PATH" not in os.environ:
+    log("⚠️ CACHE_DB_PATH is unset: the disk cache is on Render's ephemeral filesystem and won't survive deploys")
+
+# Prometheus metrics, rendered at /metrics
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram(
+    "movie_search_stage_seconds", "Time spent in each search stage", ("stage", "path")
+)
+search_seconds = metrics.histogram(
+    "movie_search_request_seconds", "End-to-end /api/search latency by answering source", ("source",)
+)
+cache_requests = metrics.counter(
+    "movie_search_cache_requests_total", "Search cache lookups by key type and result", ("key_type", "result"),
+    collect=lambda: [
+        ({"key_type": "stream_url", "result": result}, stream_url_cache.stats()[stats_key])
+        for result, stats_key in (("hit", "hits"), ("miss", "misses"))
+    ],
+)
+
+@contextmanager
+def stage(name: str, path: str):
+    """Time a search stage as a trace span and in the stage histogram"""
+    start = time.perf_counter()
+    try:
+        with span(name, path=path):
+            yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage=name, path=path)
+
+def record_stage(name: str, path: str, duration: float):
+    """Same as stage() for a duration measured by hand"""
+    record_span(name, duration, path=path)
+    stage_seconds.observe(duration, stage=name, path=path)
+
+def cache_key_type(key: str) -> str:
+    # Everything else in the search cache is keyed "{query}_{max_results}"
+    return "n8n_results" if key.startswith("n8n_results_") else "local_results"
+
+# Stale-while-revalidate for search results: entries are fresh for the soft
+# TTL, then served as stale (and refreshed in the background) until the hard TTL
+SEARCH_SOFT_TTL = int(os.environ.get("SEARCH_SOFT_TTL", "600"))
+SEARCH_HARD_TTL = int(os.environ.get("SEARCH_HARD_TTL", "3600"))
+
+async def cache_lookup(key: str) -> Optional[Tuple[Any, Optional[float]]]:
+    """Look up memory first, then lazily load from disk and promote.
+
+    Returns (value, remaining_ttl_seconds) or None; remaining is None for
+    entries without expiry.
+    """
+    key_type = cache_key_type(key)
+    found = cache.get_with_ttl(key)
+    if found is not None or not DISK_CACHE_ENABLED:
+        cache_requests.inc(key_type=key_type, result="hit" if found is not None else "miss")
+        return found
     
-    def get(self, key: str) -> Optional[List[Dict]]:
-        if key in self.cache:
-            self.access_times[key] = time.time()
-            return self.cache[key]
+    found = await disk_cache.get(key)
+    cache_requests.inc(key_type=key_type, result="disk_hit" if found is not None else "miss")
+    if found is None:
         return None
     
-    def set(self, key: str, value: List[Dict], ttl: int = None):
-        self._cleanup_if_needed()
-        self.cache[key] = value
-        self.access_times[key] = time.time()
+    value, remaining_ttl = found
+    # ttl=0 means "no expiry" for entries persisted without one
+    cache.set(key, value, ttl=remaining_ttl if remaining_ttl is not None else 0)
+    return found
 
-# Global lightweight cache
-cache = UltraLightCache(max_size=30)  # Very small cache for Render
+async def cache_get(key: str) -> Optional[Any]:
+    found = await cache_lookup(key)
+    return found[0] if found is not None else None
+
+def is_stale(remaining_ttl: Optional[float]) -> bool:
+    """Past the soft TTL of an entry stored with the hard TTL"""
+    return remaining_ttl is not None and remaining_ttl < SEARCH_HARD_TTL - SEARCH_SOFT_TTL
+
+def cache_set(key: str, value: Any, ttl: int = None):
+    """Store in memory now; the disk write is batched off the event loop"""
+    cache.set(key, value, ttl=ttl)
+    if DISK_CACHE_ENABLED:
+        disk_cache.put(key, value, ttl=cache.default_ttl if ttl is None else ttl)
+
+async def cache_delete(key: str):
+    cache.delete(key)
+    if DISK_CACHE_ENABLED:
+        await disk_cache.delete(key)
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for use in cache keys"""
+    return " ".join(query.lower().split())
+
+def n8n_results_key(query: str) -> str:
+    return f"n8n_results_{normalize_query(query)}"
+
+def local_results_key(query: str, max_results: int = 10) -> str:
+    return f"{normalize_query(query)}_{max_results}"
+
+def search_flight_key(query: str, use_n8n: bool) -> str:
+    return f"search_{normalize_query(query)}_{int(use_n8n)}"
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one in-flight task"""
+
+    def __init__(self):
+        self._calls: Dict[str, Dict] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool, int]:
+        """Return (result, joined_existing_call, waiters_joined)"""
+        call = self._calls.get(key)
+        if call is not None:
+            call["waiters"] += 1
+            self.coalesced += 1
+            log(f"🔗 Coalesced search '{key}' ({call['waiters']} waiting)")
+            # Shield so one client disconnecting doesn't cancel the shared work
+            result = await asyncio.shield(call["task"])
+            return result, True, call["waiters"]
+
+        task = asyncio.ensure_future(fn())
+        call = {"task": task, "waiters": 0}
+        self._calls[key] = call
+        self.leaders += 1
+        task.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        result = await asyncio.shield(task)
+        return result, False, call["waiters"]
+
+    def running(self, key: str) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+# In-flight /api/search pipelines, keyed by normalized query
+search_flights = SingleFlight()
+
+class ResultWaiters:
+    """Per-key futures completed as soon as a matching payload is stored"""
+
+    def __init__(self):
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+
+    def register(self, key: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(future)
+        return future
+
+    def discard(self, key: str, future: asyncio.Future):
+        waiters = self._waiters.get(key)
+        if not waiters:
+            return
+        if future in waiters:
+            waiters.remove(future)
+        if not waiters:
+            del self._waiters[key]
+
+    def notify(self, key: str, value: Any) -> int:
+        """Complete every waiter for key; returns how many were woken"""
+        woken = 0
+        for future in self._waiters.pop(key, []):
+            if not future.done():
+                future.set_result(value)
+                woken += 1
+        return woken
+
+    def __len__(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+# Requests waiting on n8n callbacks, keyed like the n8n results cache
+n8n_waiters = ResultWaiters()
+
+class BackgroundRefresher:
+    """Run at most one background refresh per key via FastAPI BackgroundTasks"""
+
+    def __init__(self, abandon_after: float = 120.0):
+        # key -> monotonic time the refresh was scheduled
+        self._running: Dict[str, float] = {}
+        # A task that never ran (e.g. the response failed to send) must not block the key forever
+        self.abandon_after = abandon_after
+        self.scheduled = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+
+    def is_running(self, key: str) -> bool:
+        started = self._running.get(key)
+        return started is not None and time.monotonic() - started < self.abandon_after
+
+    def schedule(self, background_tasks: BackgroundTasks, key: str,
+                 fn: Callable[[], Awaitable[Any]]) -> bool:
+        """Queue fn to run after the response; False if a refresh is already running"""
+        if self.is_running(key):
+            self.skipped += 1
+            return False
+        self._running[key] = time.monotonic()
+        self.scheduled += 1
+        background_tasks.add_task(self._run, key, fn)
+        return True
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]):
+        try:
+            await fn()
+            self.completed += 1
+        except Exception as e:
+            self.failed += 1
+            log_error(f"❌ Background refresh failed for '{key}': {e}")
+        finally:
+            self._running.pop(key, None)
+
+    def stats(self) -> Dict:
+        return {
+            "soft_ttl": SEARCH_SOFT_TTL,
+            "hard_ttl": SEARCH_HARD_TTL,
+            "running": sum(1 for key in self._running if self.is_running(key)),
+            "scheduled": self.scheduled,
+            "skipped": self.skipped,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+search_refresher = BackgroundRefresher()
+
+# Typeahead over every title seen from n8n callbacks and the local scrapers
+suggest_index = PrefixIndex(max_titles=int(os.environ.get("SUGGEST_MAX_TITLES", "5000")))
+
+class SearchEventHub:
+    """Fan out progressive search events to streaming subscribers by flight key"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def subscribe(self, key: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(key, []).append(queue)
+        return queue
+
+    def unsubscribe(self, key: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(key)
+        if not subscribers:
+            return
+        if queue in subscribers:
+            subscribers.remove(queue)
+        if not subscribers:
+            del self._subscribers[key]
+
+    def publish(self, key: str, event: Dict):
+        for queue in self._subscribers.get(key, ()):
+            queue.put_nowait(event)
+
+search_events = SearchEventHub()
+# Flight key of the pipeline running in the current task, if any
+search_event_key: ContextVar[Optional[str]] = ContextVar("search_event_key", default=None)
+
+def emit_search_event(event: Dict):
+    key = search_event_key.get()
+    if key is not None:
+        search_events.publish(key, event)
+
+def announce_streaming_url(index: int, streaming_url: Optional[str]):
+    if streaming_url:
+        emit_search_event({"type": "update", "index": index, "fields": {"url": streaming_url}})
+
+def collect_search_events(queue: asyncio.Queue) -> List[Dict]:
+    """Movies announced so far on a subscriber queue, with their updates applied"""
+    movies: Dict[int, Dict] = {}
+    while not queue.empty():
+        event = queue.get_nowait()
+        if event["type"] == "movie":
+            movies[event["index"]] = dict(event["movie"])
+        elif event["type"] == "update" and event["index"] in movies:
+            movies[event["index"]].update(event["fields"])
+    return [movies[index] for index in sorted(movies)]
 
 # Single browser instance (shared across all requests)
 browser_instance = None
+playwright_instance = None
 browser_lock = asyncio.Lock()
 
 async def get_lightweight_browser():
     """Get ultra-lightweight browser for Render"""
-    global browser_instance
+    global browser_instance, playwright_instance
     
     async with browser_lock:
+        if browser_instance is not None and not browser_instance.is_connected():
+            log("⚠️ Browser disconnected - relaunching")
+            browser_instance = None
+        
         if browser_instance is None:
             from playwright.async_api import async_playwright
             
-            playwright = await async_playwright().start()
-            browser_instance = await playwright.chromium.launch(
+            if playwright_instance is None:
+                playwright_instance = await async_playwright().start()
+            browser_instance = await playwright_instance.chromium.launch(
                 headless=True,
                 args=[
                     '--no-sandbox',
@@ -106,113 +423,543 @@ async def get_lightweight_browser():
                     '--single-process',  # Use single process for minimal memory
                 ]
             )
-            print("✅ Ultra-lightweight browser created for Render")
+            log("✅ Ultra-lightweight browser created for Render")
         
         return browser_instance
 
-async def render_optimized_search(query: str, max_results: int = 8) -> List[Dict]:
-    """Ultra-optimized search for Render deployment"""
+async def close_browser():
+    """Close Chromium and the Playwright driver; the next search relaunches them"""
+    global browser_instance, playwright_instance
     
-    # Check cache first
-    cache_key = f"{query.lower()}_{max_results}"
-    cached = cache.get(cache_key)
-    if cached:
-        print(f"🚀 Cache HIT: {query}")
-        return cached
-    
-    print(f"🔍 Render search: {query}")
-    
-    browser = await get_lightweight_browser()
-    context = None
-    page = None
-    
-    try:
-        # Create minimal context
+    async with browser_lock:
+        if browser_instance is not None:
+            try:
+                await browser_instance.close()
+            except Exception as e:
+                log_error(f"⚠️ Browser close failed: {e}")
+            browser_instance = None
+            log("🔒 Browser cleaned up")
+        if playwright_instance is not None:
+            try:
+                await playwright_instance.stop()
+            except Exception as e:
+                log_error(f"⚠️ Playwright stop failed: {e}")
+            playwright_instance = None
+
+# Detail pages resolved at once per search; each Chromium page costs tens of MB
+STREAM_RESOLVE_CONCURRENCY = int(os.environ.get("STREAM_RESOLVE_CONCURRENCY", "3"))
+# Upper bound per detail page so one slow film can't hold up the response
+STREAM_RESOLVE_TIMEOUT = float(os.environ.get("STREAM_RESOLVE_TIMEOUT", "10"))
+# Least useful time for one detail page / one search page navigation, in seconds
+STREAM_RESOLVE_MIN_BUDGET = 0.5
+NAVIGATION_MIN_BUDGET = 1.0
+
+# Warm contexts kept open between searches (each holds 1 search page + resolver pages)
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "1"))
+BROWSER_POOL_LEASE_TIMEOUT = float(os.environ.get("BROWSER_POOL_LEASE_TIMEOUT", "20"))
+
+class BrowserPoolTimeout(Exception):
+    """No pooled browser context became free within the lease timeout"""
+
+class ContextLease:
+    """A pooled JS-disabled context with a fixed set of reusable pages"""
+
+    def __init__(self, context, pages: List):
+        self.context = context
+        self.pages = pages
+
+    @property
+    def search_page(self):
+        return self.pages[0]
+
+    @property
+    def resolver_pages(self) -> List:
+        return self.pages[1:]
+
+    async def reset(self):
+        """Drop cookies and page state left behind by the previous lease"""
+        await self.context.clear_cookies()
+        for page in self.pages:
+            await page.goto("about:blank")
+
+    async def close(self):
+        try:
+            await self.context.close()
+        except Exception:
+            pass
+
+class BrowserContextPool:
+    """Pre-warmed browser contexts leased to one search at a time"""
+
+    def __init__(self, size: int = 1, pages_per_context: int = 4, lease_timeout: float = 20.0):
+        self.size = size
+        self.pages_per_context = pages_per_context
+        self.lease_timeout = lease_timeout
+        self._idle: Optional[asyncio.Queue] = None
+        self._leases: List[ContextLease] = []
+        self._start_lock = asyncio.Lock()
+        self._creating = 0
+        self.in_use = 0
+        self.leases = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def _create_lease(self) -> ContextLease:
+        browser = await get_lightweight_browser()
         context = await browser.new_context(
             user_agent="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
             viewport={'width': 800, 'height': 600},  # Minimal viewport
             ignore_https_errors=True,
             java_script_enabled=False,  # Disable JS for faster loading
         )
+        await resource_blocker.install(context)
+        pages = [await context.new_page() for _ in range(self.pages_per_context)]
+        return ContextLease(context, pages)
+
+    async def start(self):
+        """Launch the browser and fill the pool (idempotent)"""
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            idle: asyncio.Queue = asyncio.Queue()
+            try:
+                for _ in range(self.size):
+                    lease = await self._create_lease()
+                    self._leases.append(lease)
+                    idle.put_nowait(lease)
+            except Exception:
+                await self.close()
+                raise
+            self._idle = idle
+            log(f"🔥 Browser pool warmed: {self.size} context(s) x {self.pages_per_context} pages")
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow a warm context; raises BrowserPoolTimeout if none frees up in time"""
+        if self._idle is None:
+            await self.start()
         
-        page = await context.new_page()
-        
-        # Ultra-fast navigation
-        from urllib.parse import quote
-        search_url = f"https://www.5movierulz.chat/search_movies?s={quote(query)}"
-        
-        await page.goto(search_url, wait_until='domcontentloaded', timeout=15000)
-        await asyncio.sleep(1)  # Minimal wait
-        
-        # Quick element extraction
-        results = []
+        wait_start = time.monotonic()
+        try:
+            lease = self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            lease = None
+        if lease is None and len(self._leases) + self._creating < self.size:
+            # Contexts closed under memory pressure are recreated on demand
+            self._creating += 1
+            try:
+                lease = await self._create_lease()
+            finally:
+                self._creating -= 1
+            self._leases.append(lease)
+        if lease is None:
+            self.waits += 1
+            try:
+                lease = await asyncio.wait_for(self._idle.get(), timeout=self.lease_timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise BrowserPoolTimeout(f"no browser context free after {self.lease_timeout}s")
         
-        # Get film elements with minimal processing
-        film_elements = await page.query_selector_all('div[class*="film"]')
-        print(f"📦 Found {len(film_elements)} elements")
+        waited = time.monotonic() - wait_start
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.leases += 1
+        self.in_use += 1
         
-        # Process only first few elements to save memory
-        for i, element in enumerate(film_elements[:max_results + 2]):
+        healthy = True
+        try:
+            yield lease
+        except DeadlineExceeded:
+            # Raised before the page was touched: the context is still clean
+            raise
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            # Still in use until reset (or replaced), so an idle check can't close it mid-release
             try:
-                text = await element.inner_text()
-                if query.lower() not in text.lower():
-                    continue
+                await self._release(lease, healthy)
+            finally:
+                self.in_use -= 1
+
+    async def _release(self, lease: ContextLease, healthy: bool):
+        """Reset a lease for reuse, or replace it if it can't be trusted"""
+        try:
+            if not healthy:
+                raise RuntimeError("lease ended with an error")
+            await lease.reset()
+        except BaseException:
+            self.recycled += 1
+            await lease.close()
+            self._leases.remove(lease)
+            try:
+                lease = await self._create_lease()
+                self._leases.append(lease)
+            except Exception as e:
+                log_error(f"❌ Could not replace pooled context: {e}")
+                # Shrink rather than hand out a broken context
+                return
+        self._idle.put_nowait(lease)
+
+    @property
+    def open_contexts(self) -> int:
+        return len(self._leases)
+
+    def is_idle(self) -> bool:
+        """True when no context is leased, being released, or being created"""
+        return self.in_use == 0 and self._creating == 0 and not self._start_lock.locked()
+
+    async def close_idle(self) -> int:
+        """Close every context not currently leased; returns how many were closed"""
+        if self._idle is None:
+            return 0
+        closed = 0
+        while True:
+            try:
+                lease = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self._leases.remove(lease)
+            await lease.close()
+            closed += 1
+        return closed
+
+    async def close(self):
+        for lease in self._leases:
+            await lease.close()
+        self._leases.clear()
+        self._idle = None
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._leases),
+            "in_use": self.in_use,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "leases": self.leases,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "recycled": self.recycled,
+            "avg_wait_ms": round(self.total_wait / self.leases * 1000, 1) if self.leases else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+browser_pool = BrowserContextPool(
+    size=BROWSER_POOL_SIZE,
+    pages_per_context=1 + STREAM_RESOLVE_CONCURRENCY,
+    lease_timeout=BROWSER_POOL_LEASE_TIMEOUT,
+)
+
+# Chromium-backed scrapes: a concurrency cap with bounded interactive/background queues
+scrape_scheduler = ScrapeScheduler(
+    max_concurrent=int(os.environ.get("SCRAPE_MAX_CONCURRENT", str(BROWSER_POOL_SIZE))),
+    queue_limits={
+        INTERACTIVE: int(os.environ.get("SCRAPE_QUEUE_INTERACTIVE", "8")),
+        BACKGROUND: int(os.environ.get("SCRAPE_QUEUE_BACKGROUND", "4")),
+    },
+    wait_timeout=float(os.environ.get("SCRAPE_QUEUE_TIMEOUT", "30")),
+)
+# Lane of the scrape running in the current task
+scrape_lane: ContextVar[str] = ContextVar("scrape_lane", default=INTERACTIVE)
+
+SCRAPE_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"
+FILM_CARD_SELECTORS = ['div[class*="film"]']
+STREAM_LINK_SELECTORS = [f'a[href*="{host}"]' for host in STREAM_HOSTS]
+
+def search_page_url(query: str, base_url: str) -> str:
+    return f"{base_url}/search_movies?s={quote(query)}"
+
+def select_film_candidates(cards: List[Dict], query: str, max_results: int,
+                           base_url: str) -> List[Tuple[str, str]]:
+    """Pick (title, movie_page) pairs from film cards that mention the query; links resolve against base_url"""
+    candidates = []
+    for card in cards:
+        text = card['text']
+        if query.lower() not in text.lower():
+            continue
+        
+        # Get first valid link quickly
+        for link in card['links'][:2]:  # Check only first 2 links
+            href = link['href']
+            if href and 'movie-watch-online-free' in href:
                 
-                # Get first valid link quickly
-                links = await element.query_selector_all('a')
-                for link in links[:2]:  # Check only first 2 links
-                    href = await link.get_attribute('href')
-                    if href and 'movie-watch-online-free' in href:
-                        
-                        # Quick title extraction
-                        title = extract_title_from_text_fast(text, query)
-                        
-                        if title:
-                            # Quick streaming URL extraction (with very short timeout)
-                            streaming_url = await extract_streaming_url_ultra_fast(context, href)
-                            
-                            movie_data = {
-                                'title': title,
-                                'url': streaming_url or href,
-                                'movie_page': href,
-                                'source': 'render-optimized',
-                                'year': extract_year_fast(title),
-                                'poster': f"https://picsum.photos/300/450?random={len(results)+1}",
-                                'genre': 'Action',
-                                'rating': 'N/A'
-                            }
-                            
-                            results.append(movie_data)
-                            print(f"✅ Added: {title[:30]}...")
-                            
-                            if len(results) >= max_results:
-                                break
+                # Quick title extraction
+                title = extract_title_from_text_fast(text, query)
                 
-                if len(results) >= max_results:
-                    break
+                if title:
+                    candidates.append((title, urljoin(base_url + "/", href)))
                     
-            except Exception:
-                continue
+                    if len(candidates) >= max_results:
+                        break
         
-        # Cache results
-        if results:
-            cache.set(cache_key, results)
+        if len(candidates) >= max_results:
+            break
+    
+    return candidates
+
+def build_movie(index: int, title: str, href: str, streaming_url: Optional[str], source: str) -> Dict:
+    return {
+        'title': title,
+        'url': streaming_url or href,
+        'movie_page': href,
+        'source': source,
+        'year': extract_year_fast(title),
+        'poster': f"https://picsum.photos/300/450?random={index+1}",
+        'genre': 'Action',
+        'rating': 'N/A'
+    }
+
+def announce_candidates(candidates: List[Tuple[str, str]], source: str):
+    """Stream each parsed movie before its streaming URL is resolved"""
+    for index, (title, href) in enumerate(candidates):
+        emit_search_event({"type": "movie", "index": index, "movie": build_movie(index, title, href, None, source)})
+
+def build_movie_results(candidates: List[Tuple[str, str]], streaming_urls: List[Optional[str]],
+                        source: str) -> List[Dict]:
+    results = []
+    for (title, href), streaming_url in zip(candidates, streaming_urls):
+        results.append(build_movie(len(results), title, href, streaming_url, source))
+        log(f"✅ Added: {title[:30]}...")
+    
+    return results
+
+async def fetch_streaming_url_http(movie_url: str) -> Optional[str]:
+    """Read the streaming link from a movie page over plain HTTP"""
+    with mirror_registry.track(movie_url):
+        response = await get_http_client().get(
+            movie_url, headers={"User-Agent": SCRAPE_USER_AGENT}, follow_redirects=True
+        )
+        # Non-200 is treated as an error so it never becomes a negative cache entry
+        response.raise_for_status()
+    return first_link_href_html(response.text, STREAM_LINK_SELECTORS)
+
+async def resolve_streaming_urls_http(movie_urls: List[str]) -> List[Optional[str]]:
+    """HTTP counterpart of resolve_streaming_urls: bounded, ordered, failures -> None"""
+    semaphore = asyncio.Semaphore(STREAM_RESOLVE_CONCURRENCY)
+    
+    async def resolve(index: int, movie_url: str) -> Optional[str]:
+        known, streaming_url = stream_url_cache.lookup(movie_url)
+        if not known:
+            async with semaphore:
+                budget = remaining_timeout(STREAM_RESOLVE_TIMEOUT)
+                if budget < STREAM_RESOLVE_MIN_BUDGET:
+                    note_cut("stream_resolution")
+                    return None
+                try:
+                    streaming_url = await asyncio.wait_for(fetch_streaming_url_http(movie_url), timeout=budget)
+                except asyncio.TimeoutError:
+                    if budget < STREAM_RESOLVE_TIMEOUT:
+                        note_cut("stream_resolution")
+                    return None
+                except Exception:
+                    return None
+            stream_url_cache.store(movie_url, streaming_url)
+        announce_streaming_url(index, streaming_url)
+        return streaming_url
+    
+    return await asyncio.gather(*(resolve(index, movie_url) for index, movie_url in enumerate(movie_urls)))
+
+async def fetch_search_page_http(query: str, base_url: str) -> httpx.Response:
+    """Search page from one mirror; challenges and any non-200 raise so another mirror can win"""
+    response = await get_http_client().get(
+        search_page_url(query, base_url),
+        headers={"User-Agent": SCRAPE_USER_AGENT, "Accept": "text/html"},
+        follow_redirects=True,
+        timeout=remaining_timeout(10.0),
+    )
+    if looks_like_challenge(response.text):
+        raise ChallengeDetected(f"HTTP {response.status_code} from {base_url}")
+    if response.status_code != 200:
+        raise httpx.HTTPStatusError(f"HTTP {response.status_code} from {base_url}",
+                                    request=response.request, response=response)
+    return response
+
+async def http_tier_search(query: str, max_results: int) -> List[Dict]:
+    """Tier 1: plain HTTP fetch + HTML parse, no browser"""
+    require_budget("navigation", NAVIGATION_MIN_BUDGET)
+    with stage("navigation", "render-http"):
+        # Hedged across mirrors: the healthiest first, the next one too if it is slow
+        response, base_url = await mirror_registry.race(lambda base_url: fetch_search_page_http(query, base_url))
+    
+    with stage("dom_extraction", "render-http"):
+        film_cards = parse_cards_html(response.text, FILM_CARD_SELECTORS, limit=max_results + 2, dedupe=False)
+    log(f"📦 Found {len(film_cards)} elements (http)")
+    
+    candidates = select_film_candidates(film_cards, query, max_results, base_url)
+    announce_candidates(candidates, 'render-http')
+    with stage("stream_resolution", "render-http"):
+        streaming_urls = await resolve_streaming_urls_http([href for _, href in candidates])
+    return build_movie_results(candidates, streaming_urls, 'render-http')
+
+async def search_in_browser(page, context, resolver_pages: Optional[List], query: str,
+                            max_results: int, source: str) -> List[Dict]:
+    """Run the search page + streaming URL resolution on an open browser page"""
+    # Ultra-fast navigation, to the healthiest mirror (a second browser navigation is too costly to hedge)
+    require_budget("navigation", NAVIGATION_MIN_BUDGET)
+    base_url = mirror_registry.best()
+    with stage("navigation", source):
+        with mirror_registry.track(base_url):
+            await page.goto(search_page_url(query, base_url), wait_until='domcontentloaded',
+                            timeout=remaining_timeout(15.0) * 1000)
+        await asyncio.sleep(1)  # Minimal wait
+    
+    if is_challenge_title(await page.title()):
+        mirror_registry.record(base_url, None, ok=False, error="challenge page")
+        raise ChallengeDetected(f"{source}: challenge page title on {base_url}")
+    
+    # Pull every film card (text + links) in a single page roundtrip
+    with stage("dom_extraction", source):
+        film_cards = await extract_cards(page, FILM_CARD_SELECTORS, limit=max_results + 2, dedupe=False)
+    log(f"📦 Found {len(film_cards)} elements")
+    
+    candidates = select_film_candidates(film_cards, query, max_results, base_url)
+    announce_candidates(candidates, source)
+    
+    # Resolve streaming URLs concurrently on a bounded pool of pages
+    with stage("stream_resolution", source):
+        streaming_urls = await resolve_streaming_urls(
+            context, [href for _, href in candidates], pages=resolver_pages
+        )
+    return build_movie_results(candidates, streaming_urls, source)
+
+async def browser_tier_search(query: str, max_results: int) -> List[Dict]:
+    """Tier 2: pooled JS-disabled browser context"""
+    # Don't queue for a slot and a context the deadline can no longer use
+    require_budget("navigation", NAVIGATION_MIN_BUDGET)
+    # Borrow a warm context instead of creating and tearing one down
+    async with scrape_scheduler.slot(scrape_lane.get()), browser_pool.lease() as lease:
+        return await search_in_browser(
+            lease.search_page, lease.context, lease.resolver_pages, query, max_results, 'render-optimized'
+        )
+
+async def browser_js_tier_search(query: str, max_results: int) -> List[Dict]:
+    """Tier 3: one-off JS-enabled context, for pages that need scripts to render"""
+    require_budget("navigation", NAVIGATION_MIN_BUDGET)
+    async with scrape_scheduler.slot(scrape_lane.get()):
+        browser = await get_lightweight_browser()
+        context = await browser.new_context(
+            user_agent=SCRAPE_USER_AGENT,
+            viewport={'width': 800, 'height': 600},  # Minimal viewport
+            ignore_https_errors=True,
+        )
+        try:
+            await resource_blocker.install(context)
+            page = await context.new_page()
+            return await search_in_browser(page, context, None, query, max_results, 'render-js')
+        finally:
+            await context.close()
+
+SCRAPE_TIERS = {
+    "http": http_tier_search,
+    "browser": browser_tier_search,
+    "browser-js": browser_js_tier_search,
+}
+
+# Escalation order, cheapest first (e.g. SCRAPE_TIERS=browser,browser-js skips HTTP)
+local_engine = TieredScrapeEngine(
+    [ScrapeTier(name, SCRAPE_TIERS[name])
+     for name in os.environ.get("SCRAPE_TIERS", "http,browser,browser-js").split(",")
+     if name in SCRAPE_TIERS],
+    # A saturated browser pool won't get better by opening yet another context,
+    # and a spent deadline won't get longer
+    stop_on=(BrowserPoolTimeout, DeadlineExceeded),
+    # Admission rejections surface to the endpoint as 503s
+    propagate=(AdmissionRejected,),
+    # Tier history is looked up under the same normalization as the results cache
+    key=normalize_query,
+)
+
+async def fetch_listing_html(url: str) -> Optional[str]:
+    """Listing page HTML for the catalog crawler, None for challenges and errors"""
+    start = time.perf_counter()
+    try:
+        response = await get_http_client().get(
+            url,
+            headers={"User-Agent": SCRAPE_USER_AGENT, "Accept": "text/html"},
+            follow_redirects=True,
+            timeout=15.0,
+        )
+    except Exception as e:
+        mirror_registry.record(url, None, ok=False, error=f"{type(e).__name__}: {e}"[:200])
+        raise
+    # One outcome per request: a challenge or error status counts against the mirror, not as a success
+    if response.status_code != 200 or looks_like_challenge(response.text):
+        mirror_registry.record(url, None, ok=False, error=f"catalog listing status {response.status_code}")
+        log(f"⚠️ Catalog crawler skipped {url} (status {response.status_code})")
+        return None
+    mirror_registry.record(url, time.perf_counter() - start, ok=True)
+    return response.text
+
+# Listings are crawled ahead of time; CATALOG_CRAWL_INTERVAL=0 disables the crawler
+CATALOG_CRAWL_INTERVAL = float(os.environ.get("CATALOG_CRAWL_INTERVAL", "1800"))
+catalog_index = CatalogIndex(max_entries=int(os.environ.get("CATALOG_MAX_ENTRIES", "3000")))
+catalog_crawler = CatalogCrawler(
+    catalog_index,
+    # Pinned to one mirror so change detection and indexed movie URLs stay consistent
+    f"{mirror_registry.best()}/",
+    fetch_listing_html,
+    FILM_CARD_SELECTORS,
+    interval=CATALOG_CRAWL_INTERVAL,
+    max_categories=int(os.environ.get("CATALOG_MAX_CATEGORIES", "10")),
+    on_entries=lambda entries: suggest_index.add_many(entry['title'] for entry in entries),
+)
+
+def catalog_search(query: str, max_results: int = 10) -> List[Dict]:
+    """Answer a query from the crawled catalog, in the shape local tiers return"""
+    results = []
+    for entry in catalog_index.search(query, limit=max_results):
+        # Reuse a streaming URL if one was resolved earlier
+        _, streaming_url = stream_url_cache.lookup(entry['movie_page'])
+        movie = build_movie(len(results), entry['title'], entry['movie_page'], streaming_url, 'catalog-index')
+        if entry.get('poster'):
+            movie['poster'] = entry['poster']
+        movie['language'] = entry.get('language')
+        results.append(movie)
+    return results
+
+# Least useful time for a local scrape (one search page plus a few detail pages)
+LOCAL_SCRAPE_MIN_BUDGET = float(os.environ.get("LOCAL_SCRAPE_MIN_BUDGET", "1"))
+
+async def render_optimized_search(query: str, max_results: int = 8, use_cache: bool = True,
+                                  lane: str = INTERACTIVE) -> List[Dict]:
+    """Ultra-optimized search for Render deployment"""
+    
+    # Check cache first (skipped when revalidating a stale entry)
+    cache_key = local_results_key(query, max_results)
+    cached = await cache_get(cache_key) if use_cache else None
+    if cached:
+        log(f"🚀 Cache HIT: {query}")
+        return cached
+    
+    if not stage_allowed("local_scrape", LOCAL_SCRAPE_MIN_BUDGET):
+        return []
+    
+    log(f"🔍 Render search: {query}")
+    
+    try:
+        # Browser tiers queue for a Chromium slot in this lane
+        scrape_lane.set(lane)
+        scrape_start = time.perf_counter()
+        # The answering tier is only known afterwards, so the span and histogram are recorded separately
+        with span("local_scrape"):
+            results, tier_name = await local_engine.search(query, max_results)
+        stage_seconds.observe(time.perf_counter() - scrape_start, stage="local_scrape", path=tier_name or "none")
+        
+        # Cache results, unless the deadline left some streaming URLs unresolved
+        deadline = current_deadline.get()
+        if results and (deadline is None or "stream_resolution" not in deadline.cut):
+            cache_set(cache_key, results, ttl=SEARCH_HARD_TTL)
+            suggest_index.add_many(movie['title'] for movie in results)
         
         return results
         
+    except AdmissionRejected:
+        raise
     except Exception as e:
-        print(f"❌ Search error: {e}")
+        log_error(f"❌ Search error: {e}")
         return []
-        
-    finally:
-        # Aggressive cleanup
-        if page:
-            await page.close()
-        if context:
-            await context.close()
-        
-        # Force garbage collection
-        gc.collect()
 
 def extract_title_from_text_fast(text: str, query: str) -> str:
     """Ultra-fast title extraction"""
@@ -226,26 +973,33 @@ def extract_title_from_text_fast(text: str, query: str) -> str:
     
     return f"{query.title()} Movie"
 
+async def find_streaming_url_on_page(page, movie_url: str) -> Optional[str]:
+    """Navigate an existing page to a movie page and read its streaming link"""
+    # Very aggressive timeout for Render
+    await page.goto(movie_url, wait_until='domcontentloaded', timeout=remaining_timeout(8.0) * 1000)
+    
+    # Quick search for streaming URLs
+    for selector in STREAM_LINK_SELECTORS:
+        elements = await page.query_selector_all(selector)
+        if elements:
+            href = await elements[0].get_attribute('href')
+            if href:
+                return href
+    
+    return None
+
 async def extract_streaming_url_ultra_fast(context, movie_url: str) -> Optional[str]:
     """Ultra-fast streaming URL extraction with aggressive timeout"""
+    known, streaming_url = stream_url_cache.lookup(movie_url)
+    if known:
+        return streaming_url
+    
     page = None
     try:
         page = await context.new_page()
-        
-        # Very aggressive timeout for Render
-        await page.goto(movie_url, wait_until='domcontentloaded', timeout=8000)
-        
-        # Quick search for streaming URLs
-        selectors = ['a[href*="streamlare"]', 'a[href*="vcdnlare"]']
-        
-        for selector in selectors:
-            elements = await page.query_selector_all(selector)
-            if elements:
-                href = await elements[0].get_attribute('href')
-                if href:
-                    return href
-        
-        return None
+        streaming_url = await find_streaming_url_on_page(page, movie_url)
+        stream_url_cache.store(movie_url, streaming_url)
+        return streaming_url
         
     except Exception:
         return None
@@ -253,6 +1007,68 @@ async def extract_streaming_url_ultra_fast(context, movie_url: str) -> Optional[
         if page:
             await page.close()
 
+async def resolve_streaming_urls(context, movie_urls: List[str], concurrency: int = None,
+                                 pages: Optional[List] = None) -> List[Optional[str]]:
+    """Resolve streaming URLs concurrently, reusing a bounded pool of pages.
+    
+    When pages are given (e.g. from a pooled lease) they are reused and left
+    open; otherwise each worker opens and closes its own page.
+    Pages already in the stream URL cache are answered without navigating.
+    Results keep the order of movie_urls; failures and timeouts yield None.
+    """
+    resolved: List[Optional[str]] = [None] * len(movie_urls)
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, movie_url in enumerate(movie_urls):
+        known, streaming_url = stream_url_cache.lookup(movie_url)
+        if known:
+            resolved[index] = streaming_url
+            announce_streaming_url(index, streaming_url)
+        else:
+            queue.put_nowait((index, movie_url))
+    
+    if queue.empty():
+        return resolved
+    
+    async def worker(page=None):
+        owns_page = page is None
+        if owns_page:
+            page = await context.new_page()
+        try:
+            while True:
+                try:
+                    index, movie_url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                budget = remaining_timeout(STREAM_RESOLVE_TIMEOUT)
+                if budget < STREAM_RESOLVE_MIN_BUDGET:
+                    note_cut("stream_resolution")
+                    continue
+                try:
+                    resolved[index] = await asyncio.wait_for(
+                        find_streaming_url_on_page(page, movie_url), timeout=budget
+                    )
+                    stream_url_cache.store(movie_url, resolved[index])
+                    announce_streaming_url(index, resolved[index])
+                except asyncio.TimeoutError:
+                    if budget < STREAM_RESOLVE_TIMEOUT:
+                        note_cut("stream_resolution")
+                    resolved[index] = None
+                except Exception:
+                    # Timeouts/errors are transient: leave them uncached
+                    resolved[index] = None
+        finally:
+            if owns_page:
+                await page.close()
+    
+    pool_size = max(1, min(concurrency or STREAM_RESOLVE_CONCURRENCY, queue.qsize()))
+    if pages:
+        workers = [worker(page) for page in pages[:pool_size]]
+    else:
+        workers = [worker() for _ in range(pool_size)]
+    await asyncio.gather(*workers, return_exceptions=True)
+    return resolved
+
 def extract_year_fast(title: str) -> str:
     """Fast year extraction"""
     import re
@@ -260,162 +1076,442 @@ def extract_year_fast(title: str) -> str:
     return match.group(1) if match else 'N/A'
 
 def get_memory_usage():
-    """Get current memory usage"""
-    process = psutil.Process(os.getpid())
-    return process.memory_info().rss / 1024 / 1024  # MB
+    """Current memory usage in MB, including Chromium and the Playwright driver"""
+    return process_tree_rss_mb()
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+N8N_WEBHOOK_URL = os.environ.get(
+    "N8N_WEBHOOK_URL", "https://n8n-instance-vnyx.onrender.com/webhook/movie-scraper-villas"
+)
+
+# Webhook request variants n8n may accept, in default trial order
+N8N_TRIGGER_VARIANTS = ("json", "get", "wrapped", "text")
+# Per-attempt webhook timeout, and the longest wait for the workflow's callback
+N8N_TRIGGER_TIMEOUT = 20.0
+N8N_WAIT_TIMEOUT = float(os.environ.get("N8N_WAIT_TIMEOUT", "15"))
+
+# Variant that last triggered the workflow successfully; tried first next time
+n8n_preferred_variant: Optional[str] = None
+
+n8n_trigger_stats = {
+    "attempts": 0,
+    "successes": 0,
+    "failures": 0,
+    "reused_connections": 0,
+    "new_connections": 0,
+    "last_latency_ms": None,
+}
+
+async def _send_n8n_variant(client: httpx.AsyncClient, variant: str, query: str, trace,
+                            timeout: float = N8N_TRIGGER_TIMEOUT) -> httpx.Response:
+    """Send one webhook request in the given method/payload variant"""
+    extensions = {"trace": trace}
+    timeout = httpx.Timeout(timeout, connect=min(5.0, timeout))
+    if variant == "get":
+        return await client.get(N8N_WEBHOOK_URL, params={"query": query}, extensions=extensions, timeout=timeout)
+    if variant == "wrapped":
+        return await client.post(N8N_WEBHOOK_URL, json={"data": {"query": query}}, extensions=extensions,
+                                 timeout=timeout)
+    if variant == "text":
+        return await client.post(
+            N8N_WEBHOOK_URL,
+            content=query,
+            headers={"Content-Type": "text/plain"},
+            extensions=extensions,
+            timeout=timeout,
+        )
+    return await client.post(N8N_WEBHOOK_URL, json={"query": query}, extensions=extensions, timeout=timeout)
+
 async def trigger_n8n_workflow(query: str):
     """Trigger n8n workflow to scrape results"""
+    global n8n_preferred_variant
+    
+    trigger_start = time.perf_counter()
     try:
-        n8n_webhook_url = "https://n8n-instance-vnyx.onrender.com/webhook/movie-scraper-villas"
+        client = get_http_client()
         
-        # Try different HTTP methods and payload formats
-        methods_to_try = [
-            ("POST", {"query": query}),
-            ("GET", None),
-            ("POST", {"data": {"query": query}}),
-            ("POST", query)  # Just send the query string
-        ]
+        # Try the last working variant first, the others only if it fails
+        variants = list(N8N_TRIGGER_VARIANTS)
+        if n8n_preferred_variant in variants:
+            variants.remove(n8n_preferred_variant)
+            variants.insert(0, n8n_preferred_variant)
         
-        for method, payload in methods_to_try:
+        for variant in variants:
+            if not stage_allowed("n8n_trigger", 1.0):
+                break
+            new_connection = False
+            
+            async def trace(event_name: str, info: Dict):
+                nonlocal new_connection
+                if event_name == "connection.connect_tcp.started":
+                    new_connection = True
+            
+            attempt_start = time.perf_counter()
             try:
-                async with httpx.AsyncClient(timeout=20.0) as client:
-                    if method == "GET":
-                        # Try GET with query parameter
-                        response = await client.get(
-                            f"{n8n_webhook_url}?query={query}",
-                            headers={"User-Agent": "FastAPI-Movie-Search/1.0"}
-                        )
-                    else:
-                        # Try POST with different payloads
-                        if isinstance(payload, str):
-                            response = await client.post(
-                                n8n_webhook_url,
-                                content=payload,
-                                headers={"Content-Type": "text/plain"}
-                            )
-                        else:
-                            response = await client.post(
-                                n8n_webhook_url,
-                                json=payload,
-                                headers={"Content-Type": "application/json"}
-                            )
-                    
-                    print(f"🧪 Tried {method} with payload {type(payload).__name__}: {response.status_code}")
-                    
-                    if response.status_code in [200, 201, 202]:
-                        print(f"🚀 N8N workflow triggered successfully!")
-                        print(f"   Method: {method}")
-                        print(f"   Status: {response.status_code}")
-                        print(f"   Response: {response.text[:200]}...")
-                        return True
-                    elif response.status_code == 404:
-                        print(f"⚠️ 404 - Webhook not found or not active")
-                    else:
-                        print(f"⚠️ Unexpected status: {response.status_code}")
-                        print(f"   Response: {response.text[:200]}...")
-                        
+                response = await _send_n8n_variant(
+                    client, variant, query, trace, timeout=remaining_timeout(N8N_TRIGGER_TIMEOUT)
+                )
             except Exception as e:
-                print(f"❌ {method} request failed: {e}")
+                log_error(f"❌ {variant} request failed: {e}")
+                n8n_trigger_stats["attempts"] += 1
+                n8n_trigger_stats["failures"] += 1
                 continue
+            
+            latency_ms = (time.perf_counter() - attempt_start) * 1000
+            n8n_trigger_stats["attempts"] += 1
+            n8n_trigger_stats["last_latency_ms"] = round(latency_ms, 1)
+            n8n_trigger_stats["new_connections" if new_connection else "reused_connections"] += 1
+            
+            connection = "new connection" if new_connection else "reused connection"
+            log(f"🧪 Tried {variant} ({response.http_version}, {connection}, {latency_ms:.0f}ms): {response.status_code}")
+            
+            if response.status_code in [200, 201, 202]:
+                n8n_trigger_stats["successes"] += 1
+                if n8n_preferred_variant != variant:
+                    log(f"📌 Remembering webhook variant: {variant}")
+                    n8n_preferred_variant = variant
+                log(f"🚀 N8N workflow triggered successfully!")
+                log(f"   Response: {response.text[:200]}...")
+                return True
+            
+            n8n_trigger_stats["failures"] += 1
+            if response.status_code == 404:
+                log(f"⚠️ 404 - Webhook not found or not active")
+            else:
+                log(f"⚠️ Unexpected status: {response.status_code}")
+                log(f"   Response: {response.text[:200]}...")
         
-        print("❌ All request methods failed")
+        log_error("❌ All request methods failed")
         return False
                 
     except Exception as e:
-        print(f"❌ Error triggering N8N workflow: {e}")
+        log_error(f"❌ Error triggering N8N workflow: {e}")
         return False
+    finally:
+        record_stage("n8n_trigger", "n8n", time.perf_counter() - trigger_start)
 
-async def wait_for_n8n_results(query: str, max_wait: int = 10):
-    """Wait for n8n results to be cached"""
-    cache_key = f"n8n_results_{query.lower()}"
+async def wait_for_n8n_results(query: str, max_wait: float = 10, use_cache: bool = True):
+    """Wait until /api/append-results delivers n8n results, or the deadline passes"""
+    cache_key = n8n_results_key(query)
+    start = time.monotonic()
+    deadline = start + max_wait
     
-    for i in range(max_wait):
-        await asyncio.sleep(1)
-        cached_data = cache.get(cache_key)
+    # Registered before the cache check: a callback landing during a disk read still wakes us
+    future = n8n_waiters.register(cache_key)
+    try:
+        # Results may already have arrived before we started waiting
+        cached_data = await cache_get(cache_key) if use_cache else None
         if cached_data and cached_data.get('movies'):
-            print(f"✅ N8N results received after {i+1} seconds")
             return cached_data['movies']
+        
+        while True:
+            try:
+                # A callback that already completed the future is taken even at zero time left
+                data = await asyncio.wait_for(future, timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                break
+            
+            # An empty payload doesn't end the wait; a later callback may still arrive
+            if data and data.get('movies'):
+                log(f"✅ N8N results received after {time.monotonic() - start:.2f} seconds")
+                return data['movies']
+            future = n8n_waiters.register(cache_key)
+    finally:
+        n8n_waiters.discard(cache_key, future)
     
-    print(f"⏰ N8N results timeout after {max_wait} seconds")
+    log(f"⏰ N8N results timeout after {max_wait} seconds")
     return []
 
+# Default /api/search time budget (seconds), the largest a request may ask for,
+# and how much of it the n8n path must leave for the local fallback
+SEARCH_DEADLINE = float(os.environ.get("SEARCH_DEADLINE", "25"))
+SEARCH_DEADLINE_MAX = float(os.environ.get("SEARCH_DEADLINE_MAX", "120"))
+SEARCH_LOCAL_RESERVE = float(os.environ.get("SEARCH_LOCAL_RESERVE", "8"))
+
+def deadline_outcome() -> Dict:
+    """Partial-result fields for a pipeline outcome, from the deadline it ran under"""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return {"partial": False, "skipped": [], "cut": []}
+    return {"partial": deadline.partial, "skipped": list(deadline.skipped), "cut": list(deadline.cut)}
+
+async def run_search_pipeline(query: str, use_n8n: bool, event_key: Optional[str] = None,
+                              refresh: bool = False) -> Dict:
+    """Run the n8n pipeline with local scraper fallback for one query.
+
+    With refresh, cached results are ignored so a stale entry gets replaced.
+    """
+    if event_key:
+        # Runs in its own task, so this only tags events from this pipeline
+        search_event_key.set(event_key)
+    
+    # n8n only runs if it can still leave the local fallback its share of the deadline
+    if use_n8n and stage_allowed("n8n", SEARCH_LOCAL_RESERVE + 1.0):
+        # Trigger n8n workflow and wait for results
+        log(f"🚀 Triggering n8n workflow for fresh results: '{query}'")
+        
+        # Trigger the workflow
+        n8n_triggered = await trigger_n8n_workflow(query)
+        
+        if n8n_triggered:
+            # Wait for n8n results
+            max_wait = max(0.0, remaining_timeout(N8N_WAIT_TIMEOUT + SEARCH_LOCAL_RESERVE) - SEARCH_LOCAL_RESERVE)
+            with stage("n8n_wait", "n8n"):
+                n8n_results = await wait_for_n8n_results(query, max_wait=max_wait, use_cache=not refresh)
+            
+            if n8n_results:
+                return {"results": n8n_results, "source": "n8n-live", "cached": False, **deadline_outcome()}
+    
+    # Fallback to local scraper if n8n fails
+    log(f"🔄 N8N failed, falling back to local scraper for '{query}'")
+    # Looked up here rather than inside render_optimized_search so "cached" reflects the path
+    # taken (probing after the scrape stored its results would count a hit every time)
+    results = await cache_get(local_results_key(query)) if not refresh else None
+    cached = bool(results)
+    if not cached:
+        # Cached results cost no memory to serve; only a real scrape is shed
+        if memory_governor.refuse(f"local scrape for '{query}'"):
+            return {"results": [], "source": "memory-shed", "cached": False, **deadline_outcome()}
+        results = await render_optimized_search(
+            query, max_results=10, use_cache=False, lane=BACKGROUND if refresh else INTERACTIVE
+        )
+    
+    return {
+        "results": results,
+        "source": "local-fallback",
+        # A cache hit wasn't scraped now; the last scrape's tier may not be what produced it
+        "tier": "cache" if cached else local_engine.answered_by(query),
+        "cached": cached,
+        **deadline_outcome(),
+    }
+
+# Deadline each in-flight pipeline runs under, by flight key
+flight_deadlines: Dict[str, Deadline] = {}
+
+async def run_search_flight(query: str, use_n8n: bool, flight_key: str,
+                            refresh: bool = False) -> Tuple[Dict, bool, int]:
+    """search_flights.do() for the pipeline, under the longest deadline among the callers sharing it.
+
+    The leader's pipeline runs under a fork of its deadline; every caller that
+    joins extends that fork, so a short-budget leader can't truncate the result
+    for longer-budget callers. Each caller still bounds its own wait.
+    """
+    caller = current_deadline.get()
+    if search_flights.running(flight_key):
+        shared = flight_deadlines.get(flight_key)
+        if shared is not None:
+            shared.extend(caller)
+    else:
+        shared = caller.fork() if caller is not None else None
+        if shared is not None:
+            flight_deadlines[flight_key] = shared
+    
+    async def lead() -> Dict:
+        current_deadline.set(shared)
+        try:
+            return await run_search_pipeline(query, use_n8n, flight_key, refresh=refresh)
+        finally:
+            if shared is not None and flight_deadlines.get(flight_key) is shared:
+                del flight_deadlines[flight_key]
+    
+    # Only called when this caller leads; nothing awaits between the check above and do()
+    return await search_flights.do(flight_key, lead)
+
+async def refresh_search(query: str, use_n8n: bool):
+    """Background revalidation; shares the flight with any concurrent foreground miss"""
+    # Runs after the response: the request's deadline no longer applies
+    current_deadline.set(None)
+    flight_key = search_flight_key(query, use_n8n)
+    outcome, _, _ = await run_search_flight(query, use_n8n, flight_key, refresh=True)
+    log(f"♻️ Refreshed '{query}': {len(outcome['results'])} results ({outcome['source']})")
+    
+    # A stale n8n entry is served ahead of local results, so one the refresh didn't
+    # replace would trigger another full refresh on every hit until its hard TTL
+    if outcome["source"] != "n8n-live":
+        n8n_key = n8n_results_key(query)
+        # The hit that scheduled this refresh promoted the entry to memory
+        found = cache.peek(n8n_key)
+        if found is not None and is_stale(found[1]):
+            if outcome["results"]:
+                # The fresh local results stored by the refresh take over
+                await cache_delete(n8n_key)
+            else:
+                # Nothing better to serve: keep the n8n results, fresh again for another soft TTL
+                cache_set(n8n_key, found[0], ttl=SEARCH_HARD_TTL)
+
+async def lookup_cached_search(query: str) -> Optional[Dict]:
+    """Cached n8n results, else cached local results, with their freshness"""
+    found = await cache_lookup(n8n_results_key(query))
+    if found is not None and found[0] and found[0].get('movies'):
+        return {"results": found[0]['movies'], "source": "n8n-cached", "stale": is_stale(found[1])}
+    
+    found = await cache_lookup(local_results_key(query))
+    if found is not None and found[0]:
+        return {"results": found[0], "source": "local-cached", "stale": is_stale(found[1])}
+    
+    return None
+
+async def serve_cached_search(query: str, use_n8n: bool, background_tasks: BackgroundTasks) -> Optional[Dict]:
+    """Return cached results at once, scheduling a refresh when they are stale"""
+    cached_search = await lookup_cached_search(query)
+    if cached_search is None:
+        return None
+    
+    revalidating = False
+    if cached_search["stale"]:
+        key = search_flight_key(query, use_n8n)
+        revalidating = search_refresher.schedule(
+            background_tasks, key, lambda: refresh_search(query.strip(), use_n8n)
+        ) or search_refresher.is_running(key)
+    cached_search["revalidating"] = revalidating
+    return cached_search
+
 @app.get("/api/search")
-async def search_movies_render(query: str = "", use_n8n: bool = True):
-    """N8N-powered search endpoint - saves resources by using n8n for scraping"""
+async def search_movies_render(background_tasks: BackgroundTasks, query: str = "", use_n8n: bool = True,
+                               deadline: Optional[float] = None):
+    """N8N-powered search endpoint - saves resources by using n8n for scraping.
+
+    deadline (seconds, default SEARCH_DEADLINE) bounds the whole request: stages
+    that no longer fit are skipped and whatever was found so far is returned
+    with "partial": true.
+    """
     if not query.strip():
         return {"query": query, "results": [], "message": "Please enter a search term"}
     
     start_time = time.time()
+    budget = Deadline(min(SEARCH_DEADLINE_MAX, max(1.0, deadline or SEARCH_DEADLINE)))
+    current_deadline.set(budget)
     
     try:
-        # Check if we have cached n8n results first
-        n8n_cache_key = f"n8n_results_{query.lower()}"
-        cached_n8n_data = cache.get(n8n_cache_key)
+        # Cached n8n or local results are returned immediately, stale ones refreshed behind the response
+        cached_search = await serve_cached_search(query, use_n8n, background_tasks)
         
-        if cached_n8n_data and cached_n8n_data.get('movies'):
-            # Return cached n8n results immediately
-            movies = cached_n8n_data['movies']
+        if cached_search is not None:
+            movies = cached_search["results"]
             search_time = time.time() - start_time
+            search_seconds.observe(search_time, source=cached_search["source"])
+            freshness = "stale, refreshing" if cached_search["revalidating"] else ("stale" if cached_search["stale"] else "fresh")
             
-            print(f"⚡ Returning {len(movies)} cached n8n results for '{query}'")
+            log(f"⚡ Returning {len(movies)} cached results for '{query}' ({freshness})")
             
             return {
                 "query": query,
                 "results": movies,
                 "total": len(movies),
                 "search_time": round(search_time, 2),
-                "source": "n8n-cached",
+                "source": cached_search["source"],
                 "cached": True,
-                "message": f"Found {len(movies)} movies from n8n cache in {search_time:.1f}s"
+                "stale": cached_search["stale"],
+                "revalidating": cached_search["revalidating"],
+                "partial": False,
+                "message": f"Found {len(movies)} movies from cache ({freshness}) in {search_time:.1f}s"
             }
         
-        if use_n8n:
-            # Trigger n8n workflow and wait for results
-            print(f"🚀 Triggering n8n workflow for fresh results: '{query}'")
-            
-            # Trigger the workflow
-            n8n_triggered = await trigger_n8n_workflow(query)
-            
-            if n8n_triggered:
-                # Wait for n8n results
-                n8n_results = await wait_for_n8n_results(query, max_wait=15)
-                
-                if n8n_results:
-                    search_time = time.time() - start_time
-                    
-                    return {
-                        "query": query,
-                        "results": n8n_results,
-                        "total": len(n8n_results),
-                        "search_time": round(search_time, 2),
-                        "source": "n8n-live",
-                        "cached": False,
-                        "message": f"Found {len(n8n_results)} movies from n8n in {search_time:.1f}s"
-                    }
-        
-        # Fallback to local scraper if n8n fails
-        print(f"🔄 N8N failed, falling back to local scraper for '{query}'")
-        results = await render_optimized_search(query, max_results=10)
+        # The pre-crawled catalog answers without touching n8n or the site
+        indexed = catalog_search(query)
+        if indexed:
+            search_time = time.time() - start_time
+            search_seconds.observe(search_time, source="catalog-index")
+            log(f"🗂️ Returning {len(indexed)} catalog index results for '{query}'")
+            return {
+                "query": query,
+                "results": indexed,
+                "total": len(indexed),
+                "search_time": round(search_time, 2),
+                "source": "catalog-index",
+                "cached": True,
+                "stale": False,
+                "partial": False,
+                "message": f"Found {len(indexed)} movies in the catalog index in {search_time:.1f}s"
+            }
+        
+        # Concurrent identical searches share one pipeline run; its announced
+        # movies are the partial answer if the deadline passes first
+        flight_key = search_flight_key(query, use_n8n)
+        queue = search_events.subscribe(flight_key)
+        try:
+            flight = asyncio.ensure_future(run_search_flight(query.strip(), use_n8n, flight_key))
+            done, _ = await asyncio.wait({flight}, timeout=budget.remaining())
+            if not done:
+                # The shared pipeline is shielded and winds down at its next budget check
+                flight.cancel()
+                note_cut("search")
+                deadline_stats = budget.stats()
+                # Stages the shared pipeline skipped or cut so far are recorded on its own deadline
+                shared = flight_deadlines.get(flight_key)
+                if shared is not None:
+                    for field in ("skipped", "cut"):
+                        deadline_stats[field] += [stage for stage in getattr(shared, field)
+                                                  if stage not in deadline_stats[field]]
+                results = collect_search_events(queue)
+                search_time = time.time() - start_time
+                search_seconds.observe(search_time, source="deadline")
+                log(f"⏳ Deadline of {budget.budget:.0f}s reached for '{query}', returning {len(results)} partial results")
+                return {
+                    "query": query,
+                    "results": results,
+                    "total": len(results),
+                    "search_time": round(search_time, 2),
+                    "source": "deadline-partial",
+                    "cached": False,
+                    "stale": False,
+                    "partial": True,
+                    "deadline": deadline_stats,
+                    "message": f"Found {len(results)} movies before the {budget.budget:.0f}s deadline"
+                }
+            outcome, coalesced, waiters = flight.result()
+        finally:
+            search_events.unsubscribe(flight_key, queue)
         
+        results = outcome["results"]
         search_time = time.time() - start_time
+        search_seconds.observe(search_time, source=outcome["source"])
+        label = {
+            "n8n-live": "from n8n",
+            "memory-shed": "(local scraping paused: server low on memory)",
+        }.get(outcome["source"], "(local fallback)")
         
         return {
             "query": query,
             "results": results,
             "total": len(results),
             "search_time": round(search_time, 2),
-            "source": "local-fallback",
-            "cached": cache.get(f"{query.lower()}_10") is not None,
-            "message": f"Found {len(results)} movies (local fallback) in {search_time:.1f}s"
+            "source": outcome["source"],
+            "cached": outcome["cached"],
+            "tier": outcome.get("tier"),
+            "stale": False,
+            "coalesced": coalesced,
+            "waiters": waiters,
+            "partial": outcome.get("partial", False),
+            "deadline": {
+                "budget": budget.budget,
+                "remaining": round(budget.remaining(), 2),
+                "skipped": outcome.get("skipped", []),
+                "cut": outcome.get("cut", []),
+            },
+            "message": f"Found {len(results)} movies {label} in {search_time:.1f}s"
         }
         
+    except AdmissionRejected as e:
+        log(f"⛔ Search rejected for '{query}': {e}")
+        search_seconds.observe(time.time() - start_time, source="rejected")
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": str(e.retry_after)},
+            content={
+                "query": query,
+                "results": [],
+                "error": "Search capacity exhausted",
+                "retry_after": e.retry_after,
+                "message": f"Too many searches in progress, please retry in {e.retry_after}s"
+            },
+        )
     except Exception as e:
-        print(f"Search error: {str(e)}")
+        log_error(f"Search error: {str(e)}")
+        search_seconds.observe(time.time() - start_time, source="error")
         return {
             "query": query,
             "results": [],
@@ -423,45 +1519,237 @@ async def search_movies_render(query: str = "", use_n8n: bool = True):
             "message": "Please try again later"
         }
 
-async def cleanup_memory():
-    """Background memory cleanup for Render"""
-    try:
-        # Clear old cache entries
-        if len(cache.cache) > 20:
-            cache._cleanup_if_needed()
+def ndjson_line(event: Dict) -> bytes:
+    return (json.dumps(event, default=str) + "\n").encode("utf-8")
+
+@app.get("/api/search/stream")
+async def search_movies_stream(background_tasks: BackgroundTasks, query: str = "", use_n8n: bool = True):
+    """Progressive variant of /api/search: one NDJSON event per line.
+
+    Emits {"type": "movie"} as soon as a card is parsed, {"type": "update"}
+    when its streaming URL resolves, and a final {"type": "done"} summary.
+    """
+    start_time = time.time()
+    # Looked up before streaming so a stale hit can attach its refresh to this response
+    cached_search = await serve_cached_search(query, use_n8n, background_tasks) if query.strip() else None
+    
+    async def events():
+        if not query.strip():
+            yield ndjson_line({"type": "done", "query": query, "total": 0, "message": "Please enter a search term"})
+            return
         
-        # Force garbage collection
-        gc.collect()
+        if cached_search is not None:
+            movies = cached_search["results"]
+            for index, movie in enumerate(movies):
+                yield ndjson_line({"type": "movie", "index": index, "movie": movie})
+            yield ndjson_line({
+                "type": "done", "query": query, "total": len(movies), "source": cached_search["source"],
+                "cached": True, "stale": cached_search["stale"], "revalidating": cached_search["revalidating"],
+                "search_time": round(time.time() - start_time, 2),
+            })
+            return
         
-        memory_usage = get_memory_usage()
-        if memory_usage > 400:  # If using more than 400MB
-            print(f"⚠️ High memory usage: {memory_usage:.1f}MB - clearing cache")
-            cache.cache.clear()
-            cache.access_times.clear()
-            gc.collect()
+        indexed = catalog_search(query)
+        if indexed:
+            for index, movie in enumerate(indexed):
+                yield ndjson_line({"type": "movie", "index": index, "movie": movie})
+            yield ndjson_line({
+                "type": "done", "query": query, "total": len(indexed), "source": "catalog-index",
+                "cached": True, "stale": False, "search_time": round(time.time() - start_time, 2),
+            })
+            return
         
-    except Exception as e:
-        print(f"Cleanup error: {e}")
+        flight_key = search_flight_key(query, use_n8n)
+        # Subscribe before starting the flight so no early event is missed
+        queue = search_events.subscribe(flight_key)
+        flight = asyncio.ensure_future(run_search_flight(query.strip(), use_n8n, flight_key))
+        sent = set()
+        try:
+            while not flight.done():
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, flight}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                event = getter.result()
+                if event["type"] == "movie":
+                    sent.add(event["index"])
+                yield ndjson_line(event)
+            
+            while not queue.empty():
+                event = queue.get_nowait()
+                if event["type"] == "movie":
+                    sent.add(event["index"])
+                yield ndjson_line(event)
+            
+            try:
+                outcome, coalesced, waiters = await flight
+            except AdmissionRejected as e:
+                log(f"⛔ Search stream rejected for '{query}': {e}")
+                yield ndjson_line({"type": "error", "query": query, "error": "Search capacity exhausted",
+                                   "retry_after": e.retry_after})
+                return
+            except Exception as e:
+                log_error(f"Search stream error: {str(e)}")
+                yield ndjson_line({"type": "error", "query": query, "error": "Search temporarily unavailable"})
+                return
+            
+            # The final list is authoritative (n8n and cached results never emit per-card events)
+            results = outcome["results"]
+            for index, movie in enumerate(results):
+                event_type = "update" if index in sent else "movie"
+                payload = {"fields": movie} if index in sent else {"movie": movie}
+                yield ndjson_line({"type": event_type, "index": index, **payload})
+            
+            yield ndjson_line({
+                "type": "done",
+                "query": query,
+                "total": len(results),
+                "source": outcome["source"],
+                "cached": outcome["cached"],
+                "tier": outcome.get("tier"),
+                "stale": False,
+                "coalesced": coalesced,
+                "waiters": waiters,
+                "search_time": round(time.time() - start_time, 2),
+            })
+        finally:
+            search_events.unsubscribe(flight_key, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def cleanup_memory() -> Optional[str]:
+    """Governor tier 1: drop expired and least recently used cache entries"""
+    expired = cache.purge_expired()
+    evicted = cache.trim(10) + stream_url_cache.trim(200)
+    gc.collect()
+    return f"purged {expired} expired and {evicted} old cache entries"
+
+async def close_idle_contexts() -> Optional[str]:
+    """Governor tier 2: close pooled contexts no search is using"""
+    closed = await browser_pool.close_idle()
+    if not closed:
+        return None
+    gc.collect()
+    return f"closed {closed} idle browser context(s)"
+
+async def shutdown_idle_browser() -> Optional[str]:
+    """Governor tier 3: stop Chromium entirely when nothing is using it"""
+    if browser_instance is None or not browser_pool.is_idle():
+        return None
+    # One-off JS-tier contexts aren't pooled; don't pull the browser out from under them
+    if len(browser_instance.contexts) > browser_pool.open_contexts:
+        return None
+    await browser_pool.close()
+    await close_browser()
+    gc.collect()
+    return "shut down idle browser"
+
+# Tiers fire at fixed fractions of the budget, cheapest first; past the last
+# one new local scrapes are refused until memory recovers
+MEMORY_BUDGET_MB = float(os.environ.get("MEMORY_BUDGET_MB", "512"))
+MEMORY_SAMPLE_INTERVAL = float(os.environ.get("MEMORY_SAMPLE_INTERVAL", "5"))
+memory_governor = MemoryGovernor(
+    [
+        SheddingTier("shrink-caches", MEMORY_BUDGET_MB * 0.60, cleanup_memory),
+        SheddingTier("close-idle-contexts", MEMORY_BUDGET_MB * 0.70, close_idle_contexts),
+        SheddingTier("shutdown-idle-browser", MEMORY_BUDGET_MB * 0.80, shutdown_idle_browser),
+    ],
+    refuse_threshold_mb=MEMORY_BUDGET_MB * 0.90,
+    interval=MEMORY_SAMPLE_INTERVAL,
+)
+
+@app.get("/api/suggest")
+async def suggest_titles(q: str = "", limit: int = 8):
+    """Typeahead suggestions from the in-process title index"""
+    start = time.perf_counter()
+    suggestions = suggest_index.suggest(q, limit=max(0, min(limit, 20)))
+    return {
+        "query": q,
+        "suggestions": suggestions,
+        "took_us": round((time.perf_counter() - start) * 1e6, 1),
+    }
+
+def browser_page_samples():
+    contexts = browser_instance.contexts if browser_instance is not None else []
+    return [({}, sum(len(context.pages) for context in contexts))]
+
+metrics.gauge(
+    "movie_search_browser_contexts_open", "Browser contexts currently open",
+    collect=lambda: [({}, len(browser_instance.contexts) if browser_instance is not None else 0)],
+)
+metrics.gauge("movie_search_browser_pages_open", "Browser pages currently open", collect=browser_page_samples)
+metrics.gauge(
+    "movie_search_browser_pool_in_use", "Pooled browser contexts currently leased",
+    collect=lambda: [({}, browser_pool.in_use)],
+)
+metrics.gauge(
+    "movie_search_scrape_queue_depth", "Scrapes waiting for a Chromium slot", ("lane",),
+    collect=lambda: [({"lane": lane}, stats["depth"]) for lane, stats in scrape_scheduler.stats()["lanes"].items()],
+)
+metrics.gauge(
+    "movie_search_process_tree_rss_bytes", "RSS of the server process and its browser children",
+    collect=lambda: [({}, get_memory_usage() * 1024 * 1024)],
+)
+metrics.gauge(
+    "movie_search_mirror_latency_seconds", "Moving average response time per site mirror", ("mirror",),
+    collect=lambda: [({"mirror": mirror.url}, mirror.latency_ewma)
+                     for mirror in mirror_registry.mirrors if mirror.latency_ewma is not None],
+)
+metrics.gauge(
+    "movie_search_mirror_error_score", "Moving average error rate per site mirror (0-1)", ("mirror",),
+    collect=lambda: [({"mirror": mirror.url}, mirror.error_ewma) for mirror in mirror_registry.mirrors],
+)
+metrics.counter(
+    "movie_search_n8n_trigger_attempts_total", "n8n webhook trigger attempts by outcome", ("outcome",),
+    collect=lambda: [({"outcome": "success"}, n8n_trigger_stats["successes"]),
+                     ({"outcome": "failure"}, n8n_trigger_stats["failures"])],
+)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition of stage latencies, cache and browser metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/api/health")
 async def health_check():
     """Health check with memory monitoring"""
     memory_usage = get_memory_usage()
-    cache_size = len(cache.cache)
+    cache_size = len(cache)
     
     return {
         "status": "healthy",
         "memory_usage": f"{memory_usage:.1f}MB",
         "memory_limit": "512MB",
         "cache_entries": cache_size,
-        "browser_active": browser_instance is not None
+        "cache": cache.stats(),
+        "disk_cache": await disk_cache.stats() if DISK_CACHE_ENABLED else None,
+        "stream_cache": stream_url_cache.stats(),
+        "search_flights": search_flights.stats(),
+        "search_refresh": search_refresher.stats(),
+        "memory_governor": memory_governor.stats(),
+        "suggest_index": suggest_index.stats(),
+        "catalog": catalog_crawler.stats(),
+        "mirrors": mirror_registry.stats(),
+        "n8n_waiters": len(n8n_waiters),
+        "n8n_trigger": {**n8n_trigger_stats, "preferred_variant": n8n_preferred_variant},
+        "browser_active": browser_instance is not None,
+        "browser_pool": browser_pool.stats(),
+        "scrape_scheduler": scrape_scheduler.stats(),
+        "scrape_tiers": local_engine.stats(),
+        "resource_blocking": resource_blocker.stats()
     }
 
 @app.get("/api/cache/clear")
 async def clear_cache():
     """Clear cache to free memory"""
-    cache.cache.clear()
-    cache.access_times.clear()
+    cache.clear()
+    if DISK_CACHE_ENABLED:
+        await disk_cache.clear()
     gc.collect()
     
     return {
@@ -480,11 +1768,17 @@ async def append_movie_results(request: Request):
         total_results = data.get('totalResults', 0)
         source = data.get('source', 'unknown')
         
-        print(f"📥 Received {total_results} movies from {source} for query: '{search_query}'")
+        log(f"📥 Received {total_results} movies from {source} for query: '{search_query}'")
         
         # Store in cache for later retrieval
-        cache_key = f"n8n_results_{search_query.lower()}"
-        cache.set(cache_key, data)  # Cache for 1 hour
+        cache_key = n8n_results_key(search_query)
+        cache_set(cache_key, data, ttl=SEARCH_HARD_TTL)
+        suggest_index.add_many(movie.get('title', '') for movie in data.get('movies') or [])
+        
+        # Wake any searches waiting on this query
+        woken = n8n_waiters.notify(cache_key, data)
+        if woken:
+            log(f"🔔 Delivered n8n results to {woken} waiting request(s)")
         
         # Format response
         response_data = {
@@ -500,7 +1794,7 @@ async def append_movie_results(request: Request):
         return response_data
         
     except Exception as e:
-        print(f"❌ Error processing n8n results: {e}")
+        log_error(f"❌ Error processing n8n results: {e}")
         return {
             "status": "error", 
             "message": f"Failed to process results: {str(e)}"
@@ -510,8 +1804,8 @@ async def append_movie_results(request: Request):
 async def get_n8n_results(query: str):
     """Retrieve cached n8n results for a specific query"""
     try:
-        cache_key = f"n8n_results_{query.lower()}"
-        cached_data = cache.get(cache_key)
+        cache_key = n8n_results_key(query)
+        cached_data = await cache_get(cache_key)
         
         if cached_data:
             return {
@@ -539,7 +1833,7 @@ async def manual_trigger_n8n(request: Request):
         data = await request.json()
         query = data.get('query', 'lokah')
         
-        print(f"🧪 Manual n8n trigger for: '{query}'")
+        log(f"🧪 Manual n8n trigger for: '{query}'")
         
         # Trigger the workflow
         success = await trigger_n8n_workflow(query)
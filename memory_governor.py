@@ -0,0 +1,145 @@
+"""
+Memory-budget governor
+Samples RSS for the whole process tree (Python plus Chromium and the
+Playwright driver) at a fixed interval and sheds load in tiers as usage
+climbs toward the budget, logging RSS before and after every action.
+"""
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import psutil
+
+from tracing import log, log_error
+
+def process_tree_rss_mb(pid: Optional[int] = None) -> float:
+    """RSS of a process and all of its descendants, in MB"""
+    root = psutil.Process(pid or os.getpid())
+    total = root.memory_info().rss
+    for child in root.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # Children come and go (renderers, driver restarts)
+            continue
+    return total / 1024 / 1024
+
+class SheddingTier:
+    """One load-shedding step: runs its action while RSS is at/above threshold_mb"""
+
+    def __init__(self, name: str, threshold_mb: float, action: Callable[[], Awaitable[Optional[str]]],
+                 cooldown: float = 30.0):
+        self.name = name
+        self.threshold_mb = threshold_mb
+        # Returns a short description of what was freed, or None if there was nothing to do
+        self.action = action
+        self.cooldown = cooldown
+        self.last_run = 0.0
+        self.runs = 0
+        self.freed_mb = 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "threshold_mb": round(self.threshold_mb, 1),
+            "runs": self.runs,
+            "freed_mb": round(self.freed_mb, 1),
+        }
+
+class MemoryGovernor:
+    """Background sampler that walks SheddingTiers from cheapest to most drastic"""
+
+    def __init__(self, tiers: Sequence[SheddingTier], refuse_threshold_mb: float,
+                 interval: float = 5.0, hysteresis_mb: float = 30.0,
+                 sample: Callable[[], float] = process_tree_rss_mb):
+        self.tiers: List[SheddingTier] = sorted(tiers, key=lambda tier: tier.threshold_mb)
+        # Past this, new local scrapes are refused until RSS falls hysteresis_mb below it
+        self.refuse_threshold_mb = refuse_threshold_mb
+        self.interval = interval
+        self.hysteresis_mb = hysteresis_mb
+        self.sample = sample
+        self.refusing = False
+        self.refused = 0
+        self.samples = 0
+        self.last_rss_mb: Optional[float] = None
+        self.peak_rss_mb = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def refuse(self, what: str) -> bool:
+        """True (and counted) if work like `what` should be refused right now"""
+        if self.refusing:
+            self.refused += 1
+            log(f"🧯 Refusing {what}: memory {self.last_rss_mb:.0f}MB over {self.refuse_threshold_mb:.0f}MB")
+        return self.refusing
+
+    def _measure(self) -> float:
+        rss = self.sample()
+        self.samples += 1
+        self.last_rss_mb = rss
+        self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        return rss
+
+    async def check(self) -> float:
+        """Take one sample and run every due tier whose threshold is exceeded"""
+        rss = self._measure()
+        for tier in self.tiers:
+            if rss < tier.threshold_mb:
+                break
+            now = time.monotonic()
+            if now - tier.last_run < tier.cooldown:
+                continue
+            tier.last_run = now
+            try:
+                outcome = await tier.action()
+            except Exception as e:
+                log_error(f"❌ Governor tier '{tier.name}' failed: {e}")
+                continue
+            if outcome is None:
+                continue
+            after = self._measure()
+            tier.runs += 1
+            tier.freed_mb += max(0.0, rss - after)
+            log(f"🧯 Governor tier '{tier.name}': {outcome} ({rss:.0f}MB -> {after:.0f}MB)")
+            rss = after
+
+        if rss >= self.refuse_threshold_mb and not self.refusing:
+            self.refusing = True
+            log(f"🧯 Memory {rss:.0f}MB over {self.refuse_threshold_mb:.0f}MB: refusing new local scrapes")
+        elif self.refusing and rss < self.refuse_threshold_mb - self.hysteresis_mb:
+            self.refusing = False
+            log(f"✅ Memory back to {rss:.0f}MB: accepting local scrapes again")
+        return rss
+
+    async def _run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                log_error(f"❌ Memory governor sample failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "rss_mb": round(self.last_rss_mb, 1) if self.last_rss_mb is not None else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "refusing_local_scrapes": self.refusing,
+            "refuse_threshold_mb": round(self.refuse_threshold_mb, 1),
+            "refused": self.refused,
+            "samples": self.samples,
+            "tiers": {tier.name: tier.stats() for tier in self.tiers},
+        }
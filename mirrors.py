@@ -0,0 +1,247 @@
+"""
+Mirror registry with health-scored routing and hedged requests
+Every request to a site mirror feeds a moving average of its latency and
+error rate. Requests go to the healthiest mirror; a race sends the same
+request to the next mirror too if the first is slow (immediately, while
+some mirror has no samples yet) and uses whichever answers first.
+Mirrors that fail repeatedly sit out a cooldown.
+"""
+import asyncio
+import concurrent.futures
+import os
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from tracing import log
+
+T = TypeVar("T")
+
+class Mirror:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.wins = 0
+        self.last_error: Optional[str] = None
+
+    def score(self, now: float) -> float:
+        """Lower is healthier: expected latency inflated by the error rate"""
+        if now < self.cooldown_until:
+            return float("inf")
+        latency = self.latency_ewma if self.latency_ewma is not None else 0.0
+        return latency * (1 + 4 * self.error_ewma) + self.error_ewma
+
+    def stats(self) -> Dict:
+        return {
+            "latency_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "error_score": round(self.error_ewma, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "wins": self.wins,
+            "cooling_down": time.monotonic() < self.cooldown_until,
+            "last_error": self.last_error,
+        }
+
+class MirrorRegistry:
+    """Health-ranked set of interchangeable site base URLs"""
+
+    def __init__(self, urls: Sequence[str], alpha: float = 0.3, fanout: int = 2,
+                 hedge_factor: float = 2.0, min_hedge_delay: float = 0.3,
+                 failure_threshold: int = 3, cooldown: float = 60.0):
+        self.alpha = alpha
+        # Mirrors a single race may use, and when to start the next one (x the leader's latency)
+        self.fanout = fanout
+        self.hedge_factor = hedge_factor
+        self.min_hedge_delay = min_hedge_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.races = 0
+        self.hedged = 0
+        self.mirrors: List[Mirror] = []
+        self.set_urls(urls)
+
+    def set_urls(self, urls: Sequence[str]):
+        """Replace the mirror list (keeps history for URLs that stay)"""
+        known = {mirror.url: mirror for mirror in self.mirrors}
+        self.mirrors = [known.get(url.rstrip("/")) or Mirror(url) for url in urls if url]
+        if not self.mirrors:
+            raise ValueError("at least one mirror URL is required")
+
+    def mirror_for(self, url: str) -> Optional[Mirror]:
+        for mirror in self.mirrors:
+            if url == mirror.url or url.startswith(mirror.url + "/") or url.startswith(mirror.url + "?"):
+                return mirror
+        return None
+
+    def ranked(self) -> List[Mirror]:
+        """Healthiest first; configuration order breaks ties"""
+        now = time.monotonic()
+        return sorted(self.mirrors, key=lambda mirror: mirror.score(now))
+
+    def best(self) -> str:
+        return self.ranked()[0].url
+
+    def record(self, url: str, latency: Optional[float], ok: bool, error: Optional[str] = None):
+        """Feed one request outcome (url may be any page on the mirror)"""
+        mirror = self.mirror_for(url)
+        if mirror is None:
+            return
+        mirror.requests += 1
+        mirror.error_ewma = (1 - self.alpha) * mirror.error_ewma + self.alpha * (0.0 if ok else 1.0)
+        if latency is not None and ok:
+            mirror.latency_ewma = latency if mirror.latency_ewma is None else (
+                (1 - self.alpha) * mirror.latency_ewma + self.alpha * latency)
+        if ok:
+            mirror.consecutive_failures = 0
+            return
+        mirror.failures += 1
+        mirror.consecutive_failures += 1
+        mirror.last_error = error
+        if mirror.consecutive_failures >= self.failure_threshold and len(self.mirrors) > 1:
+            mirror.cooldown_until = time.monotonic() + self.cooldown
+            mirror.consecutive_failures = 0
+            log(f"🪞 Mirror {mirror.url} cooling down for {self.cooldown:.0f}s ({error})")
+
+    def record_cancelled(self, url: str, elapsed: float):
+        """A hedge loser was abandoned after elapsed seconds: its latency is at least that"""
+        mirror = self.mirror_for(url)
+        if mirror is not None and (mirror.latency_ewma is None or elapsed > mirror.latency_ewma):
+            mirror.latency_ewma = elapsed if mirror.latency_ewma is None else (
+                (1 - self.alpha) * mirror.latency_ewma + self.alpha * elapsed)
+
+    @contextmanager
+    def track(self, url: str):
+        """Record the enclosed request's latency, or a failure if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(url, None, ok=False, error=f"{type(e).__name__}: {e}"[:200])
+            raise
+        self.record(url, time.perf_counter() - start, ok=True)
+
+    def _plan(self) -> Tuple[List[Mirror], float]:
+        """Mirrors for one race, and the delay before each hedge (0 while any is unmeasured)"""
+        candidates = self.ranked()[:max(1, self.fanout)]
+        if any(mirror.latency_ewma is None for mirror in candidates):
+            return candidates, 0.0
+        return candidates, max(self.min_hedge_delay, candidates[0].latency_ewma * self.hedge_factor)
+
+    def _won(self, mirror: Mirror, started: int):
+        mirror.wins += 1
+        self.races += 1
+        if started > 1:
+            self.hedged += 1
+
+    async def race(self, fetch: Callable[[str], Awaitable[T]]) -> Tuple[T, str]:
+        """Run fetch(base_url) against the best mirror, hedged; returns (result, winning base_url).
+
+        fetch should raise for answers that are unusable (errors, challenge pages)
+        so another mirror can win; if every mirror fails, the last error is raised.
+        """
+        candidates, hedge_delay = self._plan()
+
+        async def attempt(mirror: Mirror) -> T:
+            start = time.perf_counter()
+            try:
+                with self.track(mirror.url):
+                    return await fetch(mirror.url)
+            except asyncio.CancelledError:
+                # Otherwise a mirror that always loses would never be measured
+                self.record_cancelled(mirror.url, time.perf_counter() - start)
+                raise
+
+        pending: Dict[asyncio.Task, Mirror] = {}
+        next_index = 0
+        last_error: Optional[BaseException] = None
+        try:
+            while True:
+                if next_index < len(candidates) and (not pending or hedge_delay == 0):
+                    mirror = candidates[next_index]
+                    pending[asyncio.ensure_future(attempt(mirror))] = mirror
+                    next_index += 1
+                    if hedge_delay == 0:
+                        continue
+                if not pending:
+                    raise last_error
+                timeout = hedge_delay if next_index < len(candidates) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Leader is slow: hedge with the next mirror
+                    mirror = candidates[next_index]
+                    pending[asyncio.ensure_future(attempt(mirror))] = mirror
+                    next_index += 1
+                    continue
+                for task in done:
+                    mirror = pending.pop(task)
+                    if task.exception() is None:
+                        self._won(mirror, next_index)
+                        return task.result(), mirror.url
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def race_sync(self, fetch: Callable[[str], T]) -> Tuple[T, str]:
+        """Blocking race() for synchronous scrapers; losers finish (and are recorded) in the background.
+
+        fetch runs on several worker threads at once and may outlive the race, so
+        it must not share thread-unsafe state such as a requests.Session.
+        """
+        candidates, hedge_delay = self._plan()
+
+        def attempt(mirror: Mirror) -> T:
+            with self.track(mirror.url):
+                return fetch(mirror.url)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(candidates))
+        pending: Dict[concurrent.futures.Future, Mirror] = {}
+        next_index = 0
+        last_error: Optional[BaseException] = None
+        try:
+            while True:
+                if next_index < len(candidates) and (not pending or hedge_delay == 0):
+                    pending[executor.submit(attempt, candidates[next_index])] = candidates[next_index]
+                    next_index += 1
+                    if hedge_delay == 0:
+                        continue
+                if not pending:
+                    raise last_error
+                timeout = hedge_delay if next_index < len(candidates) else None
+                done, _ = concurrent.futures.wait(pending, timeout=timeout,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                if not done:
+                    pending[executor.submit(attempt, candidates[next_index])] = candidates[next_index]
+                    next_index += 1
+                    continue
+                for future in done:
+                    mirror = pending.pop(future)
+                    if future.exception() is None:
+                        self._won(mirror, next_index)
+                        return future.result(), mirror.url
+                    last_error = future.exception()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        return {
+            "best": self.best(),
+            "races": self.races,
+            "hedged": self.hedged,
+            "mirrors": {mirror.url: mirror.stats() for mirror in self.mirrors},
+        }
+
+DEFAULT_MIRRORS = "https://www.5movierulz.chat,https://www.5movierulz.irish"
+
+# Process-wide registry shared by main and the scraper modules
+mirror_registry = MirrorRegistry(
+    [url.strip() for url in os.environ.get("MIRROR_URLS", DEFAULT_MIRRORS).split(",")],
+    fanout=int(os.environ.get("MIRROR_FANOUT", "2")),
+    min_hedge_delay=float(os.environ.get("MIRROR_MIN_HEDGE_DELAY", "0.3")),
+    cooldown=float(os.environ.get("MIRROR_COOLDOWN", "60")),
+)
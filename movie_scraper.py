@@ -1,15 +1,68 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import os
 import re
+import threading
 import time
 from typing import List, Dict, Optional
 from urllib.parse import urljoin, quote
 
+from mirrors import MirrorRegistry, mirror_registry
+from tracing import log, log_error
+
+# Result containers: div/article/li whose class mentions a movie-ish word
+CONTAINER_TAGS = ['div', 'article', 'li']
+CONTAINER_CLASS_RE = re.compile(r'(movie|film|post|result)', re.I)
+TITLE_CLASS_RE = re.compile(r'(title|name)', re.I)
+
+# Browse selectors that can be answered from <a> tags alone, without ancestors
+LINK_ONLY_SELECTORS = ['a[href*="movie"]', 'a[href*="film"]']
+BROWSE_SELECTORS = LINK_ONLY_SELECTORS + [
+    '.movie-item a',
+    '.film-item a',
+    '.post-title a',
+    'h2 a',
+    'h3 a',
+    '.entry-title a'
+]
+
+POSTER_SELECTORS = [
+    'img[alt*="poster"]',
+    'img[class*="poster"]',
+    '.movie-poster img',
+    '.film-poster img',
+    'img[src*="poster"]'
+]
+
+def default_html_parser() -> str:
+    """Pick the HTML parser backend: SCRAPER_HTML_PARSER, else lxml if installed"""
+    configured = os.environ.get("SCRAPER_HTML_PARSER")
+    if configured:
+        return configured
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        log("⚠️ lxml not installed: MovieScraper falls back to the slower html.parser")
+        return "html.parser"
+
 class MovieScraper:
-    def __init__(self):
-        self.base_url = "https://www.5movierulz.irish"
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, parser: Optional[str] = None, mirrors: Optional[MirrorRegistry] = None):
+        # Site mirrors share health scores process-wide; base_url follows the last winning mirror
+        self.mirrors = mirrors or mirror_registry
+        self.base_url = self.mirrors.best()
+        # BeautifulSoup tree builder ("lxml" is C-backed, "html.parser" pure Python)
+        self.parser = parser or default_html_parser()
+        self.session = self._new_session()
+        # race_sync runs hedges on worker threads at once, and losers keep running
+        # after the race returns; requests.Session isn't thread-safe, so each of
+        # those threads gets its own
+        self._hedge_sessions = threading.local()
+    
+    @staticmethod
+    def _new_session() -> requests.Session:
+        session = requests.Session()
+        session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
@@ -17,6 +70,14 @@ class MovieScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
+        return session
+    
+    def _hedge_session(self) -> requests.Session:
+        """Session private to the calling race_sync worker thread"""
+        session = getattr(self._hedge_sessions, 'session', None)
+        if session is None:
+            session = self._hedge_sessions.session = self._new_session()
+        return session
         
     def search_movies(self, query: str, max_results: int = 20) -> List[Dict]:
         """
@@ -44,7 +105,7 @@ class MovieScraper:
             return results[:max_results]
             
         except Exception as e:
-            print(f"Error searching movies: {str(e)}")
+            log_error(f"Error searching movies: {str(e)}")
             return []
     
     def _search_via_search_page(self, query: str) -> List[Dict]:
@@ -53,101 +114,122 @@ class MovieScraper:
         """
         try:
             # Common search URL patterns
-            search_urls = [
-                f"{self.base_url}/search/{quote(query)}",
-                f"{self.base_url}/?s={quote(query)}",
-                f"{self.base_url}/search?q={quote(query)}",
+            search_paths = [
+                f"/search/{quote(query)}",
+                f"/?s={quote(query)}",
+                f"/search?q={quote(query)}",
             ]
             
-            for search_url in search_urls:
+            for search_path in search_paths:
                 try:
-                    response = self.session.get(search_url, timeout=10)
-                    if response.status_code == 200:
-                        results = self._parse_search_results(response.text, query)
-                        if results:
-                            return results
+                    # Raced across mirrors; losers may still be running, so bind the path
+                    response, self.base_url = self.mirrors.race_sync(
+                        lambda base_url, search_path=search_path: self._get_ok(base_url + search_path)
+                    )
+                    results = self._parse_search_results(response.text, query)
+                    if results:
+                        return results
                 except:
                     continue
                     
             return []
             
         except Exception as e:
-            print(f"Error in search page method: {str(e)}")
+            log_error(f"Error in search page method: {str(e)}")
             return []
     
+    def _get_ok(self, url: str) -> requests.Response:
+        """GET that raises unless the page came back 200, so another mirror can win a race"""
+        response = self._hedge_session().get(url, timeout=10)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"status {response.status_code} for {url}", response=response)
+        return response
+    
+    def _soup(self, html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse html with the configured backend, optionally only the strained subtrees"""
+        return BeautifulSoup(html, self.parser, parse_only=parse_only)
+    
     def _search_via_browsing(self, query: str) -> List[Dict]:
         """
         Search by browsing through movie listings
         """
         try:
             # Try to get the main page and look for movie listings
-            response = self.session.get(self.base_url, timeout=10)
-            if response.status_code != 200:
+            try:
+                response, self.base_url = self.mirrors.race_sync(self._get_ok)
+            except requests.RequestException:
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Look for movie links and titles
-            movie_elements = []
-            
-            # Common selectors for movie listings
-            selectors = [
-                'a[href*="movie"]',
-                'a[href*="film"]',
-                '.movie-item a',
-                '.film-item a',
-                '.post-title a',
-                'h2 a',
-                'h3 a',
-                '.entry-title a'
-            ]
-            
-            for selector in selectors:
-                elements = soup.select(selector)
-                if elements:
-                    movie_elements.extend(elements)
-                    break
-            
             # Filter results based on query
             results = []
-            for element in movie_elements:
-                title = element.get_text(strip=True)
-                if query.lower() in title.lower():
-                    movie_url = urljoin(self.base_url, element.get('href', ''))
-                    
-                    movie_data = {
-                        'title': title,
-                        'url': movie_url,
-                        'source': '5movierulz',
-                        'year': self._extract_year(title),
-                        'poster': self._get_poster_from_page(movie_url),
-                        'genre': 'Unknown',
-                        'rating': 'N/A'
-                    }
-                    results.append(movie_data)
-                    
-                    if len(results) >= 10:  # Limit browsing results
-                        break
+            for title, movie_url in self._find_browse_links(response.text, query):
+                movie_data = {
+                    'title': title,
+                    'url': movie_url,
+                    'source': '5movierulz',
+                    'year': self._extract_year(title),
+                    'poster': self._get_poster_from_page(movie_url),
+                    'genre': 'Unknown',
+                    'rating': 'N/A'
+                }
+                results.append(movie_data)
+                
+                if len(results) >= 10:  # Limit browsing results
+                    break
             
             return results
             
         except Exception as e:
-            print(f"Error in browsing method: {str(e)}")
+            log_error(f"Error in browsing method: {str(e)}")
             return []
     
+    def _find_browse_links(self, html: str, query: str) -> List[tuple]:
+        """
+        Find (title, url) pairs for movie links on a listing page matching query
+        """
+        # Look for movie links and titles
+        movie_elements = []
+        
+        # The common case only needs <a> tags, so build just those first;
+        # the ancestor-based selectors fall back to a full parse
+        links_soup = self._soup(html, SoupStrainer('a'))
+        full_soup = None
+        for selector in BROWSE_SELECTORS:
+            if selector in LINK_ONLY_SELECTORS:
+                elements = links_soup.select(selector)
+            else:
+                if full_soup is None:
+                    full_soup = self._soup(html)
+                elements = full_soup.select(selector)
+            if elements:
+                movie_elements.extend(elements)
+                break
+        
+        links = []
+        for element in movie_elements:
+            title = element.get_text(strip=True)
+            if query.lower() in title.lower():
+                links.append((title, urljoin(self.base_url, element.get('href', ''))))
+                
+                if len(links) >= 10:  # Limit browsing results
+                    break
+        
+        return links
+    
     def _parse_search_results(self, html: str, query: str) -> List[Dict]:
         """
         Parse search results from HTML
         """
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # Only build the result containers (and their subtrees)
+            soup = self._soup(html, SoupStrainer(CONTAINER_TAGS, class_=CONTAINER_CLASS_RE))
             results = []
             
             # Look for common movie result patterns
-            movie_containers = soup.find_all(['div', 'article', 'li'], class_=re.compile(r'(movie|film|post|result)', re.I))
+            movie_containers = soup.find_all(CONTAINER_TAGS, class_=CONTAINER_CLASS_RE)
             
             for container in movie_containers:
-                title_element = container.find(['h1', 'h2', 'h3', 'h4', 'a'], class_=re.compile(r'(title|name)', re.I))
+                title_element = container.find(['h1', 'h2', 'h3', 'h4', 'a'], class_=TITLE_CLASS_RE)
                 if not title_element:
                     title_element = container.find('a')
                 
@@ -176,7 +258,7 @@ class MovieScraper:
             return results
             
         except Exception as e:
-            print(f"Error parsing search results: {str(e)}")
+            log_error(f"Error parsing search results: {str(e)}")
             return []
     
     def _extract_year(self, title: str) -> str:
@@ -193,31 +275,35 @@ class MovieScraper:
         try:
             response = self.session.get(url, timeout=5)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Look for poster images
-                poster_selectors = [
-                    'img[alt*="poster"]',
-                    'img[class*="poster"]',
-                    '.movie-poster img',
-                    '.film-poster img',
-                    'img[src*="poster"]'
-                ]
-                
-                for selector in poster_selectors:
-                    img = soup.select_one(selector)
-                    if img:
-                        return urljoin(self.base_url, img.get('src', ''))
-                        
-                # Fallback to first image
-                first_img = soup.find('img')
-                if first_img:
-                    return urljoin(self.base_url, first_img.get('src', ''))
+                return self._parse_poster(response.text)
                     
         except:
             pass
         
         return ''
+    
+    def _parse_poster(self, html: str) -> str:
+        """
+        Pick the poster image URL out of a movie page
+        """
+        # Ancestor-based selectors need the full tree; otherwise <img> tags suffice
+        if 'movie-poster' in html or 'film-poster' in html:
+            soup = self._soup(html)
+        else:
+            soup = self._soup(html, SoupStrainer('img'))
+        
+        # Look for poster images
+        for selector in POSTER_SELECTORS:
+            img = soup.select_one(selector)
+            if img:
+                return urljoin(self.base_url, img.get('src', ''))
+                
+        # Fallback to first image
+        first_img = soup.find('img')
+        if first_img:
+            return urljoin(self.base_url, first_img.get('src', ''))
+        
+        return ''
 
 # Test function
 def test_scraper():
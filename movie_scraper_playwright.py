@@ -6,9 +6,15 @@ from playwright.async_api import async_playwright, Browser, Page
 from urllib.parse import urljoin, quote
 import time
 
+from card_extractor import extract_cards
+from mirrors import mirror_registry
+from resource_blocking import resource_blocker
+from tracing import log, log_error
+
 class PlaywrightMovieScraper:
     def __init__(self):
-        self.base_url = "https://www.5movierulz.irish"
+        # Healthiest mirror at creation; navigations feed its health score
+        self.base_url = mirror_registry.best()
         self.browser = None
         self.context = None
         
@@ -59,6 +65,9 @@ class PlaywrightMovieScraper:
             timezone_id='America/New_York'
         )
         
+        # Block ads, trackers, fonts and media for every page in the context
+        await resource_blocker.install(self.context)
+        
         # Add stealth scripts
         await self.context.add_init_script("""
             // Override the navigator.webdriver property
@@ -120,7 +129,7 @@ class PlaywrightMovieScraper:
                         if len(results) >= max_results:
                             break
                 except Exception as e:
-                    print(f"Search method failed: {str(e)}")
+                    log_error(f"Search method failed: {str(e)}")
                     continue
             
             # Remove duplicates and limit results
@@ -128,7 +137,7 @@ class PlaywrightMovieScraper:
             return unique_results[:max_results]
             
         except Exception as e:
-            print(f"Error in search_movies: {str(e)}")
+            log_error(f"Error in search_movies: {str(e)}")
             return []
     
     async def _search_via_search_page(self, query: str) -> List[Dict]:
@@ -136,15 +145,13 @@ class PlaywrightMovieScraper:
         page = await self.context.new_page()
         
         try:
-            # Block ads and unnecessary resources
-            await page.route("**/*", self._block_resources)
-            
             # Use the specific search URL pattern
             search_url = f"{self.base_url}/search_movies?s={quote(query)}"
-            print(f"🔍 Searching URL: {search_url}")
+            log(f"🔍 Searching URL: {search_url}")
             
             # Navigate directly to search results
-            await page.goto(search_url, wait_until='domcontentloaded', timeout=30000)
+            with mirror_registry.track(self.base_url):
+                await page.goto(search_url, wait_until='domcontentloaded', timeout=30000)
             await self._handle_popups_and_redirects(page)
             
             # Wait for content to load
@@ -155,7 +162,7 @@ class PlaywrightMovieScraper:
             return results
             
         except Exception as e:
-            print(f"Search page method failed: {str(e)}")
+            log_error(f"Search page method failed: {str(e)}")
             return []
         finally:
             await page.close()
@@ -165,7 +172,6 @@ class PlaywrightMovieScraper:
         page = await self.context.new_page()
         
         try:
-            await page.route("**/*", self._block_resources)
             await page.goto(self.base_url, wait_until='domcontentloaded', timeout=30000)
             await self._handle_popups_and_redirects(page)
             
@@ -203,7 +209,7 @@ class PlaywrightMovieScraper:
             return results
             
         except Exception as e:
-            print(f"Homepage browse failed: {str(e)}")
+            log_error(f"Homepage browse failed: {str(e)}")
             return []
         finally:
             await page.close()
@@ -213,7 +219,6 @@ class PlaywrightMovieScraper:
         page = await self.context.new_page()
         
         try:
-            await page.route("**/*", self._block_resources)
             await page.goto(self.base_url, wait_until='domcontentloaded', timeout=30000)
             await self._handle_popups_and_redirects(page)
             
@@ -237,7 +242,7 @@ class PlaywrightMovieScraper:
             return results
             
         except Exception as e:
-            print(f"Category search failed: {str(e)}")
+            log_error(f"Category search failed: {str(e)}")
             return []
         finally:
             await page.close()
@@ -247,7 +252,6 @@ class PlaywrightMovieScraper:
         page = await self.context.new_page()
         
         try:
-            await page.route("**/*", self._block_resources)
             await page.goto(category_url, wait_until='domcontentloaded', timeout=20000)
             await asyncio.sleep(2)
             
@@ -264,18 +268,14 @@ class PlaywrightMovieScraper:
         results = []
         
         try:
-            print("🔍 Parsing movie results...")
+            log("🔍 Parsing movie results...")
             
             # Wait for content to load
             await page.wait_for_load_state('networkidle', timeout=10000)
             
-            # Get page content for debugging
-            content = await page.content()
-            print(f"📄 Page title: {await page.title()}")
+            log(f"📄 Page title: {await page.title()}")
             
             # Try multiple approaches to find all movies
-            all_movie_elements = []
-            
             # Approach 1: Look for specific movie containers (prioritize the working ones)
             movie_selectors = [
                 'div[class*="film"]',  # This one worked in debug - put it first
@@ -297,12 +297,6 @@ class PlaywrightMovieScraper:
                 '.movie-box'
             ]
             
-            for selector in movie_selectors:
-                elements = await page.query_selector_all(selector)
-                if elements:
-                    print(f"✅ Found {len(elements)} elements with selector: {selector}")
-                    all_movie_elements.extend(elements)
-            
             # Approach 2: Look for movie links directly
             link_selectors = [
                 'a[href*="movie"]',
@@ -313,43 +307,28 @@ class PlaywrightMovieScraper:
                 'h1 a', 'h2 a', 'h3 a', 'h4 a'
             ]
             
-            for selector in link_selectors:
-                elements = await page.query_selector_all(selector)
-                if elements:
-                    print(f"🔗 Found {len(elements)} links with selector: {selector}")
-                    all_movie_elements.extend(elements)
-            
-            # Remove duplicates while preserving order
-            seen_elements = set()
-            movie_elements = []
-            for element in all_movie_elements:
-                element_html = await element.inner_html()
-                if element_html not in seen_elements:
-                    seen_elements.add(element_html)
-                    movie_elements.append(element)
+            # Extract every candidate card in one roundtrip; duplicates (same
+            # inner HTML) are dropped in the page, preserving order
+            movie_cards = await extract_cards(page, movie_selectors + link_selectors, limit=100)
             
-            print(f"📊 Total unique elements to process: {len(movie_elements)}")
+            log(f"📊 Total unique elements to process: {len(movie_cards)}")
             
-            for i, element in enumerate(movie_elements[:100]):  # Check many more elements
+            for i, card in enumerate(movie_cards):
                 try:
                     # Try different ways to get the title
                     title = ""
                     
                     # Method 1: Get the full text content of the element first
-                    full_text = await element.inner_text()
+                    full_text = card['text']
                     
                     # Method 2: Look for title in various elements
-                    title_selectors = ['h1', 'h2', 'h3', 'h4', '.title', '.movie-title', '.post-title', '.entry-title']
-                    for title_sel in title_selectors:
-                        title_elem = await element.query_selector(title_sel)
-                        if title_elem:
-                            title = await title_elem.inner_text()
-                            break
+                    if card['heading'] is not None:
+                        title = card['heading']
                     
                     # Method 3: If no specific title found, extract from full text
                     if not title and full_text:
-                        # Split by lines and take the first meaningful line
-                        lines = [line.strip() for line in full_text.split('\n') if line.strip()]
+                        # Take the first meaningful line
+                        lines = card['lines']
                         if lines:
                             # Look for movie title patterns
                             for line in lines:
@@ -360,16 +339,14 @@ class PlaywrightMovieScraper:
                     
                     # Method 4: If still no title, try the element itself or its link
                     if not title:
-                        if await element.get_attribute('href'):  # It's a link
-                            title = await element.inner_text()
-                        else:
-                            link_elem = await element.query_selector('a')
-                            if link_elem:
-                                title = await link_elem.inner_text()
+                        if card['href']:  # It's a link
+                            title = full_text
+                        elif card['links']:
+                            title = card['links'][0]['text']
                     
                     # Method 5: Try title attribute
                     if not title:
-                        title = await element.get_attribute('title') or ""
+                        title = card['title_attr'] or ""
                     
                     # Clean and validate title
                     title = title.strip()
@@ -401,32 +378,30 @@ class PlaywrightMovieScraper:
                     if not matches:
                         continue
                     
-                    print(f"🎬 Found potential movie: {title}")
+                    log(f"🎬 Found potential movie: {title}")
                     
                     # Special handling for elements that contain multiple movies
-                    all_links = await element.query_selector_all('a')
-                    all_images = await element.query_selector_all('img')
+                    all_links = card['links']
+                    all_images = card['images']
                     
                     # If this element has multiple links, it might contain multiple movies
                     if len(all_links) > 1 and len(all_images) > 1:
-                        print(f"🎭 Processing multi-movie element with {len(all_links)} links")
+                        log(f"🎭 Processing multi-movie element with {len(all_links)} links")
                         
                         # Process each link-image pair as a separate movie
                         for link_idx, link in enumerate(all_links):
                             try:
-                                link_href = await link.get_attribute('href')
+                                link_href = link['href']
                                 if not link_href:
                                     continue
                                 
                                 # Try to find corresponding image
-                                img_elem = all_images[link_idx] if link_idx < len(all_images) else all_images[0]
-                                poster_src = await img_elem.get_attribute('src') if img_elem else ""
+                                img = all_images[link_idx] if link_idx < len(all_images) else all_images[0]
+                                poster_src = img['src']
                                 poster_url = urljoin(self.base_url, poster_src) if poster_src and not poster_src.startswith('data:') else ""
                                 
                                 # Extract title from image alt or URL
-                                movie_title = ""
-                                if img_elem:
-                                    movie_title = await img_elem.get_attribute('alt') or ""
+                                movie_title = img['alt'] or ""
                                 
                                 # If no title from image, try to extract from URL
                                 if not movie_title and link_href:
@@ -451,29 +426,26 @@ class PlaywrightMovieScraper:
                                         'rating': 'N/A'
                                     }
                                     results.append(movie_data)
-                                    print(f"✅ Added movie from multi-element: {movie_title} ({year})")
+                                    log(f"✅ Added movie from multi-element: {movie_title} ({year})")
                                     
                             except Exception as e:
-                                print(f"❌ Error processing link {link_idx}: {str(e)}")
+                                log_error(f"❌ Error processing link {link_idx}: {str(e)}")
                                 continue
                     else:
                         # Single movie element - original logic
                         movie_url = ""
-                        href = await element.get_attribute('href')
+                        href = card['href']
                         if href:
                             movie_url = urljoin(self.base_url, href)
-                        else:
-                            link_elem = await element.query_selector('a')
-                            if link_elem:
-                                href = await link_elem.get_attribute('href')
-                                if href:
-                                    movie_url = urljoin(self.base_url, href)
+                        elif all_links:
+                            href = all_links[0]['href']
+                            if href:
+                                movie_url = urljoin(self.base_url, href)
                         
                         # Get poster image
                         poster_url = ""
-                        img_elem = await element.query_selector('img')
-                        if img_elem:
-                            poster_src = await img_elem.get_attribute('src')
+                        if all_images:
+                            poster_src = all_images[0]['src']
                             if poster_src and not poster_src.startswith('data:'):
                                 poster_url = urljoin(self.base_url, poster_src)
                         
@@ -482,11 +454,8 @@ class PlaywrightMovieScraper:
                         
                         # Try to get genre or other info
                         genre = "Unknown"
-                        genre_elem = await element.query_selector('.genre, .category, .meta')
-                        if genre_elem:
-                            genre_text = await genre_elem.inner_text()
-                            if genre_text:
-                                genre = genre_text.strip()
+                        if card['genre']:
+                            genre = card['genre'].strip()
                         
                         movie_data = {
                             'title': title,
@@ -498,16 +467,16 @@ class PlaywrightMovieScraper:
                             'rating': 'N/A'
                         }
                         results.append(movie_data)
-                        print(f"✅ Added movie: {title} ({year})")
+                        log(f"✅ Added movie: {title} ({year})")
                     
                 except Exception as e:
-                    print(f"❌ Error processing element {i}: {str(e)}")
+                    log_error(f"❌ Error processing element {i}: {str(e)}")
                     continue
             
-            print(f"🎯 Total movies found: {len(results)}")
+            log(f"🎯 Total movies found: {len(results)}")
             
         except Exception as e:
-            print(f"❌ Error parsing results: {str(e)}")
+            log_error(f"❌ Error parsing results: {str(e)}")
         
         return results
     
@@ -540,33 +509,7 @@ class PlaywrightMovieScraper:
             page.on('dialog', lambda dialog: asyncio.create_task(dialog.accept()))
             
         except Exception as e:
-            print(f"Error handling popups: {str(e)}")
-    
-    async def _block_resources(self, route):
-        """Block ads, trackers, and unnecessary resources"""
-        url = route.request.url
-        resource_type = route.request.resource_type
-        
-        # Block ads, trackers, and heavy resources
-        blocked_domains = [
-            'googletagmanager.com',
-            'google-analytics.com',
-            'googlesyndication.com',
-            'doubleclick.net',
-            'facebook.com',
-            'twitter.com',
-            'instagram.com',
-            'ads',
-            'analytics',
-            'tracking'
-        ]
-        
-        blocked_types = ['font', 'media']  # Block fonts and media to speed up
-        
-        if any(domain in url for domain in blocked_domains) or resource_type in blocked_types:
-            await route.abort()
-        else:
-            await route.continue_()
+            log_error(f"Error handling popups: {str(e)}")
     
     async def _find_poster_near_element(self, page: Page, element) -> str:
         """Find poster image near a movie link element"""
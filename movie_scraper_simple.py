@@ -4,6 +4,11 @@ from typing import List, Dict
 from playwright.async_api import async_playwright
 from urllib.parse import urljoin, quote
 
+from mirrors import mirror_registry
+from resource_blocking import resource_blocker
+from stream_cache import is_stream_url, stream_url_cache
+from tracing import log, log_error
+
 async def search_movies_simple(query: str, max_results: int = 20) -> List[Dict]:
     """Simplified movie search that gets all results"""
     
@@ -12,21 +17,23 @@ async def search_movies_simple(query: str, max_results: int = 20) -> List[Dict]:
     context = await browser.new_context(
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     )
+    await resource_blocker.install(context)
     
     page = await context.new_page()
     results = []
     
     try:
-        base_url = "https://www.5movierulz.chat"
+        base_url = mirror_registry.best()
         search_url = f"{base_url}/search_movies?s={quote(query)}"
         
-        print(f"🔍 Searching: {search_url}")
-        await page.goto(search_url, wait_until='domcontentloaded', timeout=30000)
+        log(f"🔍 Searching: {search_url}")
+        with mirror_registry.track(base_url):
+            await page.goto(search_url, wait_until='domcontentloaded', timeout=30000)
         await asyncio.sleep(3)
         
         # Get all film elements
         film_elements = await page.query_selector_all('div[class*="film"]')
-        print(f"📦 Found {len(film_elements)} film elements")
+        log(f"📦 Found {len(film_elements)} film elements")
         
         for i, element in enumerate(film_elements):
             try:
@@ -36,7 +43,7 @@ async def search_movies_simple(query: str, max_results: int = 20) -> List[Dict]:
                 if query.lower() not in full_text.lower():
                     continue
                 
-                print(f"🎬 Processing element {i+1} (contains '{query}')")
+                log(f"🎬 Processing element {i+1} (contains '{query}')")
                 
                 # Get all links and images in this element
                 all_links = await element.query_selector_all('a')
@@ -72,7 +79,7 @@ async def search_movies_simple(query: str, max_results: int = 20) -> List[Dict]:
                                 (re.search(r'\b(19|20)\d{2}\b', line) or 
                                  any(keyword in line_lower for keyword in ['hdrip', 'brrip', 'movie', 'watch']))):
                                 movie_title = line
-                                print(f"    Found full title: {movie_title}")
+                                log(f"    Found full title: {movie_title}")
                                 break
                         
                         # Fallback: use image alt text if no better title found
@@ -139,22 +146,22 @@ async def search_movies_simple(query: str, max_results: int = 20) -> List[Dict]:
                             # Check for duplicates
                             if not any(existing['url'] == movie_data['url'] for existing in results):
                                 results.append(movie_data)
-                                print(f"✅ Added: {movie_title}")
+                                log(f"✅ Added: {movie_title}")
                                 if streaming_url:
-                                    print(f"    🎬 Streaming URL: {streaming_url}")
+                                    log(f"    🎬 Streaming URL: {streaming_url}")
                             
                     except Exception as e:
                         continue
                 
             except Exception as e:
-                print(f"❌ Error processing element {i+1}: {str(e)}")
+                log_error(f"❌ Error processing element {i+1}: {str(e)}")
                 continue
         
-        print(f"🎯 Total unique results: {len(results)}")
+        log(f"🎯 Total unique results: {len(results)}")
         return results[:max_results]
         
     except Exception as e:
-        print(f"❌ Search error: {str(e)}")
+        log_error(f"❌ Search error: {str(e)}")
         return []
     finally:
         await page.close()
@@ -164,8 +171,13 @@ async def search_movies_simple(query: str, max_results: int = 20) -> List[Dict]:
 
 async def extract_streaming_url(browser_page, movie_page_url):
     """Extract the actual streaming URL from a movie page"""
+    known, streaming_url = stream_url_cache.lookup(movie_page_url)
+    if known:
+        log(f"    ⚡ Cached streaming URL for: {movie_page_url}")
+        return streaming_url
+    
     try:
-        print(f"🔍 Extracting streaming URL from: {movie_page_url}")
+        log(f"🔍 Extracting streaming URL from: {movie_page_url}")
         
         # Create a new page for this movie
         movie_page = await browser_page.context.new_page()
@@ -194,7 +206,10 @@ async def extract_streaming_url(browser_page, movie_page_url):
                     for element in elements:
                         href = await element.get_attribute('href') or await element.get_attribute('src')
                         if href and ('streamlare' in href or 'vcdnlare' in href or 'stream' in href):
-                            print(f"    ✅ Found streaming URL: {href}")
+                            log(f"    ✅ Found streaming URL: {href}")
+                            # Loose matches are returned but only player hosts are cached for main
+                            if is_stream_url(href):
+                                stream_url_cache.store(movie_page_url, href)
                             return href
                 except:
                     continue
@@ -209,17 +224,20 @@ async def extract_streaming_url(browser_page, movie_page_url):
                         text_lower = text.lower()
                         if ('watch' in text_lower and 'online' in text_lower) or 'streamlare' in text_lower:
                             if 'streamlare' in href or 'vcdnlare' in href or 'stream' in href:
-                                print(f"    ✅ Found streaming URL: {href}")
+                                log(f"    ✅ Found streaming URL: {href}")
+                                if is_stream_url(href):
+                                    stream_url_cache.store(movie_page_url, href)
                                 return href
                 except:
                     continue
             
-            print(f"    ❌ No streaming URL found")
+            log(f"    ❌ No streaming URL found")
+            stream_url_cache.store(movie_page_url, None)
             return None
             
         finally:
             await movie_page.close()
             
     except Exception as e:
-        print(f"    ❌ Error extracting streaming URL: {str(e)}")
+        log_error(f"    ❌ Error extracting streaming URL: {str(e)}")
         return None
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Shared request interception for every Playwright path
+One context-level route handler that aborts ads/trackers and heavy
+resource types using a precompiled host-suffix set, plus counters for
+blocked vs allowed requests and the bytes the allowed ones downloaded.
+"""
+from typing import Dict, FrozenSet, Iterable
+from urllib.parse import urlsplit
+
+# Resource types we never need: card text and link/img attributes come from the DOM
+DEFAULT_BLOCKED_TYPES = frozenset({'image', 'font', 'media'})
+
+# Blocked registrable domains; any subdomain of these is blocked too
+DEFAULT_BLOCKED_HOST_SUFFIXES = frozenset({
+    'googletagmanager.com',
+    'google-analytics.com',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'doubleclick.net',
+    'adservice.google.com',
+    'facebook.com',
+    'facebook.net',
+    'twitter.com',
+    'instagram.com',
+    'popads.net',
+    'popcash.net',
+    'propellerads.com',
+    'adsterra.com',
+    'exoclick.com',
+    'hotjar.com',
+    'scorecardresearch.com',
+})
+
+# Host labels that mark ad/tracking hosts (e.g. ads.example.com, analytics.site.io)
+DEFAULT_BLOCKED_HOST_LABELS = frozenset({'ads', 'adserver', 'analytics', 'tracking', 'tracker', 'pixel'})
+
+class ResourceBlocker:
+    """Context-level route handler with O(labels) host matching"""
+
+    def __init__(self, blocked_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+                 host_suffixes: Iterable[str] = DEFAULT_BLOCKED_HOST_SUFFIXES,
+                 host_labels: Iterable[str] = DEFAULT_BLOCKED_HOST_LABELS):
+        self.blocked_types: FrozenSet[str] = frozenset(blocked_types)
+        self.host_suffixes: FrozenSet[str] = frozenset(host_suffixes)
+        self.host_labels: FrozenSet[str] = frozenset(host_labels)
+        # host -> blocked?; hosts repeat heavily across subrequests
+        self._host_verdicts: Dict[str, bool] = {}
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+        self.blocked_by_type: Dict[str, int] = {}
+
+    def is_blocked_host(self, host: str) -> bool:
+        verdict = self._host_verdicts.get(host)
+        if verdict is not None:
+            return verdict
+
+        labels = host.split('.')
+        verdict = any(label in self.host_labels for label in labels[:-1])
+        if not verdict:
+            # Check every suffix: a.b.example.com -> b.example.com -> example.com
+            for i in range(len(labels) - 1):
+                if '.'.join(labels[i:]) in self.host_suffixes:
+                    verdict = True
+                    break
+
+        if len(self._host_verdicts) >= 4096:
+            self._host_verdicts.clear()
+        self._host_verdicts[host] = verdict
+        return verdict
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if resource_type in self.blocked_types:
+            return True
+        if url.startswith(('data:', 'blob:', 'about:')):
+            return False
+        return self.is_blocked_host((urlsplit(url).hostname or '').lower())
+
+    async def handle(self, route):
+        request = route.request
+        resource_type = request.resource_type
+        if self.should_block(request.url, resource_type):
+            self.blocked_requests += 1
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+            await route.abort()
+        else:
+            self.allowed_requests += 1
+            await route.continue_()
+
+    def _on_response(self, response):
+        # Content-Length is free to read; chunked responses are not counted
+        length = response.headers.get('content-length')
+        if length and length.isdigit():
+            self.allowed_bytes += int(length)
+
+    async def install(self, context):
+        """Route every request of a browser context through this blocker"""
+        await context.route("**/*", self.handle)
+        context.on("response", self._on_response)
+
+    def stats(self) -> Dict:
+        total = self.blocked_requests + self.allowed_requests
+        return {
+            "blocked_requests": self.blocked_requests,
+            "allowed_requests": self.allowed_requests,
+            "blocked_ratio": round(self.blocked_requests / total, 3) if total else 0.0,
+            "allowed_bytes": self.allowed_bytes,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
+
+# Process-wide blocker shared by main and the scraper modules
+resource_blocker = ResourceBlocker()
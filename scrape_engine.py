@@ -0,0 +1,122 @@
+"""
+Tiered scraping engine
+Tries the cheapest scraping tier first (plain HTTP + parse) and escalates
+to browser tiers only when a tier comes back empty, fails, or hits an
+anti-bot challenge page. Keeps Chromium cold for most traffic.
+"""
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from tracing import log, log_error
+
+# Titles of Cloudflare-style interstitials shown instead of real content
+CHALLENGE_TITLE_RE = re.compile(
+    r'<title>\s*(just a moment|attention required|checking your browser|ddos protection)', re.I
+)
+# Markers that only appear on the challenge pages themselves
+CHALLENGE_BODY_RE = re.compile(r'(cf-browser-verification|cf_chl_opt|cf-challenge-running)', re.I)
+
+class ChallengeDetected(Exception):
+    """The fetched page is a bot challenge, not search results"""
+
+def looks_like_challenge(text: str) -> bool:
+    """Heuristic check for a challenge/interstitial page (scans the head only)"""
+    head = text[:20000]
+    return bool(CHALLENGE_TITLE_RE.search(head) or CHALLENGE_BODY_RE.search(head))
+
+def is_challenge_title(title: str) -> bool:
+    """Same check for a page title read from a browser"""
+    return bool(CHALLENGE_TITLE_RE.search(f"<title>{title}"))
+
+class ScrapeTier:
+    """One way of answering a query: name + async search(query, max_results)"""
+
+    def __init__(self, name: str, search: Callable[[str, int], Awaitable[List[Dict]]]):
+        self.name = name
+        self.search = search
+        self.answered = 0
+        self.empty = 0
+        self.challenged = 0
+        self.errors = 0
+        self.total_time = 0.0
+
+    def stats(self) -> Dict:
+        attempts = self.answered + self.empty + self.challenged + self.errors
+        return {
+            "attempts": attempts,
+            "answered": self.answered,
+            "empty": self.empty,
+            "challenged": self.challenged,
+            "errors": self.errors,
+            "avg_ms": round(self.total_time / attempts * 1000, 1) if attempts else 0.0,
+        }
+
+class TieredScrapeEngine:
+    """Run tiers in order until one returns results"""
+
+    def __init__(self, tiers: Sequence[ScrapeTier], stop_on: Tuple[Type[BaseException], ...] = (),
+                 history_size: int = 200, propagate: Tuple[Type[BaseException], ...] = (),
+                 key: Callable[[str], str] = lambda query: query):
+        self.tiers = list(tiers)
+        # Exceptions that abort escalation (e.g. browser pool saturated)
+        self.stop_on = stop_on
+        # Exceptions that abort escalation and are re-raised to the caller (e.g. admission rejected)
+        self.propagate = propagate
+        self.history_size = history_size
+        # Maps a query to its history key, so spellings the caller's cache treats as one share it
+        self.key = key
+        # key(query) -> name of the tier that answered it (or None), most recent last
+        self._answered_by: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+    def _record(self, query: str, tier_name: Optional[str]):
+        key = self.key(query)
+        self._answered_by[key] = tier_name
+        self._answered_by.move_to_end(key)
+        while len(self._answered_by) > self.history_size:
+            self._answered_by.popitem(last=False)
+
+    def answered_by(self, query: str) -> Optional[str]:
+        """Tier that answered the last scrape of this query (None if none did)"""
+        return self._answered_by.get(self.key(query))
+
+    async def search(self, query: str, max_results: int) -> Tuple[List[Dict], Optional[str]]:
+        """Return (results, name of the answering tier or None)"""
+        for tier in self.tiers:
+            start = time.monotonic()
+            try:
+                results = await tier.search(query, max_results)
+            except ChallengeDetected as e:
+                tier.challenged += 1
+                log(f"🛡️ Tier '{tier.name}' hit a challenge page for '{query}': {e}")
+                continue
+            except self.propagate as e:
+                tier.errors += 1
+                log(f"⛔ Tier '{tier.name}' rejected '{query}': {e}")
+                raise
+            except self.stop_on as e:
+                tier.errors += 1
+                log(f"⛔ Tier '{tier.name}' stopped escalation for '{query}': {e}")
+                break
+            except Exception as e:
+                tier.errors += 1
+                log_error(f"❌ Tier '{tier.name}' failed for '{query}': {e}")
+                continue
+            finally:
+                tier.total_time += time.monotonic() - start
+
+            if results:
+                tier.answered += 1
+                self._record(query, tier.name)
+                log(f"🎯 Tier '{tier.name}' answered '{query}' with {len(results)} results")
+                return results, tier.name
+
+            tier.empty += 1
+            log(f"⤴️ Tier '{tier.name}' found nothing for '{query}', escalating")
+
+        self._record(query, None)
+        return [], None
+
+    def stats(self) -> Dict:
+        return {tier.name: tier.stats() for tier in self.tiers}
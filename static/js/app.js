@@ -1,5 +1,8 @@
 // Movie Search App JavaScript
 
+// streamSearch() result when the server turned the search away for lack of capacity
+const SEARCH_REJECTED = 'rejected';
+
 class MovieSearchApp {
     constructor() {
         this.searchForm = document.getElementById('searchForm');
@@ -10,6 +13,9 @@ class MovieSearchApp {
         this.resultsContainer = document.getElementById('resultsContainer');
         this.resultsTitle = document.getElementById('resultsTitle');
         this.resultsCount = document.getElementById('resultsCount');
+        this.searchSuggestions = document.getElementById('searchSuggestions');
+        this.searchSeq = 0;
+        this.suggestSeq = 0;
         
         this.initializeEventListeners();
     }
@@ -36,6 +42,9 @@ class MovieSearchApp {
             clearTimeout(searchTimeout);
             const query = e.target.value.trim();
             
+            // Suggestions are cheap, so they update on every keystroke
+            this.fetchSuggestions(query);
+            
             if (query.length > 2) {
                 searchTimeout = setTimeout(() => {
                     this.performSearch();
@@ -62,23 +71,48 @@ class MovieSearchApp {
             return;
         }
 
+        // Debounced typing can start a new search before the last one finishes
+        const searchId = ++this.searchSeq;
         this.showLoading();
 
         try {
-            // First, get results from your existing API
-            const response = await fetch(`/api/search?query=${encodeURIComponent(query)}`);
-            const data = await response.json();
-            
-            console.log('🔍 Frontend received data:', data);
-            console.log('🔍 Results array:', data.results);
-            console.log('🔍 Results length:', data.results ? data.results.length : 'undefined');
+            // Stream results so cards appear as soon as the backend parses them
+            let allResults = null;
+            if (window.ReadableStream && window.TextDecoder) {
+                allResults = await this.streamSearch(query, searchId);
+            }
+            if (searchId !== this.searchSeq) {
+                return;
+            }
+            if (allResults === SEARCH_REJECTED) {
+                // The capacity message is already shown; don't start an n8n scrape on top
+                this.hideLoading();
+                return;
+            }
+            const streamed = allResults !== null;
             
-            let allResults = data.results || [];
+            if (!streamed) {
+                // Fall back to the buffered endpoint
+                const response = await fetch(`/api/search?query=${encodeURIComponent(query)}`);
+                const data = await response.json();
+                if (response.status === 503) {
+                    // Server is at scrape capacity; data.message carries the Retry-After hint
+                    this.hideLoading();
+                    this.showError(data.message);
+                    return;
+                }
+                
+                console.log('🔍 Frontend received data:', data);
+                console.log('🔍 Results length:', data.results ? data.results.length : 'undefined');
+                
+                allResults = data.results || [];
+            }
             
             // Trigger n8n workflow to get 5movierulz.villas results
             this.triggerN8nScraping(query);
             
             // Check for cached n8n results
+            let n8nMovies = [];
             try {
                 const n8nResponse = await fetch(`/api/n8n-results/${encodeURIComponent(query)}`);
                 if (n8nResponse.ok) {
@@ -86,7 +120,7 @@ class MovieSearchApp {
                     if (n8nData.movies && n8nData.movies.length > 0) {
                         console.log('📺 Adding n8n results:', n8nData.movies.length);
                         // Convert n8n format to your app format
-                        const n8nMovies = n8nData.movies.map(movie => ({
+                        n8nMovies = n8nData.movies.map(movie => ({
                             title: movie.title,
                             url: movie.url,
                             poster: movie.image,
@@ -95,18 +129,28 @@ class MovieSearchApp {
                             genre: movie.genre,
                             source: movie.source || '5movierulz.villas'
                         }));
-                        allResults = [...allResults, ...n8nMovies];
                     }
                 }
             } catch (n8nError) {
                 console.log('ℹ️ No cached n8n results yet:', n8nError.message);
             }
+            if (searchId !== this.searchSeq) {
+                return;
+            }
             
             this.hideLoading();
+            // Streamed cards are already in the (visible) grid; with none, the grid is still hidden
+            const streamedCards = streamed ? allResults.length : 0;
+            allResults = [...allResults, ...n8nMovies];
             
             if (allResults.length > 0) {
                 console.log('✅ Displaying combined results:', allResults.length);
-                this.displayResults(allResults, query);
+                if (streamedCards > 0) {
+                    n8nMovies.forEach(movie => this.resultsContainer.appendChild(this.createMovieCard(movie)));
+                    this.updateResultsCount(allResults.length);
+                } else {
+                    this.displayResults(allResults, query);
+                }
                 
                 // Show loading indicator for additional results
                 this.showAdditionalResultsLoading(query);
@@ -121,6 +165,138 @@ class MovieSearchApp {
         }
     }
 
+    async fetchSuggestions(query) {
+        if (!this.searchSuggestions) {
+            return;
+        }
+        
+        const suggestId = ++this.suggestSeq;
+        if (query.length < 2) {
+            this.searchSuggestions.innerHTML = '';
+            return;
+        }
+        
+        try {
+            const response = await fetch(`/api/suggest?q=${encodeURIComponent(query)}`);
+            if (!response.ok) {
+                return;
+            }
+            const data = await response.json();
+            // Ignore answers for keystrokes that have since been superseded
+            if (suggestId !== this.suggestSeq) {
+                return;
+            }
+            
+            this.searchSuggestions.innerHTML = '';
+            (data.suggestions || []).forEach(title => {
+                const option = document.createElement('option');
+                option.value = title;
+                this.searchSuggestions.appendChild(option);
+            });
+        } catch (error) {
+            console.log('ℹ️ Suggestions unavailable:', error.message);
+        }
+    }
+
+    async streamSearch(query, searchId) {
+        // Returns the streamed movies, null if streaming is unavailable,
+        // or SEARCH_REJECTED if the server is at capacity
+        let response;
+        try {
+            response = await fetch(`/api/search/stream?query=${encodeURIComponent(query)}`);
+        } catch (error) {
+            console.log('ℹ️ Streaming search unavailable:', error.message);
+            return null;
+        }
+        if (!response.ok || !response.body) {
+            return null;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const movies = new Map();
+        let buffer = '';
+        let rejected = false;
+
+        const handleLine = (line) => {
+            if (line.trim() && this.handleStreamEvent(JSON.parse(line), movies, query) === SEARCH_REJECTED) {
+                rejected = true;
+            }
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (searchId !== this.searchSeq) {
+                reader.cancel();
+                return [];
+            }
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.forEach(handleLine);
+        }
+        handleLine(buffer + decoder.decode());
+
+        if (rejected) {
+            return SEARCH_REJECTED;
+        }
+        return Array.from(movies.keys()).sort((a, b) => a - b).map(index => movies.get(index));
+    }
+
+    handleStreamEvent(event, movies, query) {
+        if (event.type === 'movie') {
+            if (movies.size === 0) {
+                // First card: swap the spinner for the results grid
+                this.hideAllResults();
+                this.resultsTitle.textContent = `Results for "${query}"`;
+                this.resultsContainer.innerHTML = '';
+                this.searchResults.classList.remove('hidden');
+            }
+            movies.set(event.index, event.movie);
+            this.renderStreamedCard(event.index, event.movie);
+            this.updateResultsCount(movies.size);
+        } else if (event.type === 'update') {
+            // Enrichment for a card we already showed (e.g. its resolved stream URL)
+            if (!movies.has(event.index)) {
+                return;
+            }
+            const movie = { ...movies.get(event.index), ...event.fields };
+            movies.set(event.index, movie);
+            this.renderStreamedCard(event.index, movie);
+        } else if (event.type === 'done') {
+            console.log('🔍 Stream finished:', event);
+        } else if (event.type === 'error') {
+            console.log('⚠️ Stream error:', event.error);
+            if (event.retry_after && movies.size === 0) {
+                this.showError(`Too many searches in progress, please retry in ${event.retry_after}s`);
+                return SEARCH_REJECTED;
+            }
+        }
+    }
+
+    renderStreamedCard(index, movie) {
+        const card = this.createMovieCard(movie);
+        card.dataset.index = index;
+        
+        const existing = this.resultsContainer.querySelector(`.movie-card[data-index="${index}"]`);
+        if (existing) {
+            existing.replaceWith(card);
+            return;
+        }
+        
+        // Keep cards in result order even if a later index arrives first
+        const next = Array.from(this.resultsContainer.querySelectorAll('.movie-card[data-index]'))
+            .find(el => Number(el.dataset.index) > index);
+        this.resultsContainer.insertBefore(card, next || null);
+    }
+
+    updateResultsCount(count) {
+        this.resultsCount.textContent = `${count} movie${count !== 1 ? 's' : ''} found`;
+    }
+
     showLoading() {
         this.hideAllResults();
         this.loadingSpinner.classList.remove('hidden');
@@ -140,7 +316,7 @@ class MovieSearchApp {
         this.hideAllResults();
         
         this.resultsTitle.textContent = `Results for "${query}"`;
-        this.resultsCount.textContent = `${results.length} movie${results.length !== 1 ? 's' : ''} found`;
+        this.updateResultsCount(results.length);
         
         this.resultsContainer.innerHTML = '';
         
@@ -0,0 +1,70 @@
+"""
+Streaming-URL resolution cache
+Maps a movie page URL to its resolved streamlare/vcdnlare URL so the same
+film found under different queries is only opened once. Pages that loaded
+but had no stream link are cached as negative entries with a shorter TTL.
+"""
+import os
+from typing import Dict, Optional, Tuple
+from urllib.parse import urldefrag
+
+from cache_engine import LRUTTLCache
+
+# Stored for pages that were checked and have no streaming link
+NO_STREAM = ""
+# Player hosts a resolved streaming URL must point at
+STREAM_HOSTS = ("streamlare", "vcdnlare")
+
+def is_stream_url(href: Optional[str]) -> bool:
+    return bool(href) and any(host in href for host in STREAM_HOSTS)
+
+class StreamURLCache:
+    """movie_page -> streaming URL, with negative entries"""
+
+    def __init__(self, max_entries: int = 2000, ttl: int = 24 * 3600, negative_ttl: int = 3600):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache = LRUTTLCache(max_size=max_entries, max_bytes=max_entries * 512, default_ttl=ttl)
+        self.negative_hits = 0
+
+    @staticmethod
+    def _key(movie_page: str) -> str:
+        return urldefrag(movie_page.strip())[0]
+
+    def lookup(self, movie_page: str) -> Tuple[bool, Optional[str]]:
+        """Return (known, streaming_url); known with None means 'no stream on this page'"""
+        value = self._cache.get(self._key(movie_page))
+        if value is None:
+            return False, None
+        if value == NO_STREAM:
+            self.negative_hits += 1
+            return True, None
+        return True, value
+
+    def store(self, movie_page: str, streaming_url: Optional[str]):
+        """Record a definitive answer; don't call this for timeouts or errors.
+
+        Callers that match links loosely must check is_stream_url() first:
+        main serves whatever is stored here as the player URL.
+        """
+        if streaming_url:
+            self._cache.set(self._key(movie_page), streaming_url, ttl=self.ttl)
+        else:
+            self._cache.set(self._key(movie_page), NO_STREAM, ttl=self.negative_ttl)
+
+    def trim(self, max_entries: int) -> int:
+        """Drop expired entries, then least recently used ones down to max_entries"""
+        return self._cache.purge_expired() + self._cache.trim(max_entries)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        return {**self._cache.stats(), "negative_hits": self.negative_hits}
+
+# Process-wide cache shared by main and the scraper modules
+stream_url_cache = StreamURLCache(
+    max_entries=int(os.environ.get("STREAM_CACHE_MAX_ENTRIES", "2000")),
+    ttl=int(os.environ.get("STREAM_CACHE_TTL", str(24 * 3600))),
+    negative_ttl=int(os.environ.get("STREAM_CACHE_NEGATIVE_TTL", "3600")),
+)
@@ -0,0 +1,106 @@
+"""
+In-process typeahead index
+Sorted array of normalized keys searched with bisect, so a prefix lookup
+is one binary search plus a short scan. Every title is indexed from each
+word start ("the avengers" matches "aven"), and memory is bounded by
+evicting the least recently seen titles.
+"""
+import re
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+_NON_WORD_RE = re.compile(r'[^\w]+', re.UNICODE)
+
+def normalize_title(title: str) -> str:
+    """Lowercase, punctuation folded to single spaces"""
+    return " ".join(_NON_WORD_RE.sub(" ", title.lower()).split())
+
+class PrefixIndex:
+    """Bounded prefix index over titles with incremental inserts"""
+
+    def __init__(self, max_titles: int = 5000, max_words: int = 8):
+        self.max_titles = max_titles
+        # Only the first max_words word starts of a title get their own key
+        self.max_words = max_words
+        # Sorted (key, normalized_title) pairs
+        self._keys: List[Tuple[str, str]] = []
+        # normalized_title -> display title; order is least -> most recently seen
+        self._titles: "OrderedDict[str, str]" = OrderedDict()
+        self.inserts = 0
+        self.evictions = 0
+        self.lookups = 0
+
+    def _word_keys(self, normalized: str) -> List[str]:
+        words = normalized.split(" ")
+        return [" ".join(words[i:]) for i in range(min(len(words), self.max_words))]
+
+    def add(self, title: str) -> bool:
+        """Index a title; returns False if it was already known (it is refreshed instead)"""
+        display = " ".join((title or "").split())
+        normalized = normalize_title(display)
+        if not normalized:
+            return False
+
+        if normalized in self._titles:
+            self._titles.move_to_end(normalized)
+            return False
+
+        self._titles[normalized] = display
+        for key in self._word_keys(normalized):
+            insort(self._keys, (key, normalized))
+        self.inserts += 1
+
+        while len(self._titles) > self.max_titles:
+            self._evict(*self._titles.popitem(last=False))
+        return True
+
+    def add_many(self, titles: Iterable[str]) -> int:
+        return sum(1 for title in titles if self.add(title))
+
+    def _evict(self, normalized: str, _display: str):
+        for key in self._word_keys(normalized):
+            i = bisect_left(self._keys, (key, normalized))
+            if i < len(self._keys) and self._keys[i] == (key, normalized):
+                del self._keys[i]
+        self.evictions += 1
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[str]:
+        """Titles with a word starting with prefix, earliest-word matches first"""
+        self.lookups += 1
+        prefix = normalize_title(prefix)
+        if not prefix or limit <= 0:
+            return []
+
+        # Whole-title prefix matches rank above mid-title word matches; the scan
+        # is capped so one-letter prefixes stay as cheap as long ones
+        full, partial = [], []
+        seen = set()
+        i = bisect_left(self._keys, (prefix, ""))
+        while i < len(self._keys) and len(full) < limit and len(seen) < limit * 4:
+            key, normalized = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if normalized not in seen:
+                seen.add(normalized)
+                (full if key == normalized else partial).append(self._titles[normalized])
+            i += 1
+
+        return (full + partial)[:limit]
+
+    def clear(self):
+        self._keys.clear()
+        self._titles.clear()
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def stats(self) -> Dict:
+        return {
+            "titles": len(self._titles),
+            "max_titles": self.max_titles,
+            "keys": len(self._keys),
+            "inserts": self.inserts,
+            "evictions": self.evictions,
+            "lookups": self.lookups,
+        }
@@ -0,0 +1,35 @@
+import os
+import time
+
+import pytest
+
+# main reads these at import: keep it offline and free of background work
+for name, value in {
+    "DISK_CACHE": "0",
+    "BROWSER_POOL_WARM": "0",
+    "CATALOG_CRAWL_INTERVAL": "0",
+    "MEMORY_SAMPLE_INTERVAL": "0",
+    "TRACE_LOG": "off",
+    "SCRAPE_TIERS": "http",
+}.items():
+    os.environ.setdefault(name, value)
+
+class FakeClock:
+    """Manually advanced stand-in for time.monotonic and time.time"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze monotonic and wall time; advance with clock.now += seconds.
+
+    Don't combine with real asyncio timeouts: the event loop reads the same clock.
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(time, "monotonic", fake)
+    monkeypatch.setattr(time, "time", fake)
+    return fake
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from admission import BACKGROUND, INTERACTIVE, AdmissionRejected, ScrapeScheduler
+
+async def hold(scheduler, lane, log, name, release):
+    async with scheduler.slot(lane):
+        log.append(name)
+        await release.wait()
+
+def test_interactive_waiters_go_before_earlier_background_ones():
+    async def scenario():
+        scheduler = ScrapeScheduler(max_concurrent=1)
+        order = []
+        first_release = asyncio.Event()
+        done = asyncio.Event()
+        done.set()
+
+        first = asyncio.ensure_future(hold(scheduler, BACKGROUND, order, "running", first_release))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.ensure_future(hold(scheduler, BACKGROUND, order, "background", done)),
+            asyncio.ensure_future(hold(scheduler, INTERACTIVE, order, "interactive", done)),
+        ]
+        await asyncio.sleep(0)
+        first_release.set()
+        await asyncio.gather(first, *queued)
+        return order, scheduler
+
+    order, scheduler = asyncio.run(scenario())
+    assert order == ["running", "interactive", "background"]
+    assert scheduler.running == 0
+
+def test_requests_queue_while_every_slot_is_held():
+    async def scenario():
+        scheduler = ScrapeScheduler(max_concurrent=1)
+        order = []
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(hold(scheduler, INTERACTIVE, order, name, release)) for name in "ab"]
+        await asyncio.sleep(0)
+        queued = (list(order), scheduler.running, len(scheduler.lanes[INTERACTIVE].waiters))
+        release.set()
+        await asyncio.gather(*tasks)
+        return queued, order
+
+    queued, order = asyncio.run(scenario())
+    assert queued == (["a"], 1, 1)
+    assert order == ["a", "b"]
+
+def test_full_queue_rejects_with_retry_after():
+    async def scenario():
+        scheduler = ScrapeScheduler(max_concurrent=1, queue_limits={BACKGROUND: 1})
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(hold(scheduler, BACKGROUND, [], str(i), release)) for i in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with scheduler.slot(BACKGROUND):
+                pass
+        release.set()
+        await asyncio.gather(*tasks)
+        return rejected.value, scheduler
+
+    rejected, scheduler = asyncio.run(scenario())
+    assert rejected.retry_after >= 1
+    assert scheduler.lanes[BACKGROUND].rejected == 1
+
+def test_wait_timeout_rejects_and_frees_the_queue_spot():
+    async def scenario():
+        scheduler = ScrapeScheduler(max_concurrent=1, wait_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(scheduler, INTERACTIVE, [], "a", release))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected):
+            async with scheduler.slot(INTERACTIVE):
+                pass
+        depth = len(scheduler.lanes[INTERACTIVE].waiters)
+        release.set()
+        await holder
+        return depth, scheduler
+
+    depth, scheduler = asyncio.run(scenario())
+    assert depth == 0
+    assert scheduler.lanes[INTERACTIVE].timed_out == 1
+    assert scheduler.running == 0
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        scheduler = ScrapeScheduler(max_concurrent=1)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(scheduler, INTERACTIVE, [], "a", release))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(hold(scheduler, INTERACTIVE, [], "b", release))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await holder
+        async with scheduler.slot(INTERACTIVE):
+            running = scheduler.running
+        return running, scheduler.running
+
+    assert asyncio.run(scenario()) == (1, 0)
@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from deadline import DeadlineExceeded
+from main import BrowserContextPool, BrowserPoolTimeout, ContextLease
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.cookie_clears = 0
+        # Set to an Event to hold the next reset open
+        self.reset_gate = None
+
+    async def clear_cookies(self):
+        self.cookie_clears += 1
+        if self.reset_gate is not None:
+            await self.reset_gate.wait()
+
+    async def close(self):
+        self.closed = True
+
+class FakePage:
+    async def goto(self, url):
+        await asyncio.sleep(0)
+
+class FakePool(BrowserContextPool):
+    """Pool whose contexts are stand-ins, so no Chromium is needed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created = 0
+
+    async def _create_lease(self) -> ContextLease:
+        self.created += 1
+        await asyncio.sleep(0)
+        return ContextLease(FakeContext(), [FakePage() for _ in range(self.pages_per_context)])
+
+def test_leases_are_reset_and_reused():
+    async def scenario():
+        pool = FakePool(size=1, pages_per_context=2)
+        async with pool.lease() as first:
+            pass
+        async with pool.lease() as second:
+            pass
+        return pool, first, second
+
+    pool, first, second = asyncio.run(scenario())
+    assert first is second
+    assert first.context.cookie_clears == 2
+    assert (pool.created, pool.leases, pool.recycled) == (1, 2, 0)
+    assert pool.is_idle()
+
+def test_waiter_gets_the_context_when_it_frees_up():
+    async def scenario():
+        pool = FakePool(size=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with pool.lease() as lease:
+                await release.wait()
+                return lease
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(hold())
+        await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(holder, waiter), pool
+
+    (first, second), pool = asyncio.run(scenario())
+    assert first is second
+    assert pool.waits == 1
+
+def test_lease_times_out_when_the_pool_is_busy():
+    async def scenario():
+        pool = FakePool(size=1, lease_timeout=0.05)
+        async with pool.lease():
+            with pytest.raises(BrowserPoolTimeout):
+                async with pool.lease():
+                    pass
+        return pool
+
+    assert asyncio.run(scenario()).timeouts == 1
+
+def test_failed_lease_is_replaced():
+    async def scenario():
+        pool = FakePool(size=1)
+        with pytest.raises(RuntimeError):
+            async with pool.lease() as broken:
+                raise RuntimeError("page crashed")
+        async with pool.lease() as replacement:
+            pass
+        return pool, broken, replacement
+
+    pool, broken, replacement = asyncio.run(scenario())
+    assert broken.context.closed
+    assert replacement is not broken
+    assert (pool.recycled, pool.open_contexts) == (1, 1)
+
+def test_deadline_exceeded_keeps_the_context():
+    async def scenario():
+        pool = FakePool(size=1)
+        with pytest.raises(DeadlineExceeded):
+            async with pool.lease() as lease:
+                raise DeadlineExceeded("navigation needs 1.0s")
+        async with pool.lease() as again:
+            pass
+        return pool, lease, again
+
+    pool, lease, again = asyncio.run(scenario())
+    assert again is lease
+    assert not lease.context.closed
+    assert pool.recycled == 0
+
+def test_pool_is_busy_until_release_finishes():
+    async def scenario():
+        pool = FakePool(size=1)
+        gate = asyncio.Event()
+
+        async def use():
+            async with pool.lease() as lease:
+                lease.context.reset_gate = gate
+
+        user = asyncio.ensure_future(use())
+        await asyncio.sleep(0.01)
+        # The lease block has exited but the context is still being reset
+        during_release = pool.is_idle()
+        gate.set()
+        await user
+        return during_release, pool.is_idle()
+
+    assert asyncio.run(scenario()) == (False, True)
+
+def test_close_idle_then_recreate_on_demand():
+    async def scenario():
+        pool = FakePool(size=1)
+        async with pool.lease() as first:
+            pass
+        closed = await pool.close_idle()
+        async with pool.lease() as second:
+            pass
+        return pool, closed, first, second
+
+    pool, closed, first, second = asyncio.run(scenario())
+    assert closed == 1
+    assert first.context.closed
+    assert second is not first
+    assert pool.created == 2
@@ -0,0 +1,91 @@
+import pytest
+
+from cache_engine import LRUTTLCache
+
+def test_evicts_least_recently_used_past_max_size():
+    cache = LRUTTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_evicts_past_byte_budget():
+    cache = LRUTTLCache(max_size=100, max_bytes=30)
+    cache.set("a", "x" * 10)
+    cache.set("b", "y" * 10)
+    cache.set("c", "z" * 10)
+
+    assert cache.get("a") is None
+    assert cache.current_bytes <= 30
+    assert len(cache) == 2
+
+def test_rejects_oversized_value_without_flushing():
+    cache = LRUTTLCache(max_size=10, max_bytes=20)
+    cache.set("small", "ok")
+    cache.set("huge", "x" * 100)
+
+    assert cache.get("huge") is None
+    assert cache.get("small") == "ok"
+    assert cache.evictions == 0
+
+def test_overwrite_replaces_size_accounting():
+    cache = LRUTTLCache()
+    cache.set("a", "x" * 50)
+    cache.set("a", "y")
+
+    assert cache.current_bytes == len('"y"')
+    assert len(cache) == 1
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUTTLCache(default_ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=10)
+
+    clock.now += 30
+    assert cache.get_with_ttl("a") == (1, pytest.approx(30))
+    assert cache.get("b") is None
+    assert cache.expirations == 1
+    assert "b" not in cache._entries
+
+def test_zero_ttl_never_expires(clock):
+    cache = LRUTTLCache(default_ttl=60)
+    cache.set("a", 1, ttl=0)
+    clock.now += 10 ** 6
+
+    assert cache.get_with_ttl("a") == (1, None)
+
+def test_purge_expired_and_trim(clock):
+    cache = LRUTTLCache()
+    cache.set("old", 1, ttl=5)
+    cache.set("a", 2)
+    cache.set("b", 3)
+    clock.now += 10
+
+    assert cache.purge_expired() == 1
+    assert cache.trim(1) == 1
+    assert list(cache._entries) == ["b"]
+
+def test_hit_rate_counts_each_lookup_once():
+    cache = LRUTTLCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.stats()["hit_rate"] == 0.5
+
+def test_peek_does_not_count_or_reorder():
+    cache = LRUTTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.peek("a") == (1, pytest.approx(3600, abs=1))
+    assert cache.peek("missing") is None
+    assert (cache.hits, cache.misses) == (0, 0)
+    cache.set("c", 3)  # "a" is still least recently used
+    assert cache.peek("a") is None
@@ -0,0 +1,102 @@
+import main
+from cache_engine import LRUTTLCache
+from catalog_index import CatalogIndex, extract_language, extract_year, listing_entries, tokenize
+
+SITE = "https://www.5movierulz.chat"
+
+def entry(title, slug):
+    return {
+        "title": title,
+        "movie_page": f"{SITE}/{slug}/movie-watch-online-free-1.html",
+        "poster": None,
+        "year": extract_year(title),
+        "language": extract_language(title),
+    }
+
+KALKI = entry("Kalki 2898-AD (2024) Telugu HDRip", "kalki-2898-ad-2024")
+OLD_KALKI = entry("Kalki (2019) Telugu", "kalki-2019")
+PUSHPA = entry("Pushpa 2: The Rule (2024) Hindi", "pushpa-2-2024")
+
+def test_tokenize_folds_case_and_punctuation():
+    assert tokenize("Kalki 2898-AD (2024) Telugu") == ["kalki", "2898", "ad", "2024", "telugu"]
+    assert tokenize("  PUSHPA 2:  The   Rule ") == ["pushpa", "2", "the", "rule"]
+    assert tokenize("!!!") == []
+
+def test_year_and_language_are_extracted():
+    assert (KALKI["year"], KALKI["language"]) == ("2024", "Telugu")
+    assert (extract_year("No Year Here"), extract_language("No Language")) == (None, None)
+
+def build_index(*entries, max_entries=100):
+    index = CatalogIndex(max_entries=max_entries)
+    for item in entries:
+        index.upsert(item)
+    return index
+
+def test_lookup_requires_every_token():
+    index = build_index(KALKI, OLD_KALKI, PUSHPA)
+
+    assert index.search("kalki 2024") == [KALKI]
+    assert index.search("2024") == [PUSHPA, KALKI]
+    assert index.search("kalki pushpa") == []
+    assert index.search("  ") == []
+
+def test_query_is_normalized_like_titles():
+    index = build_index(KALKI, PUSHPA)
+
+    assert index.search("KALKI, telugu!") == [KALKI]
+    assert index.search("pushpa-2") == [PUSHPA]
+
+def test_title_prefix_matches_rank_first_then_most_recent():
+    fan_edit = entry("Best of Kalki (2024)", "best-of-kalki")
+    index = build_index(KALKI, fan_edit, OLD_KALKI)
+
+    assert index.search("kalki") == [OLD_KALKI, KALKI, fan_edit]
+
+def test_upsert_reindexes_and_eviction_drops_postings():
+    index = build_index(KALKI, max_entries=2)
+    index.upsert({**KALKI, "title": "Kalki 2898 AD (2024) Telugu Proper HDRip"})
+    assert index.search("proper") != []
+
+    index.upsert(OLD_KALKI)
+    index.upsert(PUSHPA)
+
+    assert len(index) == 2
+    assert index.search("2898") == []
+    assert index.stats()["evictions"] == 1
+
+def test_listing_entries_read_movie_cards():
+    html = f"""
+    <div class="film">
+      <a href="/kalki-2898-ad-2024/movie-watch-online-free-1.html" title="Kalki 2898-AD (2024) Telugu">
+        <img src="/posters/kalki.jpg"></a>
+      <h2>Kalki 2898-AD (2024) Telugu</h2>
+    </div>
+    <div class="film"><a href="/category/telugu-movie/">Telugu</a></div>
+    """
+
+    entries = listing_entries(html, f"{SITE}/", ["div.film"])
+
+    assert entries == [{
+        "title": "Kalki 2898-AD (2024) Telugu",
+        "movie_page": f"{SITE}/kalki-2898-ad-2024/movie-watch-online-free-1.html",
+        "poster": f"{SITE}/posters/kalki.jpg",
+        "year": "2024",
+        "language": "Telugu",
+    }]
+
+def test_search_endpoint_answers_from_the_catalog_before_any_flight(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    async def no_flight(*args, **kwargs):
+        raise AssertionError("the catalog should have answered")
+
+    monkeypatch.setattr(main, "cache", LRUTTLCache(max_size=30))
+    monkeypatch.setattr(main, "catalog_index", build_index(KALKI, PUSHPA))
+    monkeypatch.setattr(main, "run_search_flight", no_flight)
+
+    with TestClient(main.app) as client:
+        data = client.get("/api/search", params={"query": "Kalki"}).json()
+
+    assert data["source"] == "catalog-index"
+    assert [movie["title"] for movie in data["results"]] == [KALKI["title"]]
+    assert data["results"][0]["url"] == KALKI["movie_page"]
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+import main
+from deadline import (Deadline, DeadlineExceeded, current_deadline, note_cut, remaining_timeout,
+                      require_budget, stage_allowed)
+
+@pytest.fixture
+def budget(clock):
+    deadline = Deadline(10)
+    token = current_deadline.set(deadline)
+    yield deadline
+    current_deadline.reset(token)
+
+def test_no_deadline_caps_nothing():
+    assert current_deadline.get() is None
+    assert remaining_timeout(15) == 15
+    assert stage_allowed("anything", 10 ** 6)
+    note_cut("anything")  # no-op outside a request
+
+def test_timeouts_are_capped_at_the_remaining_budget(clock, budget):
+    assert remaining_timeout(15) == 10
+    assert remaining_timeout(3) == 3
+    clock.now += 8
+    assert remaining_timeout(15) == pytest.approx(2)
+
+def test_expiry_skips_stages_and_marks_partial(clock, budget):
+    assert stage_allowed("n8n", 5)
+    assert not budget.partial
+
+    clock.now += 7
+    assert not stage_allowed("n8n", 5)
+    with pytest.raises(DeadlineExceeded):
+        require_budget("navigation", 5)
+    clock.now += 10
+    assert budget.remaining() == 0
+    assert remaining_timeout(15) == 0
+
+    assert budget.skipped == ["n8n", "navigation"]
+    assert budget.partial
+
+def test_cut_stages_are_recorded_once(budget):
+    note_cut("stream_resolution")
+    note_cut("stream_resolution")
+
+    assert budget.stats()["cut"] == ["stream_resolution"]
+    assert budget.partial
+
+def test_tasks_inherit_the_deadline(budget):
+    async def in_task():
+        return current_deadline.get()
+
+    async def scenario():
+        return await asyncio.ensure_future(in_task())
+
+    assert asyncio.run(scenario()) is budget
+
+def test_fork_shares_expiry_but_not_records(clock, budget):
+    forked = budget.fork()
+    note_cut("search")
+
+    assert forked.expires_at == budget.expires_at
+    assert forked.cut == []
+
+def test_extend_only_moves_expiry_later(clock):
+    short, longer = Deadline(1), Deadline(30)
+    shared = short.fork()
+
+    shared.extend(Deadline(0.5))
+    assert shared.expires_at == short.expires_at
+    shared.extend(longer)
+    assert shared.expires_at == longer.expires_at
+    shared.extend(None)
+    assert shared.remaining() == float("inf")
+
+def test_joined_flight_runs_under_the_longest_deadline(monkeypatch):
+    seen = []
+
+    async def fake_pipeline(query, use_n8n, event_key=None, refresh=False):
+        await asyncio.sleep(0.05)
+        seen.append(current_deadline.get().remaining())
+        return {"results": [], "source": "local-fallback", "cached": False}
+
+    monkeypatch.setattr(main, "run_search_pipeline", fake_pipeline)
+
+    async def call(budget):
+        current_deadline.set(Deadline(budget))
+        return await main.run_search_flight("q", False, "flight-q")
+
+    async def scenario():
+        leader = asyncio.ensure_future(call(1))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(call(30))
+        return await asyncio.gather(leader, follower)
+
+    (_, led_joined, _), (_, follower_joined, _) = asyncio.run(scenario())
+    assert (led_joined, follower_joined) == (False, True)
+    assert seen[0] > 20
+    assert main.flight_deadlines == {}
+
+def test_search_returns_partial_results_at_the_deadline(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    async def slow_pipeline(query, use_n8n, event_key=None, refresh=False):
+        stage_allowed("n8n", 100)
+        main.search_event_key.set(event_key)
+        main.emit_search_event({"type": "movie", "index": 0, "movie": {"title": "Early", "url": "u"}})
+        main.emit_search_event({"type": "update", "index": 0, "fields": {"url": "resolved"}})
+        await asyncio.sleep(5)
+        return {"results": [], "source": "local-fallback", "cached": False}
+
+    monkeypatch.setattr(main, "run_search_pipeline", slow_pipeline)
+    monkeypatch.setattr(main, "catalog_search", lambda query: [])
+
+    with TestClient(main.app) as client:
+        data = client.get("/api/search", params={"query": "deadline test", "deadline": 1}).json()
+
+    assert data["source"] == "deadline-partial"
+    assert data["partial"] is True
+    assert data["results"] == [{"title": "Early", "url": "resolved"}]
+    assert data["deadline"]["cut"] == ["search"]
+    # Skipped on the shared flight's deadline, reported to the caller
+    assert data["deadline"]["skipped"] == ["n8n"]
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+
+from disk_cache import SQLiteCacheTier
+
+@pytest.fixture
+def tier(tmp_path):
+    # A long flush interval keeps the background flusher out of the way; tests flush explicitly
+    return SQLiteCacheTier(str(tmp_path / "cache.db"), flush_interval=60.0)
+
+def test_round_trip_survives_a_new_instance(tier):
+    async def scenario():
+        tier.put("search:matrix", {"results": [{"title": "The Matrix"}]}, ttl=600)
+        await tier.flush()
+        await tier.close()
+
+        reopened = SQLiteCacheTier(tier.path)
+        try:
+            value, remaining = await reopened.get("search:matrix")
+            missing = await reopened.get("search:other")
+        finally:
+            await reopened.close()
+        return value, remaining, missing
+
+    value, remaining, missing = asyncio.run(scenario())
+    assert value == {"results": [{"title": "The Matrix"}]}
+    assert 0 < remaining <= 600
+    assert missing is None
+
+def test_pending_writes_are_readable_before_the_flush(tier):
+    async def scenario():
+        tier.put("k", [1, 2, 3])
+        found = await tier.get("k")
+        stats = await tier.stats()
+        await tier.close()
+        return found, stats
+
+    found, stats = asyncio.run(scenario())
+    assert found == ([1, 2, 3], None)
+    assert stats["pending_writes"] == 1
+
+def test_entries_expire_after_their_ttl(tier, clock):
+    async def scenario():
+        tier.put("short", "v", ttl=10)
+        tier.put("forever", "v")
+        await tier.flush()
+        clock.now += 11
+        found = (await tier.get("short"), await tier.get("forever"))
+        await tier.close()
+        return found
+
+    short, forever = asyncio.run(scenario())
+    assert short is None
+    assert forever == ("v", None)
+
+def test_least_recently_used_rows_are_evicted_over_budget(tmp_path, clock):
+    # Each encoded value is 42 bytes; the budget holds two of them
+    tier = SQLiteCacheTier(str(tmp_path / "cache.db"), max_bytes=100, flush_interval=60.0)
+    value = "x" * 40
+
+    async def scenario():
+        for key in ("a", "b"):
+            tier.put(key, value)
+            await tier.flush()
+            clock.now += 1
+        await tier.get("a")  # a is now more recently used than b
+        clock.now += 1
+        tier.put("c", value)
+        await tier.flush()
+        found = {key: await tier.get(key) for key in ("a", "b", "c")}
+        await tier.close()
+        return found
+
+    found = asyncio.run(scenario())
+    assert found["b"] is None
+    assert found["a"] == (value, None)
+    assert found["c"] == (value, None)
+    assert tier.evictions == 1
+
+def test_delete_during_an_in_flight_flush_is_not_undone(tier, monkeypatch):
+    write_batch = tier._write_batch
+    release_write = threading.Event()
+
+    def gated_write_batch(batch):
+        # The flush has taken its batch; let the delete land before it is written
+        release_write.wait(timeout=5)
+        return write_batch(batch)
+
+    monkeypatch.setattr(tier, "_write_batch", gated_write_batch)
+
+    async def scenario():
+        tier.put("stale", {"results": ["old"]})
+        flush = asyncio.create_task(tier.flush())
+        await asyncio.sleep(0.05)
+        assert not tier._pending
+        await tier.delete("stale")
+        release_write.set()
+        await flush
+        gone = await tier.get("stale")
+
+        # The tombstone only covers the in-flight batch; a later write sticks
+        tier.put("stale", {"results": ["new"]})
+        await tier.flush()
+        await tier.close()
+        reopened = SQLiteCacheTier(tier.path)
+        try:
+            return gone, await reopened.get("stale")
+        finally:
+            await reopened.close()
+
+    gone, rewritten = asyncio.run(scenario())
+    assert gone is None
+    assert rewritten == ({"results": ["new"]}, None)
+
+def test_delete_removes_queued_and_persisted_values(tier):
+    async def scenario():
+        tier.put("persisted", 1)
+        await tier.flush()
+        tier.put("queued", 2)
+        await tier.delete("persisted")
+        await tier.delete("queued")
+        await tier.flush()
+        found = (await tier.get("persisted"), await tier.get("queued"))
+        await tier.close()
+        return found
+
+    assert asyncio.run(scenario()) == (None, None)
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+import main
+from cache_engine import LRUTTLCache
+
+BUDGET = main.MEMORY_BUDGET_MB
+
+@pytest.fixture
+def governor(monkeypatch, clock):
+    """main's governor with a settable RSS reading and recording tier actions"""
+    governor = main.memory_governor
+    rss = {"mb": 0.0}
+    ran = []
+    monkeypatch.setattr(governor, "sample", lambda: rss["mb"])
+    for name, value in {"refusing": False, "refused": 0, "samples": 0,
+                        "last_rss_mb": None, "peak_rss_mb": 0.0}.items():
+        monkeypatch.setattr(governor, name, value)
+    for tier in governor.tiers:
+        async def action(name=tier.name):
+            ran.append(name)
+            return f"ran {name}"
+        monkeypatch.setattr(tier, "action", action)
+        monkeypatch.setattr(tier, "last_run", 0.0)
+        monkeypatch.setattr(tier, "runs", 0)
+        monkeypatch.setattr(tier, "freed_mb", 0.0)
+
+    def check(fraction):
+        """Sample RSS at fraction of the budget; returns the tiers that ran"""
+        rss["mb"] = BUDGET * fraction
+        ran.clear()
+        clock.now += 60  # past every tier's cooldown
+        asyncio.run(governor.check())
+        return list(ran)
+
+    monkeypatch.setattr(governor, "check_at", check, raising=False)
+    return governor
+
+def test_tiers_run_cheapest_first_as_usage_climbs(governor):
+    assert governor.check_at(0.50) == []
+    assert governor.check_at(0.65) == ["shrink-caches"]
+    assert governor.check_at(0.75) == ["shrink-caches", "close-idle-contexts"]
+    assert governor.check_at(0.85) == ["shrink-caches", "close-idle-contexts", "shutdown-idle-browser"]
+    assert not governor.refuse("local scrape")
+
+def test_local_scrapes_are_refused_at_90_percent_until_memory_recovers(governor):
+    assert len(governor.check_at(0.95)) == 3
+    assert governor.refuse("local scrape")
+
+    # Hysteresis: just under the threshold is not enough
+    governor.check_at(0.90 - 1 / BUDGET)
+    assert governor.refuse("local scrape")
+
+    governor.check_at(0.50)
+    assert not governor.refuse("local scrape")
+
+def test_tier_respects_its_cooldown(governor, clock):
+    assert governor.check_at(0.65) == ["shrink-caches"]
+    # Same reading again before the cooldown: nothing reruns
+    clock.now += 1
+    asyncio.run(governor.check())
+    assert governor.tiers[0].runs == 1
+
+class FakeBrowser:
+    def __init__(self, contexts):
+        self.contexts = contexts
+
+def test_idle_browser_with_one_off_contexts_is_kept(monkeypatch):
+    closed = []
+
+    async def close_browser():
+        closed.append(True)
+
+    monkeypatch.setattr(main, "browser_pool", main.BrowserContextPool(size=1, pages_per_context=1))
+    monkeypatch.setattr(main, "close_browser", close_browser)
+
+    # A JS-tier context outside the pool is still open
+    monkeypatch.setattr(main, "browser_instance", FakeBrowser(contexts=[object()]))
+    assert asyncio.run(main.shutdown_idle_browser()) is None
+
+    monkeypatch.setattr(main, "browser_instance", FakeBrowser(contexts=[]))
+    assert asyncio.run(main.shutdown_idle_browser()) == "shut down idle browser"
+    assert closed == [True]
+
+def test_shedding_refuses_scrapes_but_still_serves_cached_results(monkeypatch):
+    async def no_scrape(*args, **kwargs):
+        raise AssertionError("a shed request must not scrape")
+
+    monkeypatch.setattr(main, "cache", LRUTTLCache(max_size=30))
+    monkeypatch.setattr(main, "render_optimized_search", no_scrape)
+    monkeypatch.setattr(main.memory_governor, "refusing", True)
+    monkeypatch.setattr(main.memory_governor, "last_rss_mb", BUDGET)
+    cached = [{"title": "Cached Movie", "url": "https://example.com/watch"}]
+    main.cache_set(main.local_results_key("cached"), cached)
+
+    hit = asyncio.run(main.run_search_pipeline("cached", use_n8n=False))
+    shed = asyncio.run(main.run_search_pipeline("uncached", use_n8n=False))
+
+    assert (hit["results"], hit["source"], hit["cached"]) == (cached, "local-fallback", True)
+    assert (shed["results"], shed["source"]) == ([], "memory-shed")
@@ -0,0 +1,71 @@
+import re
+
+from metrics import MetricsRegistry
+
+# name{label="value",...} value, per the Prometheus text exposition format
+SAMPLE_RE = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\["\\n])*"(,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\["\\n])*")*\})?'
+    r' (-?[0-9.e+-]+|\+Inf|-Inf|NaN)$'
+)
+
+def rendered_registry():
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Requests served", ["path"])
+    requests.inc(path="/api/search")
+    requests.inc(2, path='/odd "path"\\with\nnewline')
+    registry.gauge("app_queue_depth", "Queued scrapes", ["lane"],
+                   collect=lambda: [({"lane": "interactive"}, 3), ({"lane": "background"}, 0.5)])
+    latency = registry.histogram("app_search_seconds", "Search latency", ["source"], buckets=(0.3, 1.0))
+    for value in (0.25, 0.5, 1.0, 4.0):
+        latency.observe(value, source="n8n")
+    return registry.render()
+
+def test_every_line_is_a_comment_or_a_valid_sample():
+    text = rendered_registry()
+
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        assert line.startswith("# ") or SAMPLE_RE.match(line), line
+
+def test_help_and_type_precede_each_metric():
+    lines = rendered_registry().splitlines()
+
+    for name, kind, documentation in (("app_requests_total", "counter", "Requests served"),
+                                      ("app_queue_depth", "gauge", "Queued scrapes"),
+                                      ("app_search_seconds", "histogram", "Search latency")):
+        help_at = lines.index(f"# HELP {name} {documentation}")
+        assert lines[help_at + 1] == f"# TYPE {name} {kind}"
+        assert lines[help_at + 2].startswith(name)
+
+def test_label_values_are_escaped():
+    lines = rendered_registry().splitlines()
+
+    assert 'app_requests_total{path="/api/search"} 1' in lines
+    assert 'app_requests_total{path="/odd \\"path\\"\\\\with\\nnewline"} 2' in lines
+    assert 'app_queue_depth{lane="background"} 0.5' in lines
+
+def test_histogram_buckets_are_cumulative_with_inf_sum_and_count():
+    lines = [line for line in rendered_registry().splitlines() if line.startswith("app_search_seconds")]
+
+    assert lines == [
+        'app_search_seconds_bucket{source="n8n",le="0.3"} 1',
+        # le is inclusive: the 1.0 observation lands in this bucket
+        'app_search_seconds_bucket{source="n8n",le="1"} 3',
+        'app_search_seconds_bucket{source="n8n",le="+Inf"} 4',
+        'app_search_seconds_sum{source="n8n"} 5.75',
+        'app_search_seconds_count{source="n8n"} 4',
+    ]
+
+def test_broken_collector_does_not_break_the_scrape():
+    registry = MetricsRegistry()
+    registry.counter("ok_total", "Fine").inc()
+
+    def broken():
+        raise RuntimeError("gone")
+
+    registry.gauge("broken", "Raises", collect=broken)
+
+    lines = registry.render().splitlines()
+    assert "ok_total 1" in lines
+    assert lines[-1] == "# broken unavailable: gone"
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mirrors import MirrorRegistry
+from movie_scraper import MovieScraper
+
+A, B, C = "https://a.example", "https://b.example", "https://c.example"
+
+def measured(registry, latency=0.05):
+    """Give every mirror a latency sample so races hedge on a delay"""
+    for mirror in registry.mirrors:
+        registry.record(mirror.url, latency, ok=True)
+    return registry
+
+def test_fastest_healthy_mirror_wins():
+    # Unmeasured mirrors all start at once; C fails first, B answers next
+    registry = MirrorRegistry([A, B, C], fanout=3)
+    delays = {A: 0.3, B: 0.02, C: 0.0}
+
+    async def fetch(base_url):
+        await asyncio.sleep(delays[base_url])
+        if base_url == C:
+            raise ConnectionError("refused")
+        return f"page from {base_url}"
+
+    result, winner = asyncio.run(registry.race(fetch))
+
+    assert (result, winner) == (f"page from {B}", B)
+    stats = registry.stats()["mirrors"]
+    assert stats[B]["wins"] == 1
+    assert stats[C]["failures"] == 1
+    # The abandoned loser is measured at no less than how long it ran
+    assert registry.mirror_for(A).latency_ewma >= 0.02
+
+def test_hedge_starts_only_after_the_delay():
+    registry = measured(MirrorRegistry([A, B], min_hedge_delay=0.2))
+    started = {}
+
+    async def fetch(base_url):
+        started[base_url] = time.perf_counter()
+        await asyncio.sleep(1.0 if base_url == A else 0.0)
+        return base_url
+
+    _, winner = asyncio.run(registry.race(fetch))
+
+    assert winner == B
+    assert started[B] - started[A] >= 0.18
+    assert (registry.races, registry.hedged) == (1, 1)
+
+def test_fast_leader_is_never_hedged():
+    registry = measured(MirrorRegistry([A, B], min_hedge_delay=0.2))
+    called = []
+
+    async def fetch(base_url):
+        called.append(base_url)
+        return base_url
+
+    assert asyncio.run(registry.race(fetch)) == (A, A)
+    assert called == [A]
+    assert registry.hedged == 0
+
+def test_failure_lowers_the_score_and_best_moves_away():
+    registry = measured(MirrorRegistry([A, B], min_hedge_delay=0.05))
+    assert registry.best() == A
+
+    async def fetch(base_url):
+        if base_url == A:
+            raise ConnectionError("reset")
+        return base_url
+
+    _, winner = asyncio.run(registry.race(fetch))
+
+    assert winner == B
+    now = time.monotonic()
+    assert registry.mirror_for(A).score(now) > registry.mirror_for(B).score(now)
+    assert registry.best() == B
+
+def test_every_mirror_failing_raises_the_last_error():
+    registry = MirrorRegistry([A, B])
+
+    async def fetch(base_url):
+        raise ConnectionError(base_url)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(registry.race(fetch))
+
+def test_race_sync_picks_the_fastest_mirror():
+    registry = MirrorRegistry([A, B])
+    delays = {A: 0.3, B: 0.01}
+
+    def fetch(base_url):
+        time.sleep(delays[base_url])
+        return base_url
+
+    assert registry.race_sync(fetch) == (B, B)
+
+class FakeResponse:
+    status_code = 200
+    text = "<html></html>"
+
+class FakeSession:
+    def __init__(self, used):
+        self.used = used
+
+    def get(self, url, timeout=None):
+        self.used.append((threading.get_ident(), id(self)))
+        time.sleep(0.05)
+        return FakeResponse()
+
+def test_race_sync_hedges_do_not_share_a_session(monkeypatch):
+    used = []
+    monkeypatch.setattr(MovieScraper, "_new_session", staticmethod(lambda: FakeSession(used)))
+    scraper = MovieScraper(mirrors=MirrorRegistry([A, B]))
+
+    scraper.mirrors.race_sync(scraper._get_ok)
+    # Both unmeasured mirrors ran concurrently; the loser may still be finishing
+    deadline = time.monotonic() + 2
+    while len(used) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    sessions = {session for _, session in used}
+    assert len(used) == 2
+    assert len(sessions) == 2
+    assert id(scraper.session) not in sessions
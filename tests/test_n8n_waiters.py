@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+import main
+from cache_engine import LRUTTLCache
+
+MOVIES = [{"title": "Delivered Movie", "url": "https://example.com/watch"}]
+
+class FakeRequest:
+    """Just enough of a Request for the /api/append-results handler"""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def json(self):
+        return self.payload
+
+async def deliver(query, movies):
+    """Post an n8n callback the way the workflow does"""
+    payload = {"searchQuery": query, "totalResults": len(movies), "source": "n8n", "movies": movies}
+    return await main.append_movie_results(FakeRequest(payload))
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(main, "cache", LRUTTLCache(max_size=30))
+    monkeypatch.setattr(main, "n8n_waiters", main.ResultWaiters())
+
+def test_callback_during_the_cache_read_wakes_the_waiter(monkeypatch):
+    async def slow_cache_get(key):
+        # The callback lands while the (disk) read is still in flight and misses it
+        await deliver("matrix", MOVIES)
+        return None
+
+    monkeypatch.setattr(main, "cache_get", slow_cache_get)
+
+    async def scenario():
+        start = asyncio.get_running_loop().time()
+        movies = await main.wait_for_n8n_results("matrix", max_wait=5)
+        return movies, asyncio.get_running_loop().time() - start
+
+    movies, elapsed = asyncio.run(scenario())
+    assert movies == MOVIES
+    assert elapsed < 1
+    assert len(main.n8n_waiters) == 0
+
+def test_results_already_cached_are_returned_without_waiting():
+    async def scenario():
+        await deliver("matrix", MOVIES)
+        return await main.wait_for_n8n_results("matrix", max_wait=5)
+
+    assert asyncio.run(scenario()) == MOVIES
+    assert len(main.n8n_waiters) == 0
+
+def test_empty_payload_keeps_waiting_for_a_real_one():
+    async def scenario():
+        waiter = asyncio.create_task(main.wait_for_n8n_results("matrix", max_wait=5))
+        await asyncio.sleep(0.01)
+        await deliver("matrix", [])
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert len(main.n8n_waiters) == 1
+        await deliver("matrix", MOVIES)
+        return await waiter
+
+    assert asyncio.run(scenario()) == MOVIES
+    assert len(main.n8n_waiters) == 0
+
+def test_timeout_returns_nothing_and_unregisters_the_waiter():
+    movies = asyncio.run(main.wait_for_n8n_results("nobody answers", max_wait=0.05))
+
+    assert movies == []
+    assert len(main.n8n_waiters) == 0
@@ -0,0 +1,64 @@
+import asyncio
+
+import main
+from cache_engine import LRUTTLCache
+from scrape_engine import ChallengeDetected, ScrapeTier, TieredScrapeEngine
+
+MOVIES = [{"title": "Found Movie", "url": "https://example.com/watch"}]
+
+def stub_tier(name, outcome, calls):
+    """Tier that records its call, then returns outcome (or raises it)"""
+    async def search(query, max_results):
+        calls.append(name)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+    return ScrapeTier(name, search)
+
+def test_escalates_past_a_challenge_and_an_empty_result():
+    calls = []
+    engine = TieredScrapeEngine([
+        stub_tier("http", ChallengeDetected("just a moment"), calls),
+        stub_tier("browser", [], calls),
+        stub_tier("browser-js", MOVIES, calls),
+    ])
+
+    results, tier_name = asyncio.run(engine.search("matrix", 10))
+
+    assert (results, tier_name) == (MOVIES, "browser-js")
+    assert calls == ["http", "browser", "browser-js"]
+    stats = engine.stats()
+    assert (stats["http"]["challenged"], stats["browser"]["empty"], stats["browser-js"]["answered"]) == (1, 1, 1)
+
+def test_first_tier_with_results_stops_escalation():
+    calls = []
+    engine = TieredScrapeEngine([stub_tier("http", MOVIES, calls), stub_tier("browser", MOVIES, calls)])
+
+    assert asyncio.run(engine.search("matrix", 10)) == (MOVIES, "http")
+    assert calls == ["http"]
+
+def test_stop_on_errors_end_escalation_without_results():
+    calls = []
+    engine = TieredScrapeEngine(
+        [stub_tier("browser", TimeoutError("pool saturated"), calls), stub_tier("browser-js", MOVIES, calls)],
+        stop_on=(TimeoutError,),
+    )
+
+    assert asyncio.run(engine.search("matrix", 10)) == ([], None)
+    assert calls == ["browser"]
+
+def test_answered_by_uses_the_history_key():
+    engine = TieredScrapeEngine([stub_tier("http", MOVIES, [])], key=main.normalize_query)
+
+    asyncio.run(engine.search("  The MATRIX ", 10))
+
+    assert engine.answered_by("the matrix") == "http"
+    assert engine.answered_by("other") is None
+
+def test_cached_local_results_report_the_cache_as_their_tier(monkeypatch):
+    monkeypatch.setattr(main, "cache", LRUTTLCache(max_size=30))
+    main.cache_set(main.local_results_key("Matrix"), MOVIES)
+
+    outcome = asyncio.run(main.run_search_pipeline("matrix ", use_n8n=False))
+
+    assert (outcome["results"], outcome["cached"], outcome["tier"]) == (MOVIES, True, "cache")
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from main import SingleFlight
+
+def test_concurrent_calls_share_one_run():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        callers = [asyncio.ensure_future(flights.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        outcomes = await asyncio.gather(*callers)
+        return calls, outcomes, flights
+
+    calls, outcomes, flights = asyncio.run(scenario())
+    assert calls == 1
+    assert [result for result, _, _ in outcomes] == ["result"] * 3
+    assert [joined for _, joined, _ in outcomes] == [False, True, True]
+    assert (flights.leaders, flights.coalesced, len(flights)) == (1, 2, 0)
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def work(value):
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(flights.do("a", lambda: work(1)), flights.do("b", lambda: work(2)))
+
+    assert [result for result, _, _ in asyncio.run(scenario())] == [1, 2]
+
+def test_next_call_after_completion_starts_a_new_run():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        first = await flights.do("k", work)
+        second = await flights.do("k", work)
+        return first, second, flights.running("k")
+
+    first, second, running = asyncio.run(scenario())
+    assert (first[0], second[0]) == (1, 2)
+    assert not first[1] and not second[1]
+    assert not running
+
+def test_errors_reach_every_caller():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        return await asyncio.gather(flights.do("k", work), flights.do("k", work), return_exceptions=True)
+
+    outcomes = asyncio.run(scenario())
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(flights.do("k", work))
+        follower = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await follower, leader.cancelled()
+
+    (result, joined, _), leader_cancelled = asyncio.run(scenario())
+    assert leader_cancelled
+    assert (result, joined) == ("done", True)
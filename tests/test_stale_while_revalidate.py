@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks
+
+import main
+from cache_engine import LRUTTLCache
+
+MOVIES = [{"title": "Cached Movie", "url": "https://example.com/watch"}]
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(main, "cache", LRUTTLCache(max_size=30))
+    monkeypatch.setattr(main, "search_refresher", main.BackgroundRefresher())
+
+def test_fresh_hit_schedules_no_refresh(clock):
+    main.cache_set(main.local_results_key("fresh"), MOVIES, ttl=main.SEARCH_HARD_TTL)
+    background = BackgroundTasks()
+
+    served = asyncio.run(main.serve_cached_search("fresh", True, background))
+
+    assert served["source"] == "local-cached"
+    assert (served["stale"], served["revalidating"]) == (False, False)
+    assert background.tasks == []
+
+def test_stale_hit_is_served_and_schedules_one_refresh(clock):
+    main.cache_set(main.local_results_key("old"), MOVIES, ttl=main.SEARCH_HARD_TTL)
+    clock.now += main.SEARCH_SOFT_TTL + 1
+    first, second = BackgroundTasks(), BackgroundTasks()
+
+    served = asyncio.run(main.serve_cached_search("old", True, first))
+    again = asyncio.run(main.serve_cached_search("old", True, second))
+
+    assert served["results"] == MOVIES
+    assert (served["stale"], served["revalidating"]) == (True, True)
+    # The second hit finds the refresh already queued
+    assert (again["stale"], again["revalidating"]) == (True, True)
+    assert (len(first.tasks), len(second.tasks)) == (1, 0)
+    assert (main.search_refresher.scheduled, main.search_refresher.skipped) == (1, 1)
+
+def test_past_hard_ttl_is_a_miss(clock):
+    main.cache_set(main.local_results_key("gone"), MOVIES, ttl=main.SEARCH_HARD_TTL)
+    clock.now += main.SEARCH_HARD_TTL + 1
+
+    assert asyncio.run(main.serve_cached_search("gone", True, BackgroundTasks())) is None
+
+def test_endpoint_serves_stale_and_refreshes_once(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    refreshed = []
+
+    async def fake_refresh(query, use_n8n):
+        refreshed.append(query)
+
+    monkeypatch.setattr(main, "refresh_search", fake_refresh)
+    # Stored with less than hard - soft TTL left: already stale
+    main.cache_set(main.local_results_key("stale endpoint"), MOVIES,
+                   ttl=main.SEARCH_HARD_TTL - main.SEARCH_SOFT_TTL - 60)
+
+    with TestClient(main.app) as client:
+        data = client.get("/api/search", params={"query": "stale endpoint"}).json()
+
+    assert data["source"] == "local-cached"
+    assert data["results"] == MOVIES
+    assert (data["stale"], data["revalidating"]) == (True, True)
+    assert refreshed == ["stale endpoint"]
+
+def refresh_falling_back_to_local(monkeypatch, results):
+    """refresh_search() whose pipeline falls back to a local scrape returning results"""
+
+    async def fake_flight(query, use_n8n, flight_key, refresh=False):
+        if results:
+            main.cache_set(main.local_results_key(query), results, ttl=main.SEARCH_HARD_TTL)
+        return {"results": results, "source": "local-fallback", "cached": False}, False, 0
+
+    monkeypatch.setattr(main, "run_search_flight", fake_flight)
+
+def test_local_refresh_with_results_retires_stale_n8n_entry(clock, monkeypatch):
+    refresh_falling_back_to_local(monkeypatch, MOVIES)
+    main.cache_set(main.n8n_results_key("q"), {"movies": [{"title": "old n8n"}]}, ttl=main.SEARCH_HARD_TTL)
+    clock.now += main.SEARCH_SOFT_TTL + 1
+
+    asyncio.run(main.refresh_search("q", True))
+
+    assert main.cache.peek(main.n8n_results_key("q")) is None
+    served = asyncio.run(main.lookup_cached_search("q"))
+    assert (served["source"], served["stale"], served["results"]) == ("local-cached", False, MOVIES)
+
+def test_local_refresh_without_results_restores_n8n_entry_fresh(clock, monkeypatch):
+    refresh_falling_back_to_local(monkeypatch, [])
+    n8n_movies = [{"title": "old n8n"}]
+    main.cache_set(main.n8n_results_key("q"), {"movies": n8n_movies}, ttl=main.SEARCH_HARD_TTL)
+    clock.now += main.SEARCH_SOFT_TTL + 1
+
+    asyncio.run(main.refresh_search("q", True))
+
+    served = asyncio.run(main.lookup_cached_search("q"))
+    assert (served["source"], served["stale"], served["results"]) == ("n8n-cached", False, n8n_movies)
+
+def test_fresh_n8n_entry_is_left_alone(clock, monkeypatch):
+    refresh_falling_back_to_local(monkeypatch, MOVIES)
+    main.cache_set(main.n8n_results_key("q"), {"movies": [{"title": "n8n"}]}, ttl=main.SEARCH_HARD_TTL)
+
+    asyncio.run(main.refresh_search("q", True))
+
+    assert main.cache.peek(main.n8n_results_key("q")) is not None
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+import main
+import movie_scraper_simple
+from stream_cache import StreamURLCache, is_stream_url
+
+PAGE = "https://www.5movierulz.chat/some-movie/movie-watch-online-free-1.html"
+PLAYER = "https://streamlare.com/e/abc123"
+
+@pytest.fixture
+def stream_cache(monkeypatch):
+    fresh = StreamURLCache(max_entries=50, ttl=3600, negative_ttl=60)
+    monkeypatch.setattr(main, "stream_url_cache", fresh)
+    monkeypatch.setattr(movie_scraper_simple, "stream_url_cache", fresh)
+    return fresh
+
+def test_positive_and_negative_entries(stream_cache):
+    assert stream_cache.lookup(PAGE) == (False, None)
+
+    stream_cache.store(PAGE, PLAYER)
+    stream_cache.store(PAGE + "-2", None)
+
+    # Fragments don't make a different page
+    assert stream_cache.lookup(PAGE + "#comments") == (True, PLAYER)
+    assert stream_cache.lookup(PAGE + "-2") == (True, None)
+    assert stream_cache.stats()["negative_hits"] == 1
+
+def test_negative_entries_expire_before_positive_ones(stream_cache, clock):
+    stream_cache.store(PAGE, PLAYER)
+    stream_cache.store(PAGE + "-2", None)
+
+    clock.now += 61
+    assert stream_cache.lookup(PAGE + "-2") == (False, None)
+    assert stream_cache.lookup(PAGE) == (True, PLAYER)
+
+    clock.now += 3600
+    assert stream_cache.lookup(PAGE) == (False, None)
+
+def test_is_stream_url_accepts_only_player_hosts():
+    assert is_stream_url(PLAYER)
+    assert is_stream_url("https://vcdnlare.com/v/xyz")
+    assert not is_stream_url("https://www.youtube.com/watch?v=trailer-stream")
+    assert not is_stream_url("")
+    assert not is_stream_url(None)
+
+class FakeElement:
+    def __init__(self, href):
+        self.href = href
+
+    async def get_attribute(self, name):
+        return self.href if name == "href" else None
+
+    async def inner_text(self):
+        return ""
+
+class FakeMoviePage:
+    """Movie page whose links match selectors by href substring"""
+
+    def __init__(self, hrefs):
+        self.hrefs = hrefs
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        pass
+
+    async def query_selector_all(self, selector):
+        if selector.startswith('a[href*="'):
+            needle = selector[len('a[href*="'):-2]
+            return [FakeElement(href) for href in self.hrefs if needle in href]
+        return []
+
+    async def close(self):
+        self.closed = True
+
+class FakeContext:
+    def __init__(self, page):
+        self.page = page
+        self.opened = 0
+
+    async def new_page(self):
+        self.opened += 1
+        return self.page
+
+class FakeSearchPage:
+    def __init__(self, movie_page):
+        self.context = FakeContext(movie_page)
+
+@pytest.fixture
+def no_settle_delay(monkeypatch):
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds, *args, **kwargs):
+        await real_sleep(0)
+
+    monkeypatch.setattr(movie_scraper_simple.asyncio, "sleep", sleep)
+
+def test_loose_match_is_returned_but_never_cached(stream_cache, no_settle_delay):
+    loose = "https://example.com/livestream-trailer"
+    search_page = FakeSearchPage(FakeMoviePage([loose]))
+
+    found = asyncio.run(movie_scraper_simple.extract_streaming_url(search_page, PAGE))
+
+    assert found == loose
+    assert stream_cache.lookup(PAGE) == (False, None)
+
+def test_player_url_is_cached_and_reused(stream_cache, no_settle_delay):
+    search_page = FakeSearchPage(FakeMoviePage([PLAYER]))
+
+    first = asyncio.run(movie_scraper_simple.extract_streaming_url(search_page, PAGE))
+    second = asyncio.run(movie_scraper_simple.extract_streaming_url(search_page, PAGE))
+
+    assert first == second == PLAYER
+    assert search_page.context.opened == 1
+
+def test_negative_entry_short_circuits_resolution(stream_cache, monkeypatch):
+    fetched = []
+
+    async def fetch_streaming_url_http(movie_url):
+        fetched.append(movie_url)
+        return PLAYER
+
+    monkeypatch.setattr(main, "fetch_streaming_url_http", fetch_streaming_url_http)
+    stream_cache.store(PAGE, None)
+
+    resolved = asyncio.run(main.resolve_streaming_urls_http([PAGE, PAGE + "-2"]))
+
+    assert resolved == [None, PLAYER]
+    assert fetched == [PAGE + "-2"]
+    assert stream_cache.lookup(PAGE + "-2") == (True, PLAYER)
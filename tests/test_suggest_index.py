@@ -0,0 +1,47 @@
+from suggest_index import PrefixIndex, normalize_title
+
+def test_normalize_title_folds_case_and_punctuation():
+    assert normalize_title("  Spider-Man: No   Way Home! ") == "spider man no way home"
+
+def test_matches_title_and_word_prefixes():
+    index = PrefixIndex()
+    index.add_many(["The Avengers", "Avatar", "Batman"])
+
+    assert index.suggest("ava") == ["Avatar"]
+    assert index.suggest("aven") == ["The Avengers"]
+    assert index.suggest("x") == []
+
+def test_whole_title_matches_rank_before_mid_title_words():
+    index = PrefixIndex()
+    index.add_many(["The Batman", "Batman Begins"])
+
+    assert index.suggest("bat") == ["Batman Begins", "The Batman"]
+
+def test_duplicates_are_refreshed_not_reinserted():
+    index = PrefixIndex()
+    assert index.add("Avatar")
+    assert not index.add("AVATAR!")
+
+    assert len(index) == 1
+    assert index.stats()["keys"] == 1
+
+def test_evicts_least_recently_seen_titles():
+    index = PrefixIndex(max_titles=2)
+    index.add("Alpha One")
+    index.add("Beta")
+    index.add("Alpha One")  # seen again: Beta is now the oldest
+    index.add("Gamma")
+
+    assert index.suggest("beta") == []
+    assert index.suggest("one") == ["Alpha One"]
+    assert index.evictions == 1
+    # Evicted titles leave no keys behind
+    assert index.stats()["keys"] == len("Alpha One".split()) + 1
+
+def test_limit_and_empty_prefix():
+    index = PrefixIndex()
+    index.add_many([f"Movie {n}" for n in range(10)])
+
+    assert len(index.suggest("movie", limit=3)) == 3
+    assert index.suggest("", limit=3) == []
+    assert index.suggest("movie", limit=0) == []
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from cache_engine import LRUTTLCache
+
+def parse_server_timing(value):
+    """{metric: duration_ms} from a Server-Timing header value"""
+    metrics = {}
+    for part in value.split(","):
+        name, _, duration = part.strip().partition(";dur=")
+        metrics[name] = float(duration)
+    return metrics
+
+@pytest.fixture
+def client(monkeypatch):
+    async def timed_pipeline(query, use_n8n, event_key=None, refresh=False):
+        with main.span("n8n_wait"):
+            await asyncio.sleep(0.01)
+        with main.span("local_scrape"):
+            await asyncio.sleep(0.02)
+        return {"results": [], "source": "local-fallback", "tier": None, "cached": False,
+                **main.deadline_outcome()}
+
+    monkeypatch.setattr(main, "cache", LRUTTLCache(max_size=30))
+    monkeypatch.setattr(main, "run_search_pipeline", timed_pipeline)
+    with TestClient(main.app) as client:
+        yield client
+
+def test_search_reports_recorded_spans_in_server_timing(client):
+    response = client.get("/api/search", params={"query": "timed", "use_n8n": "false"})
+
+    assert response.status_code == 200
+    timing = parse_server_timing(response.headers["server-timing"])
+    assert {"n8n_wait", "local_scrape", "total"} <= set(timing)
+    assert timing["local_scrape"] >= 20
+    assert timing["total"] >= timing["n8n_wait"] + timing["local_scrape"]
+    assert response.headers["x-trace-id"]
+
+def test_stream_gets_no_server_timing(client):
+    response = client.get("/api/search/stream", params={"query": "timed", "use_n8n": "false"})
+
+    assert response.status_code == 200
+    assert response.text.strip()
+    assert "server-timing" not in response.headers
+    assert "x-trace-id" not in response.headers
+
+def test_other_paths_get_no_server_timing(client):
+    response = client.get("/api/health")
+
+    assert "server-timing" not in response.headers
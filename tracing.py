@@ -0,0 +1,204 @@
+"""
+Per-request tracing and structured logging
+Each request gets a context-local span tree; stages open child spans with
+span(), and log() tags every line with the request's trace id. Log output
+goes through a queue to a background thread so the event loop never
+blocks on stdout. TRACE_LOG selects text (default), json, or off.
+TracingMiddleware turns the span tree into a Server-Timing header.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence
+
+TRACE_LOG = os.environ.get("TRACE_LOG", "text").lower()
+
+class Span:
+    __slots__ = ("name", "start", "end", "children", "attrs")
+
+    def __init__(self, name: str, attrs: Optional[Dict] = None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+        self.attrs = attrs or {}
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration_ms, 2),
+            **({"attrs": self.attrs} if self.attrs else {}),
+            **({"children": [child.to_dict() for child in self.children]} if self.children else {}),
+        }
+
+class Trace:
+    """Span tree of one request"""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.root = Span(name)
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Total milliseconds per span name across the whole tree (root excluded)"""
+        totals: Dict[str, float] = {}
+        stack = list(self.root.children)
+        while stack:
+            span = stack.pop()
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+            stack.extend(span.children)
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one metric per stage plus the request total"""
+        parts = [f"{_timing_token(name)};dur={ms:.1f}" for name, ms in self.stage_totals().items()]
+        parts.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(parts)
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+_TOKEN_RE = re.compile(r'[^A-Za-z0-9_\-]')
+
+def _timing_token(name: str) -> str:
+    return _TOKEN_RE.sub("_", name)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None):
+    """Make a new trace current for the enclosed block (and tasks it creates)"""
+    trace = Trace(name, trace_id)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace.root.end = time.perf_counter()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block as a child of the current span (no-op outside a trace)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+def record_span(name: str, duration: float, **attrs):
+    """Attach an already-measured duration (seconds) as a finished child span"""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    child = Span(name, attrs)
+    child.end = time.perf_counter()
+    child.start = child.end - duration
+    parent.children.append(child)
+
+# --- logging ---------------------------------------------------------------
+
+class _JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", {})
+        trace_id = fields.get("trace_id")
+        prefix = f"[{trace_id}] " if trace_id else ""
+        return f"{prefix}{record.getMessage()}"
+
+logger = logging.getLogger("movie_search")
+logger.propagate = False
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def _configure(mode: str):
+    global _listener
+    if mode == "off":
+        logger.disabled = True
+        return
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(_JSONFormatter() if mode == "json" else _TextFormatter())
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    # The listener thread does the blocking stdout writes
+    _listener = logging.handlers.QueueListener(log_queue, stream)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+_configure(TRACE_LOG)
+
+def log(message: str, level: int = logging.INFO, **fields):
+    """Log a line tagged with the current trace id and span"""
+    if logger.disabled:
+        return
+    trace = _current_trace.get()
+    if trace is not None:
+        fields["trace_id"] = trace.trace_id
+        current = _current_span.get()
+        if current is not None and current is not trace.root:
+            fields["span"] = current.name
+    logger.log(level, message, extra={"fields": fields})
+
+def log_error(message: str, **fields):
+    log(message, level=logging.ERROR, **fields)
+
+# --- ASGI middleware -------------------------------------------------------
+
+class TracingMiddleware:
+    """Start a trace per HTTP request; add Server-Timing (and the trace id) on chosen paths"""
+
+    def __init__(self, app, timing_paths: Sequence[str] = ("/api/search",)):
+        self.app = app
+        self.timing_paths = tuple(timing_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        with start_trace(f"{scope.get('method', 'GET')} {path}") as trace:
+            # Exact match: a prefix would also cover /api/search/stream, whose headers
+            # go out before any work is timed
+            add_timing = path in self.timing_paths
+
+            async def send_with_timing(message):
+                if add_timing and message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                    headers.append((b"x-trace-id", trace.trace_id.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)